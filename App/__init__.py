@@ -1,4 +1,11 @@
 from .models import *
-from .views import *
 from .controllers import *
-from .main import *
\ No newline at end of file
+from .main import *
+
+def __getattr__(name):
+    # views import Flask-Admin, CORS and uploads; only load them when something asks for them
+    from . import views
+    try:
+        return getattr(views, name)
+    except AttributeError:
+        raise AttributeError(f"module 'App' has no attribute {name!r}") from None
\ No newline at end of file
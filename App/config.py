@@ -15,5 +15,55 @@ def load_config(app, overrides):
     app.config["JWT_COOKIE_SECURE"] = True
     app.config["JWT_COOKIE_CSRF_PROTECT"] = False
     app.config['FLASK_ADMIN_SWATCH'] = 'darkly'
+    # werkzeug hash method string, e.g. "scrypt" or "pbkdf2:sha256:600000"; older hashes are upgraded on login
+    app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt')
+    # size of the thread pool hashing runs on (0 hashes inline)
+    app.config.setdefault('PASSWORD_HASH_WORKERS', 4)
+    # processes bulk imports hash on (0 = one per core)
+    app.config.setdefault('PASSWORD_HASH_PROCESSES', 0)
+    # authenticated requests resolve users from this per-worker cache; entries expire after IDENTITY_CACHE_TTL seconds
+    app.config.setdefault('IDENTITY_CACHE_SIZE', 4096)
+    app.config.setdefault('IDENTITY_CACHE_TTL', 60)
+    # seconds between checks of the 'user' table version, which clears the cache after another worker's user writes
+    app.config.setdefault('IDENTITY_CACHE_CHECK_INTERVAL', 1.0)
+    # startup budget `flask perf startup` checks the lean CLI app against
+    app.config.setdefault('CLI_STARTUP_BUDGET_MS', 1000)
+    # count and time SQL per request and per CLI command; statements repeated this often are flagged as N+1s
+    app.config.setdefault('SQL_PROFILER', False)
+    app.config.setdefault('SQL_PROFILER_N1_THRESHOLD', 5)
+    # request metrics served at /metrics; with METRICS_DIR set, workers share snapshots there every METRICS_FLUSH_INTERVAL seconds
+    app.config.setdefault('METRICS_ENABLED', True)
+    app.config.setdefault('METRICS_DIR', None)
+    app.config.setdefault('METRICS_FLUSH_INTERVAL', 1.0)
+    # run on every SQLite connection: WAL lets readers and a writer overlap, busy_timeout waits out locks
+    app.config.setdefault('SQLITE_PRAGMAS', {'journal_mode': 'WAL', 'busy_timeout': 5000,
+                                             'synchronous': 'NORMAL', 'cache_size': -16000})
+    # per-worker connection pool for server databases; a worker opens at most DB_POOL_SIZE + DB_MAX_OVERFLOW
+    app.config.setdefault('DB_POOL_SIZE', 5)
+    app.config.setdefault('DB_MAX_OVERFLOW', 10)
+    app.config.setdefault('DB_POOL_TIMEOUT', 10)
+    app.config.setdefault('DB_POOL_RECYCLE', 1800)
+    app.config.setdefault('DB_POOL_PRE_PING', True)
+    # queue log and request inserts for a background writer that commits them in groups
+    app.config.setdefault('WRITE_BEHIND', False)
+    app.config.setdefault('WRITE_BEHIND_BATCH_SIZE', 200)
+    app.config.setdefault('WRITE_BEHIND_MAX_DELAY_MS', 10)
+    app.config.setdefault('WRITE_BEHIND_ACK_TIMEOUT', 30)
+    # per-worker LRU of serialized listing responses; bodies larger than RESPONSE_CACHE_MAX_BYTES stream uncached
+    app.config.setdefault('RESPONSE_CACHE_SIZE', 256)
+    app.config.setdefault('RESPONSE_CACHE_MAX_BYTES', 1024 * 1024)
+    # /api/stream/leaderboard: each worker polls leaderboard_change this often while it has subscribers
+    app.config.setdefault('LEADERBOARD_STREAM_POLL_INTERVAL', 0.5)
+    app.config.setdefault('LEADERBOARD_STREAM_HEARTBEAT', 15)
+    app.config.setdefault('LEADERBOARD_STREAM_KEEP', 10000)
+    # workers hold activities and milestones in memory and compare the stored version at most this often (seconds)
+    app.config.setdefault('ACTIVITY_CATALOG_CHECK_INTERVAL', 1.0)
+    # Flask-Admin list pages reuse their row counts for this many seconds per filter combination
+    app.config.setdefault('ADMIN_COUNT_CACHE_TTL', 30)
+    # optional read replica for listings, the leaderboard and reports; reads fall back to the primary
+    # once the replica trails it by DB_REPLICA_MAX_LAG seconds, checked every DB_REPLICA_CHECK_INTERVAL
+    app.config.setdefault('DB_REPLICA_URI', None)
+    app.config.setdefault('DB_REPLICA_MAX_LAG', 5)
+    app.config.setdefault('DB_REPLICA_CHECK_INTERVAL', 1.0)
     for key in overrides:
         app.config[key] = overrides[key]
\ No newline at end of file
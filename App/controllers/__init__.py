@@ -1,5 +1,11 @@
 from .user import *
 from .auth import *
 from .log import *
+from .entries import *
 from .activity import *
 from .initialize import *
+from .leaderboard import *
+from .request import *
+from .seed import *
+from .table_version import *
+from .report import *
\ No newline at end of file
@@ -1,22 +1,268 @@
-from App.models import db, Activity
+import time
+from bisect import bisect_right
+from flask import current_app
+from sqlalchemy import select, insert, update, delete, bindparam, func
 
-def create_activity(name):
+from App.models import db, Activity, ActivityMilestone, ActivityHours, User, Student, Log, Award, TableVersion
+from App.database import iter_keyset, use_replica
+from .table_version import bump_table_versions
+
+# thresholds of activities that have none of their own in activity_milestone
+MILESTONES = [10, 25, 50]
+
+def compile_milestones(milestones):
+    return tuple(sorted(set(milestones)))
+
+
+class ActivityCatalog:
+    """Activities and their compiled milestones as of one version of the activity table."""
+
+    def __init__(self, version, activities, milestones):
+        self.version = version
+        self.activities = activities
+        self.ids = {name: activity_id for activity_id, name in activities}
+        self.names = dict(activities)
+        default = compile_milestones(MILESTONES)
+        self.milestones = {activity_id: compile_milestones(milestones[activity_id]) if activity_id in milestones
+                           else default for activity_id, _ in activities}
+        self.checked_at = time.monotonic()
+
+def _load_activity_catalog(version):
+    activities = db.session.execute(select(Activity.id, Activity.name).order_by(Activity.id)).all()
+    milestones = {}
+    for activity_id, hours in db.session.execute(select(ActivityMilestone.activity_id, ActivityMilestone.hours)):
+        milestones.setdefault(activity_id, []).append(hours)
+    return ActivityCatalog(version, [tuple(row) for row in activities], milestones)
+
+def get_activity_catalog(refresh=False):
+    """
+    This worker's copy of the activities and milestones. The stored activity version is
+    compared at most once per ACTIVITY_CATALOG_CHECK_INTERVAL seconds (always with
+    refresh), and the catalog is only reloaded when another process has changed it.
+    """
+    catalog = current_app.extensions.get('activity_catalog')
+    if (catalog is not None and not refresh
+            and time.monotonic() - catalog.checked_at < current_app.config['ACTIVITY_CATALOG_CHECK_INTERVAL']):
+        return catalog
+    # version and rows both from the primary: a catalog tagged newer than its rows would never reload
+    with use_replica(False):
+        version = db.session.scalar(select(TableVersion.version).where(TableVersion.name == 'activity'))
+        if catalog is None or catalog.version != version:
+            catalog = _load_activity_catalog(version)
+            current_app.extensions['activity_catalog'] = catalog
+    catalog.checked_at = time.monotonic()
+    return catalog
+
+def reset_activity_catalog():
+    current_app.extensions.pop('activity_catalog', None)
+
+def get_activity_id(name):
+    """Id of the named activity, or None. A miss re-checks the version, so new activities are found at once."""
+    activity_id = get_activity_catalog().ids.get(name)
+    if activity_id is None:
+        activity_id = get_activity_catalog(refresh=True).ids.get(name)
+    return activity_id
+
+def get_activity_ids(names):
+    """{name: id} for the names that exist, with the same re-check on a miss as get_activity_id."""
+    catalog = get_activity_catalog()
+    if any(name not in catalog.ids for name in names):
+        catalog = get_activity_catalog(refresh=True)
+    return {name: catalog.ids[name] for name in names if name in catalog.ids}
+
+def get_activity_name(activity_id):
+    name = get_activity_catalog().names.get(activity_id)
+    if name is None:
+        name = get_activity_catalog(refresh=True).names.get(activity_id)
+    return name
+
+def create_activity(name, milestones=None):
     activity = Activity(name)
     db.session.add(activity)
+    if milestones:
+        db.session.flush()
+        db.session.add_all(ActivityMilestone(activity_id=activity.id, hours=hours) for hours in set(milestones))
+    bump_table_versions('activity')
     db.session.commit()
+    reset_activity_catalog()
+    return activity
 
-
-MILESTONES = [10, 25, 50]
-ACTIVITY_MILESTONES = {}
+def set_activity_milestones(name, milestones):
+    """Replace an activity's thresholds; an empty list falls back to MILESTONES. Returns False if there is no such activity."""
+    activity_id = db.session.scalar(select(Activity.id).where(Activity.name == name))
+    if activity_id is None:
+        return False
+    db.session.execute(delete(ActivityMilestone).where(ActivityMilestone.activity_id == activity_id))
+    rows = [{'activity_id': activity_id, 'hours': hours} for hours in set(milestones)]
+    if rows:
+        db.session.execute(insert(ActivityMilestone), rows)
+    bump_table_versions('activity')
+    db.session.commit()
+    reset_activity_catalog()
+    return True
 
 def milestones_for(activity_name):
-    return ACTIVITY_MILESTONES.get(activity_name, MILESTONES)
+    catalog = get_activity_catalog()
+    activity_id = catalog.ids.get(activity_name)
+    return catalog.milestones[activity_id] if activity_id is not None else compile_milestones(MILESTONES)
 
 def resolve_milestone(total_hours, milestones):
-    milestones = sorted(milestones)
-    reached = None
-    for nextt in milestones:
-        if total_hours >= nextt:
-            reached = nextt
-    result = f"{reached} Hour Milestone" if reached is not None else "No milestone yet"
+    if not isinstance(milestones, tuple):
+        milestones = compile_milestones(milestones)
+    reached = bisect_right(milestones, total_hours)
+    result = f"{milestones[reached - 1]} Hour Milestone" if reached else "No milestone yet"
     return result
+
+def crossed_milestones(milestones, before, after):
+    """The compiled milestones reached by going from `before` to `after` hours."""
+    return milestones[bisect_right(milestones, before):bisect_right(milestones, after)]
+
+def build_accolade(activities, hours_by_activity):
+    """One "<activity>: <milestone>" line per (id, name) activity."""
+    return ''.join(
+        f"{name}: {resolve_milestone(hours_by_activity.get(activity_id, 0), milestones_for(name))}\n"
+        for activity_id, name in activities
+    )
+
+
+def _add_hours_statement():
+    """INSERT into activity_hours that adds to the existing total on a (student_id, activity_id) conflict."""
+    table = ActivityHours.__table__
+    dialect = db.session.get_bind(ActivityHours).dialect.name
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        return stmt.on_duplicate_key_update(hours=table.c.hours + stmt.inserted.hours)
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(index_elements=[table.c.student_id, table.c.activity_id],
+                                      set_={'hours': table.c.hours + stmt.excluded.hours})
+
+def add_activity_hours(rows):
+    """
+    Fold (student_id, activity_id, hours) rows into the activity_hours totals with one
+    upsert, so concurrent first logs for a pair both land instead of racing on the insert.
+    Caller commits.
+    """
+    deltas = {}
+    for student_id, activity_id, hours in rows:
+        deltas[(student_id, activity_id)] = deltas.get((student_id, activity_id), 0) + hours
+    if not deltas:
+        return
+    db.session.execute(_add_hours_statement(), [
+        {'student_id': student_id, 'activity_id': activity_id, 'hours': hours}
+        for (student_id, activity_id), hours in deltas.items()
+    ])
+    record_awards(deltas)
+
+def record_awards(deltas):
+    """
+    Insert an Award for each milestone crossed by {(student_id, activity_id): hours added}.
+    Totals are read back after the caller's update, so concurrent writers each see their
+    own before/after and a milestone is awarded exactly once. Caller commits.
+    """
+    catalog = get_activity_catalog()
+    if any(activity_id not in catalog.milestones for _, activity_id in deltas):
+        catalog = get_activity_catalog(refresh=True)
+    student_ids = list({student_id for student_id, _ in deltas})
+    totals = {}
+    for i in range(0, len(student_ids), 500):
+        for student_id, activity_id, hours in db.session.execute(
+                select(ActivityHours.student_id, ActivityHours.activity_id, ActivityHours.hours)
+                .where(ActivityHours.student_id.in_(student_ids[i:i + 500]))):
+            totals[(student_id, activity_id)] = hours
+    awards = []
+    for (student_id, activity_id), added in deltas.items():
+        total = totals.get((student_id, activity_id))
+        if total is None or activity_id not in catalog.milestones:
+            continue
+        for milestone in crossed_milestones(catalog.milestones[activity_id], total - added, total):
+            awards.append({'student_id': student_id, 'activity_id': activity_id, 'milestone': milestone})
+    if awards:
+        db.session.execute(insert(Award), awards)
+    return awards
+
+def backfill_awards():
+    """Insert awards for milestones reached in activity_hours but not yet recorded. Caller commits."""
+    catalog = get_activity_catalog(refresh=True)
+    existing = set(db.session.execute(select(Award.student_id, Award.activity_id, Award.milestone)).all())
+    missing = []
+    for student_id, activity_id, hours in db.session.execute(
+            select(ActivityHours.student_id, ActivityHours.activity_id, ActivityHours.hours)):
+        if activity_id not in catalog.milestones:
+            continue
+        for milestone in crossed_milestones(catalog.milestones[activity_id], 0, hours):
+            if (student_id, activity_id, milestone) not in existing:
+                missing.append({'student_id': student_id, 'activity_id': activity_id, 'milestone': milestone})
+    for i in range(0, len(missing), 1000):
+        db.session.execute(insert(Award), missing[i:i + 1000])
+    return len(missing)
+
+def iter_awards(student=None, activity=None, after_id=None, limit=None, chunk_size=500):
+    """Yield (id, student, activity, milestone, awarded_at) awards in id order, i.e. oldest first."""
+    query = (select(Award.id, User.username.label('student'), Activity.name.label('activity'),
+                    Award.milestone, Award.awarded_at)
+             .join(User, User.id == Award.student_id)
+             .join(Activity, Activity.id == Award.activity_id))
+    lookups = []
+    if student is not None:
+        lookups.append((Award.student_id, select(User.id).where(User.username == student)))
+    if activity is not None:
+        lookups.append((Award.activity_id, select(Activity.id).where(Activity.name == activity)))
+    for column, lookup in lookups:
+        match = db.session.execute(lookup).scalar()
+        if match is None:
+            return iter(())
+        query = query.where(column == match)
+    return iter_keyset(query, Award.id, after=after_id, limit=limit, chunk_size=chunk_size)
+
+def award_row_json(row):
+    data = row._asdict()
+    data['awarded_at'] = row.awarded_at.isoformat() if row.awarded_at else None
+    return data
+
+def rebuild_activity_hours():
+    """Recompute activity_hours from the full log table. Caller commits."""
+    db.session.execute(delete(ActivityHours))
+    db.session.execute(insert(ActivityHours).from_select(
+        ['student_id', 'activity_id', 'hours'],
+        select(Log.student_id, Log.activity_id, func.sum(Log.hours))
+        .where(Log.student_id.is_not(None), Log.activity_id.is_not(None))
+        .group_by(Log.student_id, Log.activity_id)
+    ))
+
+def get_student_activity_hours(student_id):
+    return dict(db.session.execute(
+        select(ActivityHours.activity_id, ActivityHours.hours).where(ActivityHours.student_id == student_id)
+    ).all())
+
+def recompute_accolades(rebuild=False):
+    """
+    Rewrite every student's accolade from the activity_hours totals and record any
+    awards that predate write-time detection. Returns the number of accolades changed.
+    """
+    if rebuild:
+        rebuild_activity_hours()
+    activities = get_activity_catalog(refresh=True).activities
+    totals = {}
+    for student_id, activity_id, hours in db.session.execute(
+            select(ActivityHours.student_id, ActivityHours.activity_id, ActivityHours.hours)):
+        totals.setdefault(student_id, {})[activity_id] = hours
+
+    student = Student.__table__
+    changed = []
+    for student_id, current in db.session.execute(select(student.c.id, student.c.accolade)):
+        accolade = build_accolade(activities, totals.get(student_id, {}))
+        if accolade != current:
+            changed.append({'b_id': student_id, 'b_accolade': accolade})
+    if changed:
+        db.session.execute(
+            update(student).where(student.c.id == bindparam('b_id')).values(accolade=bindparam('b_accolade')),
+            changed
+        )
+    backfill_awards()
+    db.session.commit()
+    return len(changed)
@@ -1,30 +1,59 @@
-from flask_jwt_extended import create_access_token, jwt_required, JWTManager, get_jwt_identity, verify_jwt_in_request, unset_jwt_cookies
-import json, os
-from App.models import User
-from App.database import db
+from flask_jwt_extended import create_access_token, jwt_required, JWTManager, get_jwt_identity, verify_jwt_in_request, unset_jwt_cookies, current_user, get_jwt
+from flask_jwt_extended import get_current_user as get_jwt_user
+from flask import jsonify, g, current_app, has_request_context
+from functools import wraps
+from collections import namedtuple
+from sqlalchemy import select, event
+import json, os, time
+from App.models import User, TableVersion
+from App.database import db, use_replica
+from App.cache import LRUCache
 
 SESSION_FILE = "cli_session.json"
 
+# user id from SESSION_FILE, read once per process and kept in step by login/logout
+_cli_session = {}
+
 def get_current_user():
-   if not os.path.exists(SESSION_FILE):
-      return None
-   with open(SESSION_FILE) as f:
-      data = json.load(f)
-      user = User.query.get(data['user_id'])
-      return user
+   if 'user_id' not in _cli_session:
+      user_id = None
+      if os.path.exists(SESSION_FILE):
+         with open(SESSION_FILE) as f:
+            user_id = json.load(f)['user_id']
+      _cli_session['user_id'] = user_id
+   user_id = _cli_session['user_id']
+   return db.session.get(User, user_id) if user_id is not None else None
 
-def login(username, password):
+def authenticate(username, password):
   user = User.query.filter_by(username=username).first()
   if not user or not user.check_password(password):
+     return None
+  # Upgrade hashes made with older PASSWORD_HASH_METHOD settings while we know the password
+  if user.password_needs_rehash():
+     user.set_password(password)
+     db.session.commit()
+  return user
+
+def jwt_authenticate(username, password):
+  user = authenticate(username, password)
+  if not user:
+     return None
+  return create_access_token(identity=user)
+
+def login(username, password):
+  user = authenticate(username, password)
+  if not user:
      print('User not found or incorrect password')
      return False
   with open(SESSION_FILE, 'w') as f:
      json.dump({"user_id": user.id, "user_type": user.type}, f)
+  _cli_session['user_id'] = user.id
   print(f"Logged in as: {user.username} ({user.type})")
   return True
 
 
 def logout():
+  _cli_session['user_id'] = None
   if os.path.exists(SESSION_FILE):
      os.remove(SESSION_FILE)
      print("Logged out")
@@ -32,6 +61,74 @@ def logout():
      print("Not logged in. Please log in.")
 
 
+# Lightweight stand-in for User on authenticated web requests
+UserIdentity = namedtuple('UserIdentity', ['id', 'username', 'type'])
+
+def _identity_cache():
+  cache = current_app.extensions.get('identity_cache')
+  if cache is None:
+    cache = LRUCache(maxsize=current_app.config['IDENTITY_CACHE_SIZE'], ttl=current_app.config['IDENTITY_CACHE_TTL'])
+    current_app.extensions['identity_cache'] = cache
+  # other workers' user writes bump the 'user' version; drop everything when it moves
+  checked = current_app.extensions.get('identity_cache_checked')
+  now = time.monotonic()
+  if checked is None or now - checked[1] >= current_app.config['IDENTITY_CACHE_CHECK_INTERVAL']:
+    with use_replica(False):
+      version = db.session.scalar(select(TableVersion.version).where(TableVersion.name == 'user'))
+    if checked is not None and checked[0] != version:
+      cache.clear()
+    current_app.extensions['identity_cache_checked'] = (version, now)
+  return cache
+
+def get_identity(user_id):
+  """Resolve a user id to a UserIdentity: once per request, then from a TTL/LRU cache, then the db."""
+  memo = g.setdefault('_identities', {}) if has_request_context() else {}
+  if user_id in memo:
+    return memo[user_id]
+  cache = _identity_cache()
+  identity = cache.get(user_id)
+  if identity is None:
+    # cached across requests, so never from a lagging replica
+    with use_replica(False):
+      row = db.session.execute(
+        select(User.id, User.username, User.type).where(User.id == user_id)
+      ).first()
+    identity = UserIdentity(*row) if row else None
+    if identity is not None:
+      cache.set(user_id, identity)
+  memo[user_id] = identity
+  return identity
+
+def invalidate_identity(user_id):
+  cache = current_app.extensions.get('identity_cache')
+  if cache is not None:
+    cache.pop(user_id)
+  if has_request_context():
+    g.setdefault('_identities', {}).pop(user_id, None)
+
+@event.listens_for(User.password, 'set', propagate=True)
+def _password_changed(target, value, oldvalue, initiator):
+  if target.id is not None and current_app:
+    invalidate_identity(target.id)
+
+def current_identity():
+  """The request's UserIdentity or None, decoding the JWT at most once per request."""
+  if '_current_identity' not in g:
+    try:
+      get_jwt()
+    except RuntimeError:
+      try:
+        verify_jwt_in_request(optional=True)
+      except Exception:
+        g._current_identity = None
+        return None
+    try:
+      g._current_identity = get_jwt_user()
+    except RuntimeError:
+      g._current_identity = None
+  return g._current_identity
+
+
 def setup_jwt(app):
   jwt = JWTManager(app)
 
@@ -50,23 +147,33 @@ def setup_jwt(app):
       user_id = int(identity)
     except (TypeError, ValueError):
       return None
-    return db.session.get(User, user_id)
+    return get_identity(user_id)
 
   return jwt
 
 
+# Restricts an API route to authenticated users of the given type
+def role_required(role):
+  def decorator(fn):
+    @wraps(fn)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+      if current_user is None or current_user.type != role:
+        return jsonify(message=f'{role} access required'), 403
+      return fn(*args, **kwargs)
+    return wrapper
+  return decorator
+
+
 # Context processor to make 'is_authenticated' available to all templates
 def add_auth_context(app):
+  # create_app pushes a long-lived app context, so g can outlive a request; start each one clean
+  @app.before_request
+  def reset_identity():
+    for key in ('_current_identity', '_identities', '_jwt_extended_jwt', '_jwt_extended_jwt_user', '_jwt_extended_jwt_header'):
+      g.pop(key, None)
+
   @app.context_processor
   def inject_user():
-      try:
-          verify_jwt_in_request()
-          identity = get_jwt_identity()
-          user_id = int(identity) if identity is not None else None
-          current_user = db.session.get(User, user_id) if user_id is not None else None
-          is_authenticated = current_user is not None
-      except Exception as e:
-          print(e)
-          is_authenticated = False
-          current_user = None
-      return dict(is_authenticated=is_authenticated, current_user=current_user)
\ No newline at end of file
+      current_user = current_identity()
+      return dict(is_authenticated=current_user is not None, current_user=current_user)
\ No newline at end of file
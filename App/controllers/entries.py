@@ -0,0 +1,13 @@
+import csv, json
+
+
+def read_entries(stream, format):
+    """Yield one dict per row of a csv or jsonl text stream (bulk log entries, users to import)."""
+    if format == 'csv':
+        yield from csv.DictReader(stream)
+    elif format == 'jsonl':
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f'Unsupported format: {format}')
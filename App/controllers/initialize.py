@@ -1,17 +1,22 @@
-from .user import create_student, create_staff
-from .activity import create_activity
+from .user import import_users
+from .activity import create_activity, reset_activity_catalog
+from .leaderboard import reset_leaderboard
 from App.database import db
 
 
 def initialize():
     db.drop_all()
     db.create_all()
-    create_student('bob', 'bobpass')
-    create_student('rob', 'robpass')
-    create_student('jim', 'jimpass')
-    create_student('phil', 'philpass')
-    create_staff('dean', 'deanpass')
-    create_staff('teacher', 'teacherpass')
+    reset_leaderboard()
+    reset_activity_catalog()
+    import_users([
+        {'username': 'bob', 'password': 'bobpass'},
+        {'username': 'rob', 'password': 'robpass'},
+        {'username': 'jim', 'password': 'jimpass'},
+        {'username': 'phil', 'password': 'philpass'},
+        {'username': 'dean', 'password': 'deanpass', 'type': 'staff'},
+        {'username': 'teacher', 'password': 'teacherpass', 'type': 'staff'}
+    ])
     create_activity("community_service")
     create_activity("volunteering")
     create_activity("help_desk")
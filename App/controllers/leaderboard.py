@@ -0,0 +1,178 @@
+import threading, time
+from bisect import bisect_left, insort
+from flask import current_app
+from sqlalchemy import select, insert, delete, or_, and_, func
+
+from App.models import Student, LeaderboardChange, TableVersion
+from App.database import db, use_replica
+
+
+class Leaderboard:
+    """In-process rank index ordered by (hours DESC, username ASC)."""
+
+    def __init__(self):
+        self._keys = []
+        self._by_id = {}
+        self._by_username = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+        # stored versions and the last leaderboard_change row this index reflects
+        self.user_version = self.student_version = None
+        self.last_change_id = 0
+
+    def load(self, rows):
+        with self._lock:
+            self._by_id = {sid: (-hours, username) for sid, username, hours in rows}
+            self._by_username = {key[1]: key for key in self._by_id.values()}
+            self._keys = sorted(self._by_id.values())
+            self.loaded = True
+
+    def update(self, student_id, username, hours):
+        key = (-hours, username)
+        with self._lock:
+            old = self._by_id.get(student_id)
+            if old == key:
+                return
+            if old is not None:
+                del self._keys[bisect_left(self._keys, old)]
+                self._by_username.pop(old[1], None)
+            insort(self._keys, key)
+            self._by_id[student_id] = key
+            self._by_username[username] = key
+
+    def remove(self, student_id):
+        with self._lock:
+            old = self._by_id.pop(student_id, None)
+            if old is not None:
+                del self._keys[bisect_left(self._keys, old)]
+                self._by_username.pop(old[1], None)
+
+    def top(self, k=None):
+        keys = self._keys[:k] if k is not None else list(self._keys)
+        return [(i + 1, username, -neg_hours) for i, (neg_hours, username) in enumerate(keys)]
+
+    def entry(self, student_id):
+        """(rank, username, hours) of one student, or None."""
+        key = self._by_id.get(student_id)
+        if key is None:
+            return None
+        return bisect_left(self._keys, key) + 1, key[1], -key[0]
+
+    def rank(self, username):
+        key = self._by_username.get(username)
+        if key is None:
+            return None
+        return bisect_left(self._keys, key) + 1, -key[0]
+
+    def __len__(self):
+        return len(self._keys)
+
+
+def _load_leaderboard(board, versions):
+    last_change_id = db.session.scalar(select(func.max(LeaderboardChange.id))) or 0
+    rows = db.session.execute(select(Student.id, Student.username, Student.hours)).all()
+    board.load(rows)
+    board.user_version, board.student_version = versions.get('user'), versions.get('student')
+    board.last_change_id = last_change_id
+
+def get_leaderboard():
+    """
+    This worker's rank index, caught up with commits from every process. A changed 'user'
+    version (students added, renamed or removed) reloads it; hour changes, which only bump
+    'student', are applied from leaderboard_change. Writers bump the version before they
+    record changes, so the version row lock commits changes in id order.
+    """
+    board = current_app.extensions.setdefault('leaderboard', Leaderboard())
+    # the index outlives the request, so it is filled from the primary even when reads use a replica
+    with use_replica(False):
+        versions = dict(db.session.execute(
+            select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(('user', 'student')))
+        ).all())
+        if not board.loaded or versions.get('user') != board.user_version:
+            _load_leaderboard(board, versions)
+        elif versions.get('student') != board.student_version:
+            changes = db.session.execute(
+                select(LeaderboardChange.id, LeaderboardChange.student_id)
+                .where(LeaderboardChange.id > board.last_change_id)
+                .order_by(LeaderboardChange.id)
+            ).all()
+            if changes and changes[0].id != board.last_change_id + 1:
+                # changes after last_change_id were pruned (or never committed); start over
+                _load_leaderboard(board, versions)
+            else:
+                refresh_leaderboard(dict.fromkeys(change.student_id for change in changes))
+                board.student_version = versions.get('student')
+                if changes:
+                    board.last_change_id = changes[-1].id
+    return board
+
+def reset_leaderboard():
+    current_app.extensions.pop('leaderboard', None)
+
+def update_leaderboard(student_id, username, hours):
+    # Nothing to maintain until the index has been built; it loads fresh from the db
+    board = current_app.extensions.get('leaderboard')
+    if board is not None and board.loaded:
+        board.update(student_id, username, hours)
+
+def refresh_leaderboard(student_ids):
+    """Re-read committed hours for the given students into the index."""
+    board = current_app.extensions.get('leaderboard')
+    if board is None or not board.loaded:
+        return
+    student_ids = list(student_ids)
+    with use_replica(False):
+        for i in range(0, len(student_ids), 500):
+            rows = db.session.execute(
+                select(Student.id, Student.username, Student.hours)
+                .where(Student.id.in_(student_ids[i:i + 500]))
+            ).all()
+            for sid, username, hours in rows:
+                board.update(sid, username, hours)
+
+def record_leaderboard_changes(student_ids):
+    """Queue the students for live leaderboard streams in every worker. Caller commits."""
+    rows = [{'student_id': sid} for sid in student_ids]
+    if rows:
+        db.session.execute(insert(LeaderboardChange), rows)
+        prune_leaderboard_changes()
+
+def prune_leaderboard_changes(force=False):
+    """
+    Delete all but the newest LEADERBOARD_STREAM_KEEP changes, at most once a minute per
+    process unless forced. Runs on the write path, so the table stays bounded whether or
+    not anyone is streaming. Caller commits; returns the number of rows deleted.
+    """
+    pruned_at = current_app.extensions.get('leaderboard_change_pruned_at', 0.0)
+    if not force and time.monotonic() - pruned_at < 60:
+        return 0
+    current_app.extensions['leaderboard_change_pruned_at'] = time.monotonic()
+    newest = db.session.scalar(select(func.max(LeaderboardChange.id)))
+    if newest is None:
+        return 0
+    keep = current_app.config['LEADERBOARD_STREAM_KEEP']
+    return db.session.execute(delete(LeaderboardChange).where(LeaderboardChange.id <= newest - keep)).rowcount
+
+def get_top_students(k=None):
+    return get_leaderboard().top(k)
+
+def get_student_rank(username):
+    return get_leaderboard().rank(username)
+
+def get_leaderboard_page(limit=25, after=None):
+    """Keyset page of (username, hours) rows after the (hours, username) cursor."""
+    stmt = (select(Student.username, Student.hours)
+            .order_by(Student.hours.desc(), Student.username.asc())
+            .limit(limit))
+    if after is not None:
+        hours, username = after
+        stmt = stmt.where(or_(Student.hours < hours,
+                              and_(Student.hours == hours, Student.username > username)))
+    rows = db.session.execute(stmt).all()
+    board = get_leaderboard()
+    page = []
+    for username, hours in rows:
+        ranked = board.rank(username)
+        page.append({'rank': ranked[0] if ranked else None, 'username': username, 'hours': hours})
+    next_cursor = (rows[-1].hours, rows[-1].username) if rows and len(rows) == limit else None
+    return page, next_cursor
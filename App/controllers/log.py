@@ -1,5 +1,13 @@
-from App.models import Log
-from App.database import db
+import time
+from sqlalchemy import select, insert
+from sqlalchemy.orm import aliased
+
+from App.models import Log, User, Student, Activity
+from App.database import db, iter_keyset
+from App.write_queue import get_write_queue
+from .user import increment_student_hours
+from .activity import add_activity_hours, get_activity_ids
+from .leaderboard import refresh_leaderboard
 
 
 def get_all_logs():
@@ -12,5 +20,174 @@ def get_all_logs_json():
     logs = [log.get_json() for log in logs]
     return logs
 
-def create_log():
-    return
\ No newline at end of file
+def iter_logs(student=None, activity=None, staff=None, since=None, until=None,
+              after_id=None, limit=None, chunk_size=500):
+    """
+    Yield (id, student, staff, activity, hours, created_at) log rows in id order.
+    Names are resolved to ids first so every filter lands on one of the log indexes.
+    """
+    student_user, staff_user = aliased(User), aliased(User)
+    query = (select(Log.id, student_user.username.label('student'), staff_user.username.label('staff'),
+                    Activity.name.label('activity'), Log.hours, Log.created_at)
+             .outerjoin(student_user, student_user.id == Log.student_id)
+             .outerjoin(staff_user, staff_user.id == Log.staff_id)
+             .outerjoin(Activity, Activity.id == Log.activity_id))
+    lookups = []
+    if student is not None:
+        lookups.append((Log.student_id, select(User.id).where(User.username == student)))
+    if staff is not None:
+        lookups.append((Log.staff_id, select(User.id).where(User.username == staff)))
+    if activity is not None:
+        lookups.append((Log.activity_id, select(Activity.id).where(Activity.name == activity)))
+    for column, lookup in lookups:
+        match = db.session.execute(lookup).scalar()
+        if match is None:
+            return iter(())
+        query = query.where(column == match)
+    if since is not None:
+        query = query.where(Log.created_at >= since)
+    if until is not None:
+        query = query.where(Log.created_at < until)
+    return iter_keyset(query, Log.id, after=after_id, limit=limit, chunk_size=chunk_size)
+
+def log_row_json(row):
+    data = row._asdict()
+    data['created_at'] = row.created_at.isoformat() if row.created_at else None
+    return data
+
+def record_hours(rows):
+    """
+    Apply logged (student_id, activity_id, hours) rows to the student totals and
+    the per-activity aggregates. Caller commits; returns {student_id: hours added}.
+    """
+    rows = list(rows)
+    deltas = {}
+    for student_id, _, hours in rows:
+        deltas[student_id] = deltas.get(student_id, 0) + hours
+    increment_student_hours(deltas)
+    add_activity_hours(rows)
+    return deltas
+
+def create_log(staff_id, student_id, activity_id, hours):
+    values = {'staff_id': staff_id, 'student_id': student_id, 'activity_id': activity_id, 'hours': hours}
+    log = Log(**values)
+    write_queue = get_write_queue()
+    if write_queue is not None:
+        # committed by the background writer; the returned log is not attached to this session
+        log.id = write_queue.put(Log, values)
+        return log
+    db.session.add(log)
+    record_hours([(student_id, activity_id, hours)])
+    db.session.commit()
+    refresh_leaderboard([student_id])
+    return log
+
+def write_entries(entries):
+    """
+    Insert queued (model, values) entries as one transaction, grouped per table,
+    and apply the hours of any logs. Returns the new ids in entry order.
+    """
+    ids = [None] * len(entries)
+    positions = {}
+    for i, (model, _) in enumerate(entries):
+        positions.setdefault(model, []).append(i)
+    for model, indexes in positions.items():
+        new_ids = db.session.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            [entries[i][1] for i in indexes]
+        ).all()
+        for i, new_id in zip(indexes, new_ids):
+            ids[i] = new_id
+    deltas = record_hours((values['student_id'], values['activity_id'], values['hours'])
+                          for model, values in entries if model is Log)
+    db.session.commit()
+    refresh_leaderboard(deltas.keys())
+    return ids
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _parse_hours(value):
+    """Whole positive hours from an int, a whole float or a digit string (csv); None otherwise."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, float):
+        value = int(value) if value.is_integer() else None
+    elif isinstance(value, str):
+        value = int(value) if value.strip().isdigit() else None
+    if not isinstance(value, int) or value <= 0:
+        return None
+    return value
+
+def _parse_log_entry(entry):
+    """(username, activity, hours) of one bulk entry; raises ValueError describing what is wrong with it."""
+    if not isinstance(entry, dict):
+        raise ValueError(f'Expected an object with username, hours and activity, got {entry!r}')
+    username, activity = entry.get('username'), entry.get('activity')
+    if not isinstance(username, str) or not username:
+        raise ValueError(f'Invalid username {username!r}')
+    if not isinstance(activity, str) or not activity:
+        raise ValueError(f'Invalid activity {activity!r}')
+    hours = _parse_hours(entry.get('hours'))
+    if hours is None:
+        raise ValueError(f"Invalid hours {entry.get('hours')!r}")
+    return username, activity, hours
+
+def bulk_log_hours(staff_id, entries, batch_size=1000):
+    """
+    Insert many log entries in a single transaction.
+    Each entry is checked for shape and types first (string username and activity, whole
+    positive hours); bad ones are reported per row. Usernames and activities are resolved
+    up front, logs are inserted in batches and student hours are incremented once per student.
+    """
+    start = time.perf_counter()
+    entries = list(entries)
+
+    parsed, errors = {}, []
+    for row, entry in enumerate(entries, start=1):
+        try:
+            parsed[row] = _parse_log_entry(entry)
+        except ValueError as e:
+            errors.append({'row': row, 'error': str(e)})
+
+    usernames = list({username for username, _, _ in parsed.values()})
+    student_ids = {}
+    for chunk in _chunks(usernames, 500):
+        rows = db.session.execute(
+            select(Student.username, Student.id).where(Student.username.in_(chunk))
+        ).all()
+        student_ids.update(rows)
+    activity_ids = get_activity_ids({activity for _, activity, _ in parsed.values()})
+
+    logs = []
+    for row, (username, activity, hours) in parsed.items():
+        student_id = student_ids.get(username)
+        activity_id = activity_ids.get(activity)
+        if student_id is None:
+            errors.append({'row': row, 'error': f"Student {username!r} does not exist"})
+        elif activity_id is None:
+            errors.append({'row': row, 'error': f"Activity {activity!r} does not exist"})
+        else:
+            logs.append({'staff_id': staff_id, 'student_id': student_id,
+                         'activity_id': activity_id, 'hours': hours})
+    errors.sort(key=lambda error: error['row'])
+
+    try:
+        for batch in _chunks(logs, batch_size):
+            db.session.execute(insert(Log), batch)
+        deltas = record_hours((log['student_id'], log['activity_id'], log['hours']) for log in logs)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    refresh_leaderboard(deltas.keys())
+
+    seconds = time.perf_counter() - start
+    return {
+        'inserted': len(logs),
+        'students': len(deltas),
+        'errors': errors,
+        'seconds': round(seconds, 3),
+        'rows_per_sec': round(len(entries) / seconds, 1) if seconds else None
+    }
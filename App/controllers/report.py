@@ -0,0 +1,84 @@
+import csv, io, json, time
+from datetime import datetime
+from sqlalchemy import select, func
+from sqlalchemy.orm import aliased
+
+from App.models import User, Activity, ActivityHours, Log
+from App.database import db
+
+def _hours_by_student():
+    return (select(User.username.label('student'), Activity.name.label('activity'), ActivityHours.hours)
+            .join(User, User.id == ActivityHours.student_id)
+            .join(Activity, Activity.id == ActivityHours.activity_id)
+            .order_by(ActivityHours.student_id, ActivityHours.activity_id))
+
+def _hours_by_activity():
+    return (select(Activity.name.label('activity'), User.username.label('student'), ActivityHours.hours)
+            .join(User, User.id == ActivityHours.student_id)
+            .join(Activity, Activity.id == ActivityHours.activity_id)
+            .order_by(ActivityHours.activity_id, ActivityHours.student_id))
+
+def _hours_by_staff():
+    totals = (select(Log.staff_id, Log.activity_id, func.count().label('logs'), func.sum(Log.hours).label('hours'))
+              .group_by(Log.staff_id, Log.activity_id)
+              .subquery())
+    return (select(User.username.label('staff'), Activity.name.label('activity'), totals.c.logs, totals.c.hours)
+            .outerjoin(User, User.id == totals.c.staff_id)
+            .outerjoin(Activity, Activity.id == totals.c.activity_id)
+            .order_by(totals.c.staff_id, totals.c.activity_id))
+
+def _log_history():
+    student_user, staff_user = aliased(User), aliased(User)
+    return (select(Log.id, student_user.username.label('student'), staff_user.username.label('staff'),
+                   Activity.name.label('activity'), Log.hours, Log.created_at)
+            .outerjoin(student_user, student_user.id == Log.student_id)
+            .outerjoin(staff_user, staff_user.id == Log.staff_id)
+            .outerjoin(Activity, Activity.id == Log.activity_id)
+            .order_by(Log.id))
+
+# --by choice -> statement builder
+REPORTS = {
+    'student': _hours_by_student,
+    'activity': _hours_by_activity,
+    'staff': _hours_by_staff,
+    'log': _log_history,
+}
+REPORT_FORMATS = ('csv', 'jsonl')
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def export_report(by, format, chunk_size=1000, on_progress=None):
+    """
+    Yield report `by` (a REPORTS key) as csv or jsonl text, one chunk per fetch of
+    chunk_size rows. Rows come from a server-side cursor and are serialized as they
+    arrive, so memory stays flat however large the table. on_progress(rows, seconds)
+    is called after every chunk.
+    """
+    if by not in REPORTS or format not in REPORT_FORMATS:
+        raise ValueError(f'Unknown report {by!r} or format {format!r}')
+    start = time.perf_counter()
+    result = db.session.execute(REPORTS[by](), execution_options={'stream_results': True, 'yield_per': chunk_size})
+    columns = list(result.keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    rows = 0
+    try:
+        if format == 'csv':
+            writer.writerow(columns)
+        for partition in result.partitions():
+            for row in partition:
+                if format == 'csv':
+                    writer.writerow([_value(value) for value in row])
+                else:
+                    buffer.write(json.dumps({column: _value(value) for column, value in zip(columns, row)}) + '\n')
+            rows += len(partition)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            if on_progress is not None:
+                on_progress(rows, time.perf_counter() - start)
+        if format == 'csv' and not rows:
+            yield buffer.getvalue()
+    finally:
+        result.close()
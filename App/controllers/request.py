@@ -0,0 +1,92 @@
+from sqlalchemy import select, insert, delete
+
+from App.models import Request, Log, User, Activity
+from App.database import db, iter_keyset
+from App.write_queue import get_write_queue
+from .log import record_hours
+from .leaderboard import refresh_leaderboard
+
+
+def create_request(student_id, activity_id, hours):
+    values = {'student_id': student_id, 'activity_id': activity_id, 'hours': hours}
+    request = Request(**values)
+    write_queue = get_write_queue()
+    if write_queue is not None:
+        request.id = write_queue.put(Request, values)
+        return request
+    db.session.add(request)
+    db.session.commit()
+    return request
+
+def iter_requests(activity=None, student=None, min_hours=None, after_id=None, limit=None, chunk_size=500):
+    """
+    Yield pending requests as (id, student, activity, hours) rows in id order.
+    Rows come from one joined query per keyset chunk, so memory stays flat for any backlog size.
+    """
+    query = (select(Request.id, User.username.label('student'), Activity.name.label('activity'), Request.hours)
+             .join(User, User.id == Request.student_id)
+             .join(Activity, Activity.id == Request.activity_id))
+    if activity is not None:
+        query = query.where(Activity.name == activity)
+    if student is not None:
+        query = query.where(User.username == student)
+    if min_hours is not None:
+        query = query.where(Request.hours >= min_hours)
+    return iter_keyset(query, Request.id, after=after_id, limit=limit, chunk_size=chunk_size)
+
+def confirm_requests(staff_id, action, request_ids=None, activity_name=None):
+    """
+    Approve or reject many requests in one transaction.
+    Logs and hours come from the rows DELETE ... RETURNING actually removed, so when two
+    callers confirm the same request only the one whose delete wins credits it; the other
+    reports it as not_found. Hours are added once per student.
+    Returns one {id, outcome, ...} entry per requested id (or per request of the activity).
+    """
+    if action not in ('approve', 'reject'):
+        raise ValueError("action must be 'approve' or 'reject'")
+    query = (select(Request.id, Request.student_id, User.username, Request.activity_id, Request.hours)
+             .join(User, User.id == Request.student_id)
+             .order_by(Request.id))
+    if activity_name is not None:
+        query = query.join(Activity, Activity.id == Request.activity_id).where(Activity.name == activity_name)
+        rows = db.session.execute(query).all()
+        request_ids = [row.id for row in rows]
+    else:
+        request_ids = list(dict.fromkeys(request_ids or []))
+        rows = []
+        for i in range(0, len(request_ids), 500):
+            rows += db.session.execute(query.where(Request.id.in_(request_ids[i:i + 500]))).all()
+
+    found = {row.id: row for row in rows}
+    ids = list(found)
+    deleted = []
+    deltas = {}
+    try:
+        for i in range(0, len(ids), 500):
+            deleted += db.session.execute(
+                delete(Request).where(Request.id.in_(ids[i:i + 500]))
+                .returning(Request.id, Request.student_id, Request.activity_id, Request.hours)
+            ).all()
+        if action == 'approve' and deleted:
+            db.session.execute(insert(Log), [
+                {'staff_id': staff_id, 'student_id': row.student_id, 'activity_id': row.activity_id, 'hours': row.hours}
+                for row in deleted
+            ])
+            deltas = record_hours([(row.student_id, row.activity_id, row.hours) for row in deleted])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    refresh_leaderboard(deltas.keys())
+
+    outcome = 'approved' if action == 'approve' else 'rejected'
+    removed = {row.id for row in deleted}
+    results = []
+    for request_id in request_ids:
+        row = found.get(request_id)
+        if row is None or request_id not in removed:
+            results.append({'id': request_id, 'outcome': 'not_found'})
+        else:
+            results.append({'id': request_id, 'outcome': outcome, 'student': row.username,
+                            'activity_id': row.activity_id, 'hours': row.hours})
+    return results
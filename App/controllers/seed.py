@@ -0,0 +1,93 @@
+import random, uuid
+from sqlalchemy import select, insert, update, delete, bindparam
+
+from App.models import User, Student, Staff, Activity, Log, Request
+from App.database import db
+from App.passwords import hash_password
+from .log import record_hours
+from .leaderboard import reset_leaderboard
+from .activity import reset_activity_catalog
+from .table_version import bump_table_versions
+
+SEED_PASSWORD = 'password'
+SEED_STUDENT_PREFIX, SEED_STAFF_PREFIX = 'stu', 'stf'
+SEED_ACTIVITIES = ['volunteering', 'tutoring', 'cleanup', 'mentoring', 'fundraising']
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _insert_chunks(table, rows, size=1000):
+    for i in range(0, len(rows), size):
+        db.session.execute(insert(table), rows[i:i + size])
+
+def _add_users(model, prefix, count, password):
+    """
+    Insert count users of model named prefix<id>. The database assigns the ids (so server
+    sequences advance), rows start under placeholder names and are renamed once their ids
+    are known; ids whose name is already taken are dropped. Returns the ids kept.
+    """
+    user = User.__table__
+    tag = uuid.uuid4().hex[:6]
+    rows = [{'username': f'{prefix}~{tag}~{n}', 'password': password,
+             'type': model.__mapper_args__['polymorphic_identity']} for n in range(count)]
+    ids = []
+    for i in range(0, len(rows), 1000):
+        ids += db.session.scalars(insert(user).returning(user.c.id, sort_by_parameter_order=True), rows[i:i + 1000]).all()
+    names = {f'{prefix}{i}': i for i in ids}
+    taken = set()
+    for chunk in _chunks(list(names), 500):
+        taken.update(db.session.scalars(select(user.c.username).where(user.c.username.in_(chunk))))
+    clashes = [names[name] for name in taken]
+    for chunk in _chunks(clashes, 500):
+        db.session.execute(delete(user).where(user.c.id.in_(chunk)))
+    ids = [i for i in ids if f'{prefix}{i}' not in taken]
+    if ids:
+        db.session.execute(update(user).where(user.c.id == bindparam('b_id')).values(username=bindparam('b_username')),
+                           [{'b_id': i, 'b_username': f'{prefix}{i}'} for i in ids])
+    rows = [{'id': i, 'hours': 0, 'accolade': ''} for i in ids] if model is Student else [{'id': i} for i in ids]
+    _insert_chunks(model.__table__, rows)
+    return ids
+
+def seed_data(students=0, staff=0, logs=0, requests=0, max_hours=8, seed=None):
+    """
+    Bulk-insert synthetic students, staff, logs and pending requests in one transaction.
+    Every seeded user's password is SEED_PASSWORD (hashed once and shared). Logs and
+    requests go to random existing students and activities; returns the counts inserted,
+    which leave out users whose stu<id>/stf<id> name was already taken.
+    """
+    rng = random.Random(seed)
+    try:
+        activity_ids = dict(db.session.execute(select(Activity.name, Activity.id)).all())
+        missing = [{'name': name} for name in SEED_ACTIVITIES if name not in activity_ids]
+        if missing:
+            _insert_chunks(Activity.__table__, missing)
+            bump_table_versions('activity')
+            activity_ids = dict(db.session.execute(select(Activity.name, Activity.id)).all())
+        activity_ids = list(activity_ids.values())
+
+        password = hash_password(SEED_PASSWORD)
+        students = len(_add_users(Student, SEED_STUDENT_PREFIX, students, password))
+        staff = len(_add_users(Staff, SEED_STAFF_PREFIX, staff, password))
+        student_ids = db.session.scalars(select(Student.id)).all()
+        staff_ids = db.session.scalars(select(Staff.id)).all()
+        if (logs and not (student_ids and staff_ids)) or (requests and not student_ids):
+            raise ValueError('Seeding logs needs students and staff; requests need students')
+
+        log_rows = [{'staff_id': rng.choice(staff_ids), 'student_id': rng.choice(student_ids),
+                     'activity_id': rng.choice(activity_ids), 'hours': rng.randint(1, max_hours)}
+                    for _ in range(logs)]
+        _insert_chunks(Log.__table__, log_rows)
+        record_hours((row['student_id'], row['activity_id'], row['hours']) for row in log_rows)
+        _insert_chunks(Request.__table__, [{'student_id': rng.choice(student_ids),
+                                            'activity_id': rng.choice(activity_ids),
+                                            'hours': rng.randint(1, max_hours)} for _ in range(requests)])
+        bump_table_versions('user', 'student')
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    reset_leaderboard()
+    reset_activity_catalog()
+    return {'students': students, 'staff': staff, 'logs': logs, 'requests': requests}
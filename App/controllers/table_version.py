@@ -0,0 +1,20 @@
+from sqlalchemy import select, update, func
+
+from App.models import TableVersion
+from App.database import db
+
+
+def bump_table_versions(*names):
+    """Mark tables as changed inside the caller's transaction; cached responses built on them go stale on commit."""
+    db.session.execute(
+        update(TableVersion)
+        .where(TableVersion.name.in_(names))
+        .values(version=TableVersion.version + 1, updated_at=func.current_timestamp())
+    )
+
+def get_table_versions(names):
+    """{name: (version, updated_at)} for the given tables, read in one query."""
+    rows = db.session.execute(
+        select(TableVersion.name, TableVersion.version, TableVersion.updated_at).where(TableVersion.name.in_(names))
+    )
+    return {name: (version, updated_at) for name, version, updated_at in rows}
@@ -1,32 +1,50 @@
+import time
+from sqlalchemy import select, update, insert, bindparam
 from App.models import User, Student, Staff
-from App.database import db
+from App.database import db, iter_keyset
+from App.passwords import hash_passwords
+from .leaderboard import update_leaderboard, refresh_leaderboard, reset_leaderboard, record_leaderboard_changes
+from .auth import invalidate_identity
+from .table_version import bump_table_versions
 
 def create_user(username, password):
     newuser = User(username=username, password=password, type="student")
     db.session.add(newuser)
+    bump_table_versions('user')
     db.session.commit()
     return newuser
 
 def create_student(username, password):
     newuser = Student(username=username, password=password)
     db.session.add(newuser)
+    bump_table_versions('user', 'student')
     db.session.commit()
+    update_leaderboard(newuser.id, newuser.username, newuser.hours)
     return newuser
 
 def create_staff(username, password):
     newuser = Staff(username=username, password=password)
     db.session.add(newuser)
+    bump_table_versions('user')
     db.session.commit()
     return newuser
 
+def increment_student_hours(deltas):
+    """Apply {student_id: hours} as one UPDATE ... SET hours = hours + ? executemany. Caller commits."""
+    if not deltas:
+        return
+    student = Student.__table__
+    stmt = (update(student)
+            .where(student.c.id == bindparam('b_id'))
+            .values(hours=student.c.hours + bindparam('b_hours')))
+    db.session.execute(stmt, [{'b_id': sid, 'b_hours': hours} for sid, hours in deltas.items()])
+    bump_table_versions('student')
+    record_leaderboard_changes(deltas)
+
 def add_student_hours(student_id, hours):
-    student = Student.query.get(student_id)
-    if student:
-        currentHours = student.hours
-        newHours = currentHours + hours
-        student.set_hours(newHours)
-        db.session.add(student)
-        db.session.commit()
+    increment_student_hours({student_id: hours})
+    db.session.commit()
+    refresh_leaderboard([student_id])
 
 def get_user_by_username(username):
     result = db.session.execute(db.select(User).filter_by(username=username))
@@ -38,6 +56,19 @@ def get_user(id):
 def get_all_users():
     return db.session.scalars(db.select(User)).all()
 
+def iter_users(user_type=None, after_id=None, limit=None, chunk_size=500):
+    """Yield (id, username, type) tuples in id order without loading User objects."""
+    query = select(User.id, User.username, User.type)
+    if user_type is not None:
+        query = query.where(User.type == user_type)
+    return iter_keyset(query, User.id, after=after_id, limit=limit, chunk_size=chunk_size)
+
+def get_users_page(limit=50, after_id=None, user_type=None):
+    """One page of (id, username, type) rows and the after_id of the next page (None on the last)."""
+    users = list(iter_users(user_type=user_type, after_id=after_id, limit=limit))
+    next_after_id = users[-1].id if users and len(users) == limit else None
+    return users, next_after_id
+
 def get_all_users_json():
     users = get_all_users()
     if not users:
@@ -49,7 +80,95 @@ def update_user(id, username):
     user = get_user(id)
     if user:
         user.username = username
+        bump_table_versions('user')
         # user is already in the session; no need to re-add
         db.session.commit()
+        invalidate_identity(user.id)
+        if user.type == 'student':
+            update_leaderboard(user.id, user.username, user.hours)
         return True
     return None
+
+USER_MODELS = {'student': Student, 'staff': Staff}
+
+def _parse_user_entry(entry):
+    """(username, password, type) of one import entry; raises ValueError describing what is wrong with it."""
+    if not isinstance(entry, dict):
+        raise ValueError(f'Expected an object with username, password and type, got {entry!r}')
+    username, password = entry.get('username'), entry.get('password')
+    user_type = entry.get('type') or 'student'
+    if not username or not password:
+        raise ValueError('username and password are required')
+    if not isinstance(username, str):
+        raise ValueError(f'Invalid username {username!r}')
+    if not isinstance(password, str):
+        raise ValueError('Invalid password: expected a string')
+    if not isinstance(user_type, str):
+        raise ValueError(f'Invalid type {user_type!r}')
+    return username, password, user_type
+
+def import_users(entries, batch_size=1000, skip_duplicates=True, on_progress=None):
+    """
+    Create many users from {username, password, type} dicts (type defaults to student).
+    Bad rows and usernames that already exist (checked with one IN lookup per 500 names)
+    are reported up front. Passwords are hashed on a process pool and users are inserted
+    batch_size at a time, one transaction per batch. With skip_duplicates=False nothing is
+    inserted if any row is rejected. on_progress(stage, done, total) reports 'hash' and 'insert'.
+    """
+    start = time.perf_counter()
+    entries = list(entries)
+    parsed, errors = {}, []
+    for row, entry in enumerate(entries, start=1):
+        try:
+            parsed[row] = _parse_user_entry(entry)
+        except ValueError as e:
+            errors.append({'row': row, 'error': str(e)})
+    usernames = list({username for username, _, _ in parsed.values()})
+    existing = set()
+    for i in range(0, len(usernames), 500):
+        existing.update(db.session.scalars(select(User.username).where(User.username.in_(usernames[i:i + 500]))))
+
+    accepted, seen = [], set()
+    max_length = User.username.type.length
+    for row, (username, password, user_type) in parsed.items():
+        if len(username) > max_length:
+            error = f'Username {username!r} is longer than {max_length} characters'
+        elif user_type not in USER_MODELS:
+            error = f'Invalid type {user_type!r}'
+        elif username in existing or username in seen:
+            error = f'Username {username!r} already exists'
+        else:
+            seen.add(username)
+            accepted.append((username, password, user_type))
+            continue
+        errors.append({'row': row, 'error': error})
+    errors.sort(key=lambda error: error['row'])
+
+    created = 0
+    if accepted and (skip_duplicates or not errors):
+        progress = (lambda done, total: on_progress('hash', done, total)) if on_progress else None
+        hashes = hash_passwords([password for _, password, _ in accepted], on_progress=progress)
+        for i in range(0, len(accepted), batch_size):
+            batches = {}
+            for (username, _, user_type), pwhash in zip(accepted[i:i + batch_size], hashes[i:i + batch_size]):
+                batches.setdefault(user_type, []).append({'username': username, 'password': pwhash})
+            try:
+                for user_type, rows in batches.items():
+                    db.session.execute(insert(USER_MODELS[user_type]), rows)
+                bump_table_versions('user', *batches)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            created += sum(len(rows) for rows in batches.values())
+            if on_progress is not None:
+                on_progress('insert', created, len(accepted))
+        reset_leaderboard()
+
+    seconds = time.perf_counter() - start
+    return {
+        'created': created,
+        'errors': errors,
+        'seconds': round(seconds, 3),
+        'users_per_sec': round(created / seconds, 1) if seconds else None
+    }
@@ -1,14 +1,292 @@
+import functools, threading, time
+from contextlib import contextmanager
+from flask import current_app, request
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+from sqlalchemy import event, select, update, insert, func
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql import Select
+from flask_sqlalchemy.session import Session
 
 
-db = SQLAlchemy()
+def _is_read(clause):
+    return isinstance(clause, Select) and clause._for_update_arg is None
+
+class AppSession(Session):
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        # plain SELECTs go to the replica inside use_replica()/replica_reads, unless this session
+        # has written: from then on it reads its own writes from the primary
+        if bind is None and 'replica' in self._db.engines:
+            if not _is_read(clause):
+                self.info['wrote'] = True
+            elif self.info.get('replica') and not self.info.get('wrote'):
+                engine = replica_engine()
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def commit(self):
+        # inside deferred_commits() a commit only flushes (and expires, like a real commit would);
+        # the block commits once at the end
+        if self.info.get('deferred_commits'):
+            self.flush()
+            self.expire_all()
+            return
+        super().commit()
+
+    def commit_now(self):
+        super().commit()
+
+
+db = SQLAlchemy(session_options={'class_': AppSession})
 
 def get_migrate(app):
+    from flask_migrate import Migrate
     return Migrate(app, db)
 
 def create_db():
     db.create_all()
     
+def gevent_patched():
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+def engine_options(config, uri=None):
+    """
+    Engine options for the configured database (or `uri`). Server databases get a
+    per-worker pool sized by DB_POOL_*; SQLite is tuned with pragmas on connect instead.
+    Anything set explicitly in SQLALCHEMY_ENGINE_OPTIONS wins.
+    """
+    options = {}
+    if make_url(uri or config['SQLALCHEMY_DATABASE_URI']).get_backend_name() != 'sqlite':
+        options.update(
+            pool_size=config['DB_POOL_SIZE'],
+            max_overflow=config['DB_MAX_OVERFLOW'],
+            pool_timeout=config['DB_POOL_TIMEOUT'],
+            pool_recycle=config['DB_POOL_RECYCLE'],
+            pool_pre_ping=config['DB_POOL_PRE_PING']
+        )
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    return options
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run PRAGMA name=value for each pragma on every new connection of a SQLite engine."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+    statements = [f'PRAGMA {name}={value}' for name, value in pragmas.items()]
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+def _gevent_wait_callback(connection, timeout=None):
+    # psycopg2 in async mode: yield to the gevent hub while the socket is not ready
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import extensions, OperationalError
+    while True:
+        state = connection.poll()
+        if state == extensions.POLL_OK:
+            return
+        elif state == extensions.POLL_READ:
+            wait_read(connection.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(connection.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f'Bad result from poll: {state}')
+
+def make_driver_cooperative(engine):
+    """
+    Under gevent, let psycopg2 queries yield to other greenlets instead of blocking
+    the worker. PyMySQL is pure Python and is already covered by socket patching.
+    """
+    if engine.dialect.driver == 'psycopg2' and gevent_patched():
+        from psycopg2 import extensions
+        extensions.set_wait_callback(_gevent_wait_callback)
+
+class ReplicaMonitor:
+    """
+    Decides whether the replica may serve reads. Every DB_REPLICA_CHECK_INTERVAL seconds
+    it bumps a heartbeat row in table_version on the primary and reads it back from both
+    databases. Every write replicates in order, so a replica holding the newest heartbeat
+    is current, and one holding an older heartbeat trails by the gap between the two beats.
+    Reads fall back to the primary once that gap reaches DB_REPLICA_MAX_LAG. A replica that
+    stopped replicating falls behind by one more interval each check, whatever the writes
+    were. An unreachable replica counts as stale.
+    """
+
+    HEARTBEAT = 'heartbeat'
+
+    def __init__(self, app):
+        self.app = app
+        self.behind = self.lag = None
+        self.checked_at = None
+        self._lock = threading.Lock()
+
+    def beat(self, connection):
+        """Advance the primary's heartbeat; returns its (version, updated_at)."""
+        table = db.metadata.tables['table_version']
+        row = table.c.name == self.HEARTBEAT
+        if not connection.execute(update(table).where(row).values(
+                version=table.c.version + 1, updated_at=func.current_timestamp())).rowcount:
+            connection.execute(insert(table).values(name=self.HEARTBEAT, version=1, updated_at=func.current_timestamp()))
+        return connection.execute(select(table.c.version, table.c.updated_at).where(row)).one()
+
+    def measure(self):
+        """(behind, seconds): whether the replica is missing the newest heartbeat and by how long; raises if either cannot be read."""
+        table = db.metadata.tables['table_version']
+        with db.engines[None].begin() as connection:
+            version, beat_at = self.beat(connection)
+        with db.engines['replica'].connect() as connection:
+            replica = connection.execute(
+                select(table.c.version, table.c.updated_at).where(table.c.name == self.HEARTBEAT)
+            ).first()
+        if replica is None:
+            return True, float('inf')
+        if replica.version >= version:
+            return False, 0.0
+        return True, max(0.0, (beat_at - replica.updated_at).total_seconds())
+
+    def fresh(self):
+        config = self.app.config
+        if self.checked_at is None or time.monotonic() - self.checked_at >= config['DB_REPLICA_CHECK_INTERVAL']:
+            # one thread re-checks while the others use the previous answer
+            if self._lock.acquire(blocking=False):
+                try:
+                    self.behind, self.lag = self.measure()
+                except Exception:
+                    self.app.logger.warning('replica check failed; reading from the primary', exc_info=True)
+                    self.behind = self.lag = None
+                finally:
+                    self.checked_at = time.monotonic()
+                    self._lock.release()
+        return self.acceptable(self.behind, self.lag)
+
+    def acceptable(self, behind, lag):
+        return lag is not None and (not behind or lag < self.app.config['DB_REPLICA_MAX_LAG'])
+
+def replica_engine():
+    """The replica engine if DB_REPLICA_URI is set and the replica is fresh enough, else None."""
+    monitor = current_app.extensions.get('db_replica')
+    if monitor is None or not monitor.fresh():
+        return None
+    return db.engines['replica']
+
+@contextmanager
+def use_replica(enabled=True):
+    """Send this block's reads to the replica (or, with enabled=False, keep them on the primary)."""
+    session = db.session()
+    previous = session.info.get('replica')
+    session.info['replica'] = enabled
+    try:
+        yield
+    finally:
+        session.info['replica'] = previous
+
+def replica_reads(func):
+    """
+    View decorator: the rest of the request, including a streamed body, reads from the
+    replica. Put it below role_required so the caller's identity comes from the primary.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        db.session().info['replica'] = True
+        return func(*args, **kwargs)
+    return wrapper
+
+# set on clients that have just written; their reads skip the replica until it expires
+PRIMARY_COOKIE = 'read_primary'
+
+def setup_replica(app):
+    """
+    Route reads through DB_REPLICA_URI. A request that writes sets a cookie that keeps
+    the client's reads on the primary for DB_REPLICA_MAX_LAG seconds, so it sees its
+    own writes on the next request as well.
+    """
+    app.extensions['db_replica'] = ReplicaMonitor(app)
+
+    # create_app pushes a long-lived app context, so the session can outlive a request; start each one clean
+    @app.before_request
+    def reset_routing():
+        session = db.session()
+        session.info.pop('replica', None)
+        session.info['wrote'] = PRIMARY_COOKIE in request.cookies
+
+    @app.after_request
+    def pin_writer(response):
+        if db.session().info.get('wrote') and PRIMARY_COOKIE not in request.cookies:
+            response.set_cookie(PRIMARY_COOKIE, '1', max_age=max(1, int(app.config['DB_REPLICA_MAX_LAG'])),
+                                httponly=True, samesite='Lax')
+        return response
+
+def sync_sqlite_replica():
+    """Copy the primary SQLite database over the replica file, standing in for replication locally."""
+    primary, replica = db.engines[None], db.engines['replica']
+    if primary.dialect.name != 'sqlite' or replica.dialect.name != 'sqlite':
+        raise ValueError('only SQLite replicas can be synced; server databases replicate themselves')
+    source, target = primary.raw_connection(), replica.raw_connection()
+    try:
+        source.driver_connection.backup(target.driver_connection)
+    finally:
+        source.close()
+        target.close()
+    current_app.extensions['db_replica'].checked_at = None
+
 def init_db(app):
-    db.init_app(app)
\ No newline at end of file
+    replica_uri = app.config['DB_REPLICA_URI']
+    if replica_uri:
+        app.config.setdefault('SQLALCHEMY_BINDS', {})['replica'] = {'url': replica_uri, **engine_options(app.config, replica_uri)}
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    db.init_app(app)
+    # the replica mirrors the primary's tables and has no models of its own; keep create_all/drop_all off it
+    db.metadatas.pop('replica', None)
+    with app.app_context():
+        for engine in db.engines.values():
+            apply_sqlite_pragmas(engine, app.config['SQLITE_PRAGMAS'])
+            make_driver_cooperative(engine)
+    if replica_uri:
+        setup_replica(app)
+
+@contextmanager
+def deferred_commits():
+    """
+    Run a block of work as one transaction even if it calls db.session.commit().
+    Yields a function that commits what has been done so far; any exception rolls back
+    everything since the last such commit.
+    """
+    session = db.session()
+    session.info['deferred_commits'] = True
+    try:
+        yield session.commit_now
+        session.commit_now()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        session.info.pop('deferred_commits', None)
+
+def iter_keyset(stmt, column, after=None, limit=None, chunk_size=500):
+    """
+    Yield rows of stmt ordered by the unique column, fetching chunk_size rows per query
+    with WHERE column > last seen value. Memory stays flat however many rows match.
+    The column must be the first one selected by stmt.
+    """
+    stmt = stmt.order_by(column)
+    last, remaining = after, limit
+    while remaining is None or remaining > 0:
+        size = chunk_size if remaining is None else min(chunk_size, remaining)
+        query = stmt.limit(size)
+        if last is not None:
+            query = query.where(column > last)
+        rows = db.session.execute(query).all()
+        yield from rows
+        if len(rows) < size:
+            return
+        last = rows[-1][0]
+        if remaining is not None:
+            remaining -= len(rows)
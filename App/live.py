@@ -0,0 +1,158 @@
+import os, queue, threading, time
+from flask import current_app
+from sqlalchemy import select, func
+
+from App.database import db
+from App.models import LeaderboardChange
+from App.controllers import get_leaderboard, get_top_students, refresh_leaderboard, reset_leaderboard
+
+# put on a subscriber's queue in place of the deltas it fell too far behind to receive
+RESYNC = object()
+
+
+class LeaderboardFeed:
+    """
+    Fans committed hour changes out to this worker's leaderboard streams. Writers append
+    the students they changed to leaderboard_change in the same transaction; one poller
+    per worker tails that table, so a commit made by any worker or CLI command reaches
+    every worker's subscribers without a broker. The poller only queries while someone
+    is subscribed. Each poll also compares the top `window` ranks with the previous poll,
+    so streams learn about students displaced by the ones that changed.
+    """
+
+    def __init__(self, app, poll_interval=0.5, keep=10000, queue_size=100, window=100):
+        self.app = app
+        self.poll_interval = poll_interval
+        self.keep = keep
+        self.queue_size = queue_size
+        self.window = window
+        self.last_id = None
+        self._top = []
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _start(self):
+        # one poller per forked worker, started by its first subscriber
+        self._poller = threading.Thread(target=self._run, name='leaderboard-feed', daemon=True)
+        self._poller.start()
+        self._pid = os.getpid()
+
+    def subscribe(self):
+        """A queue that receives {'students': changed, 'ranks': moved} lists of {rank, username, hours}, or RESYNC."""
+        subscriber = queue.Queue(self.queue_size)
+        with self._lock:
+            if self._pid != os.getpid():
+                self._start()
+            if self.last_id is None:
+                self.last_id = db.session.scalar(select(func.max(LeaderboardChange.id))) or 0
+                # changes other workers made while nobody here was listening never reached the index
+                reset_leaderboard()
+                self._top = get_top_students(self.window)
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def snapshot(self, limit):
+        with self.app.app_context():
+            return {'students': [{'rank': rank, 'username': username, 'hours': hours}
+                                 for rank, username, hours in get_top_students(limit)]}
+
+    def events(self, subscriber, limit, heartbeat=15.0):
+        """
+        Yield (event, data) pairs for one stream: a snapshot of the top `limit` students,
+        then for each poll the students whose hours changed ('hours') and every rank up to
+        `limit` whose student or hours changed ('ranks'), or None every `heartbeat` idle seconds.
+        """
+        try:
+            yield 'snapshot', self.snapshot(limit)
+            while True:
+                try:
+                    item = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield None
+                    continue
+                if item is RESYNC:
+                    yield 'snapshot', self.snapshot(limit)
+                    continue
+                yield 'hours', item['students']
+                ranks = [entry for entry in item['ranks'] if entry['rank'] <= limit]
+                if ranks:
+                    yield 'ranks', ranks
+        finally:
+            self.unsubscribe(subscriber)
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                with self.app.app_context():
+                    self.poll()
+            except Exception:
+                # a locked or briefly unavailable database only delays this round
+                self.app.logger.exception('leaderboard feed poll failed')
+
+    def poll(self):
+        """Read changes committed since the last poll and publish them; returns how many students changed."""
+        with self._lock:
+            if not self._subscribers:
+                self.last_id = None
+                return 0
+            last_id = self.last_id
+        rows = db.session.execute(
+            select(LeaderboardChange.id, LeaderboardChange.student_id)
+            .where(LeaderboardChange.id > last_id)
+            .order_by(LeaderboardChange.id)
+            .limit(self.keep)
+        ).all()
+        if not rows:
+            return 0
+        self.last_id = rows[-1].id
+        student_ids = list(dict.fromkeys(row.student_id for row in rows))
+        # other workers' commits reach this worker's index here as well
+        refresh_leaderboard(student_ids)
+        board = get_leaderboard()
+        deltas = []
+        for student_id in student_ids:
+            entry = board.entry(student_id)
+            if entry is not None:
+                deltas.append({'rank': entry[0], 'username': entry[1], 'hours': entry[2]})
+        top = board.top(self.window)
+        # a student moving up pushes everyone between its old and new rank down one
+        moved = [{'rank': rank, 'username': username, 'hours': hours}
+                 for i, (rank, username, hours) in enumerate(top)
+                 if i >= len(self._top) or self._top[i] != (rank, username, hours)]
+        self._top = top
+        self._publish({'students': deltas, 'ranks': moved})
+        return len(deltas)
+
+    def _publish(self, item):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(item)
+            except queue.Full:
+                # a slow client gets a fresh snapshot instead of an ever-growing backlog
+                while True:
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        break
+                subscriber.put_nowait(RESYNC)
+
+
+def get_leaderboard_feed():
+    """This app's LeaderboardFeed, created on first use."""
+    feed = current_app.extensions.get('leaderboard_feed')
+    if feed is None:
+        app = current_app._get_current_object()
+        feed = app.extensions.setdefault('leaderboard_feed', LeaderboardFeed(
+            app,
+            poll_interval=app.config['LEADERBOARD_STREAM_POLL_INTERVAL'],
+            keep=app.config['LEADERBOARD_STREAM_KEEP']
+        ))
+    return feed
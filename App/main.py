@@ -1,40 +1,67 @@
-import os
+import os, threading
 from flask import Flask, render_template
-from flask_uploads import DOCUMENTS, IMAGES, TEXT, UploadSet, configure_uploads
-from flask_cors import CORS
-from werkzeug.utils import secure_filename
-from werkzeug.datastructures import  FileStorage
 
 
 from App.database import init_db
 from App.config import load_config
+from App.profiling import setup_profiler
+from App.metrics import setup_metrics
+from App.write_queue import setup_write_queue
 
 
 from App.controllers import (
     setup_jwt,
-    add_auth_context
+    add_auth_context,
+    write_entries
 )
 
-from App.views import views, setup_admin
-
 def add_views(app):
+    from App.views import views
     for view in views:
         app.register_blueprint(view)
 
-def create_app(overrides={}):
-    app = Flask(__name__, static_url_path='/static')
-    load_config(app, overrides)
+def setup_web(app):
+    # Only needed to serve HTTP; these imports are the bulk of startup time
+    from flask_uploads import DOCUMENTS, IMAGES, TEXT, UploadSet, configure_uploads
+    from flask_cors import CORS
+    from App.views import setup_admin
     CORS(app)
-    add_auth_context(app)
     photos = UploadSet('photos', TEXT + DOCUMENTS + IMAGES)
     configure_uploads(app, photos)
     add_views(app)
+    setup_admin(app)
+
+def defer_web_setup(app):
+    """Run setup_web just before the first request instead of at startup."""
+    wsgi_app = app.wsgi_app
+    lock = threading.Lock()
+
+    def lazy_wsgi_app(environ, start_response):
+        if app.wsgi_app is lazy_wsgi_app:
+            with lock:
+                if app.wsgi_app is lazy_wsgi_app:
+                    setup_web(app)
+                    app.wsgi_app = wsgi_app
+        return wsgi_app(environ, start_response)
+
+    app.wsgi_app = lazy_wsgi_app
+
+def create_app(overrides={}, lean=False):
+    app = Flask(__name__, static_url_path='/static')
+    load_config(app, overrides)
+    add_auth_context(app)
     init_db(app)
+    setup_profiler(app)
+    setup_metrics(app)
+    setup_write_queue(app, write_entries)
     jwt = setup_jwt(app)
-    setup_admin(app)
+    if lean:
+        defer_web_setup(app)
+    else:
+        setup_web(app)
     @jwt.invalid_token_loader
     @jwt.unauthorized_loader
     def custom_unauthorized_response(error):
         return render_template('401.html', error=error), 401
     app.app_context().push()
-    return app
\ No newline at end of file
+    return app
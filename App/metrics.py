@@ -0,0 +1,179 @@
+import glob, json, os, threading, time
+from flask import request
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metrics:
+    """
+    Request latency histograms, status counts and an in-flight gauge for one worker.
+    With a directory set, each worker snapshots its state to <dir>/worker-<pid>.json
+    and `render` merges every worker's file, so any worker can answer a scrape.
+    """
+
+    def __init__(self, directory=None, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        self.histograms = {}
+        self.statuses = {}
+        self.in_flight = 0
+        self._dirty = False
+        self._flusher = None
+
+    def _changed(self):
+        # a worker forked from a preloaded app must not report its parent's numbers as its own
+        if self.pid != os.getpid():
+            self._reset()
+        self._dirty = True
+        if self.directory is not None and self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        # snapshots are written off the request path, at most once per flush_interval
+        while True:
+            time.sleep(self.flush_interval)
+            if self._dirty:
+                self.flush()
+
+    def start(self):
+        with self._lock:
+            self._changed()
+            self.in_flight += 1
+
+    def observe(self, method, route, status, seconds):
+        with self._lock:
+            self._changed()
+            self.in_flight -= 1
+            histogram = self.histograms.get((method, route))
+            if histogram is None:
+                histogram = self.histograms[(method, route)] = [[0] * (len(BUCKETS) + 1), 0.0]
+            counts = histogram[0]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            histogram[1] += seconds
+            key = (method, route, status)
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            self._dirty = False
+            return {
+                'pid': self.pid,
+                'in_flight': self.in_flight,
+                'histograms': [[method, route, list(counts), total]
+                               for (method, route), (counts, total) in self.histograms.items()],
+                'statuses': [[method, route, status, count]
+                             for (method, route, status), count in self.statuses.items()]
+            }
+
+    def flush(self):
+        """Atomically replace this worker's snapshot file."""
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'worker-{self.pid}.json')
+        temp = f'{path}.tmp'
+        # serialized so an older snapshot never replaces a newer one
+        with self._flush_lock:
+            with open(temp, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(temp, path)
+
+    def snapshots(self):
+        if self.directory is None:
+            return [self.snapshot()]
+        self.flush()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, 'worker-*.json')):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self):
+        """All workers' metrics in the Prometheus text exposition format."""
+        histograms, statuses, in_flight = {}, {}, 0
+        for snapshot in self.snapshots():
+            # exited workers keep contributing their counters, but not requests in flight
+            if _alive(snapshot['pid']):
+                in_flight += snapshot['in_flight']
+            for method, route, counts, total in snapshot['histograms']:
+                merged = histograms.setdefault((method, route), [[0] * len(counts), 0.0])
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+            for method, route, status, count in snapshot['statuses']:
+                key = (method, route, status)
+                statuses[key] = statuses.get(key, 0) + count
+
+        lines = ['# HELP http_request_duration_seconds Request latency by route.',
+                 '# TYPE http_request_duration_seconds histogram']
+        for (method, route), (counts, total) in sorted(histograms.items()):
+            labels = f'method="{_escape(method)}",route="{_escape(route)}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {total:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {cumulative}')
+        lines += ['# HELP http_requests_total Requests by route and status.',
+                  '# TYPE http_requests_total counter']
+        for (method, route, status), count in sorted(statuses.items()):
+            lines.append(f'http_requests_total{{method="{_escape(method)}",route="{_escape(route)}",'
+                         f'status="{status}"}} {count}')
+        lines += ['# HELP http_requests_in_flight Requests currently being served.',
+                  '# TYPE http_requests_in_flight gauge',
+                  f'http_requests_in_flight {in_flight}']
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def setup_metrics(app):
+    """Time every request the app serves, whichever blueprint handles it."""
+    if not app.config.get('METRICS_ENABLED'):
+        return
+    metrics = app.extensions['metrics'] = Metrics(app.config.get('METRICS_DIR'),
+                                                  app.config['METRICS_FLUSH_INTERVAL'])
+
+    @app.before_request
+    def start_request_timer():
+        request.environ['app.metrics_start'] = time.perf_counter()
+        metrics.start()
+
+    @app.after_request
+    def record_status(response):
+        request.environ['app.metrics_status'] = response.status_code
+        return response
+
+    @app.teardown_request
+    def observe_request(exc):
+        started = request.environ.pop('app.metrics_start', None)
+        if started is None:
+            return
+        # unmatched urls share one label so scanners cannot blow up the series count
+        route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        status = request.environ.get('app.metrics_status', 500)
+        metrics.observe(request.method, route, status, time.perf_counter() - started)
@@ -3,4 +3,8 @@ from .staff import *
 from .student import *
 from .log import *
 from .request import *
-from .activity import *
\ No newline at end of file
+from .activity import *
+from .activity_hours import *
+from .table_version import *
+from .leaderboard_change import *
+from .award import *
\ No newline at end of file
@@ -5,5 +5,15 @@ class Activity(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
 
+    __table_args__ = (
+        db.Index('ix_activity_name', 'name', unique=True),
+    )
+
     def __init__(self, name):
-        self.name = name
\ No newline at end of file
+        self.name = name
+
+class ActivityMilestone(db.Model):
+    """One milestone threshold (in hours) of an activity; activities without any use MILESTONES."""
+    __tablename__ = 'activity_milestone'
+    activity_id = db.Column(db.Integer, db.ForeignKey('activity.id'), primary_key=True)
+    hours = db.Column(db.Integer, primary_key=True)
@@ -0,0 +1,13 @@
+from App.database import db
+
+class ActivityHours(db.Model):
+    """Running total of logged hours per student and activity."""
+    __tablename__ = 'activity_hours'
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), primary_key=True)
+    activity_id = db.Column(db.Integer, db.ForeignKey('activity.id'), primary_key=True)
+    hours = db.Column(db.Integer, nullable=False, default=0)
+
+    def __init__(self, student_id, activity_id, hours=0):
+        self.student_id = student_id
+        self.activity_id = activity_id
+        self.hours = hours
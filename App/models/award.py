@@ -0,0 +1,16 @@
+from App.database import db
+
+class Award(db.Model):
+    """A milestone a student crossed in one activity, recorded by the hours write that crossed it."""
+    __tablename__ = 'award'
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
+    activity_id = db.Column(db.Integer, db.ForeignKey('activity.id'), nullable=False)
+    milestone = db.Column(db.Integer, nullable=False)
+    awarded_at = db.Column(db.DateTime, nullable=False, server_default=db.func.current_timestamp())
+
+    __table_args__ = (
+        # one award per milestone; also serves the per-student feed
+        db.UniqueConstraint('student_id', 'activity_id', 'milestone', name='uq_award_student_activity_milestone'),
+        db.Index('ix_award_activity', 'activity_id', 'id'),
+    )
@@ -0,0 +1,7 @@
+from App.database import db
+
+class LeaderboardChange(db.Model):
+    """A student whose hours changed, in commit order; every worker tails this table to push live updates."""
+    __tablename__ = 'leaderboard_change'
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, nullable=False)
@@ -7,11 +7,21 @@ class Log(db.Model):
     staff_id = db.Column(db.Integer, db.ForeignKey('staff.id'))
     student_id = db.Column(db.Integer, db.ForeignKey('student.id'))
     activity_id = db.Column(db.Integer, db.ForeignKey('activity.id'))
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.current_timestamp())
 
     student = db.relationship("Student", backref='log')
     staff = db.relationship("Staff", backref='log')
     activity = db.relationship("Activity", backref='log')
 
+    __table_args__ = (
+        # per-student totals are answered from the index alone
+        db.Index('ix_log_student_activity', 'student_id', 'activity_id', 'hours'),
+        db.Index('ix_log_student_created', 'student_id', 'created_at'),
+        db.Index('ix_log_activity_created', 'activity_id', 'created_at'),
+        db.Index('ix_log_staff_created', 'staff_id', 'created_at'),
+        db.Index('ix_log_created', 'created_at'),
+    )
+
     def __init__(self, staff_id, student_id, activity_id, hours):
         self.staff_id = staff_id
         self.student_id = student_id
@@ -23,5 +33,7 @@ class Log(db.Model):
             'id': self.id,
             'student_id': self.student_id,
             'staff_id': self.staff_id,
-            'hours': self.hours
+            'activity_id': self.activity_id,
+            'hours': self.hours,
+            'created_at': self.created_at.isoformat() if self.created_at else None
         }
\ No newline at end of file
@@ -3,8 +3,8 @@ from App.database import db
 class Request(db.Model):
     __tablename__ = 'request'
     id = db.Column(db.Integer, primary_key=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('student.id'))
-    activity_id = db.Column(db.Integer, db.ForeignKey('activity.id'))
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), index=True)
+    activity_id = db.Column(db.Integer, db.ForeignKey('activity.id'), index=True)
     hours = db.Column(db.Integer, nullable=False)
 
     student = db.relationship("Student", backref='request')
@@ -4,11 +4,16 @@ from .user import User
 class Student(User):
     __tablename__ = 'student'
     hours = db.Column(db.Integer, nullable=False, default=0)
-    accolade = db.Column(db.String(120), nullable=False, default='')
+    # one "<activity>: <milestone>" line per activity, so it grows with the catalog
+    accolade = db.Column(db.Text, nullable=False, default='')
     id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
     __mapper_args__ = {
         'polymorphic_identity': 'student'
     }
+    # Leaderboard walks students by hours descending; username tie-break comes from user's unique index
+    __table_args__ = (
+        db.Index('ix_student_hours', hours.desc(), id),
+    )
 
     def __init__(self, username, password):
         super().__init__(username, password)
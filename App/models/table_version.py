@@ -0,0 +1,18 @@
+from sqlalchemy import event, DDL
+from App.database import db
+
+# tables whose changes invalidate cached HTTP responses and per-worker reference data
+VERSIONED_TABLES = ('user', 'student', 'activity')
+
+class TableVersion(db.Model):
+    """Change counter per table; writers bump it in their transaction, readers build ETags from it."""
+    __tablename__ = 'table_version'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, server_default=db.func.current_timestamp())
+
+# every tracked table gets its row when the schema is created, so bumping is a plain UPDATE
+event.listen(TableVersion.__table__, 'after_create', DDL(
+    'INSERT INTO table_version (name, version, updated_at) VALUES '
+    + ', '.join(f"('{name}', 0, CURRENT_TIMESTAMP)" for name in VERSIONED_TABLES)
+))
@@ -1,5 +1,5 @@
-from werkzeug.security import check_password_hash, generate_password_hash
 from App.database import db
+from App.passwords import hash_password, verify_password, needs_rehash
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -24,9 +24,13 @@ class User(db.Model):
 
     def set_password(self, password):
         """Create hashed password."""
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
     
     def check_password(self, password):
         """Check hashed password."""
-        return check_password_hash(self.password, password)
+        return verify_password(self.password, password)
+
+    def password_needs_rehash(self):
+        """True when the stored hash uses different parameters than PASSWORD_HASH_METHOD."""
+        return needs_rehash(self.password)
 
@@ -0,0 +1,109 @@
+import itertools, multiprocessing, os, threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from App.database import gevent_patched
+
+DEFAULT_METHOD = 'scrypt'
+DEFAULT_WORKERS = 4
+
+_pool = None
+_pool_lock = threading.Lock()
+_method_prefixes = {}
+
+
+def _setting(key, default):
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+def _get_pool():
+    """
+    Bounded pool of real OS threads for hashing; None means hash inline.
+    Under gevent, gevent's own threadpool is used so the hub keeps serving other
+    greenlets while a hash runs (hashlib releases the GIL for scrypt/pbkdf2).
+    """
+    global _pool
+    if _pool is None:
+        workers = int(_setting('PASSWORD_HASH_WORKERS', DEFAULT_WORKERS))
+        if workers <= 0:
+            return None
+        with _pool_lock:
+            if _pool is None:
+                if gevent_patched():
+                    from gevent.threadpool import ThreadPool
+                    _pool = ThreadPool(workers)
+                else:
+                    _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pwhash')
+    return _pool
+
+def _reset_pool():
+    # Pools do not survive a fork; each gunicorn worker builds its own.
+    global _pool
+    _pool = None
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pool)
+
+def _run(fn, *args):
+    pool = _get_pool()
+    if pool is None:
+        return fn(*args)
+    if isinstance(pool, ThreadPoolExecutor):
+        return pool.submit(fn, *args).result()
+    return pool.apply(fn, args)
+
+
+def hash_method():
+    return _setting('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+
+def hash_password(password, method=None):
+    return _run(generate_password_hash, password, method or hash_method())
+
+def hash_passwords(passwords, method=None, processes=None, on_progress=None):
+    """
+    Hash many passwords at once, in input order, spread over a process pool with one
+    process per core by default (PASSWORD_HASH_PROCESSES). Under gevent, forking from a
+    worker is avoided and the hashing thread pool is used instead; hashlib releases the
+    GIL there, so that also spreads over cores. on_progress(done, total) is called as hashes complete.
+    """
+    passwords = list(passwords)
+    method = method or hash_method()
+    if processes is None:
+        processes = int(_setting('PASSWORD_HASH_PROCESSES', 0)) or os.cpu_count() or 1
+    hashes, pool = [], None
+    if gevent_patched() and _get_pool() is not None:
+        results = _get_pool().imap(generate_password_hash, passwords, itertools.repeat(method))
+    elif min(processes, len(passwords)) > 1:
+        # forkserver children start clean, without the parent's app, sockets or threads
+        context = multiprocessing.get_context(
+            'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+        pool = ProcessPoolExecutor(min(processes, len(passwords)), mp_context=context)
+        chunksize = max(1, min(64, len(passwords) // (processes * 4)))
+        results = pool.map(generate_password_hash, passwords, itertools.repeat(method), chunksize=chunksize)
+    else:
+        results = (generate_password_hash(password, method) for password in passwords)
+    try:
+        for pwhash in results:
+            hashes.append(pwhash)
+            if on_progress is not None:
+                on_progress(len(hashes), len(passwords))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return hashes
+
+def verify_password(pwhash, password):
+    return _run(check_password_hash, pwhash, password)
+
+def method_prefix(method):
+    """Normalized parameter string werkzeug writes for a method, e.g. "scrypt:32768:8:1"."""
+    prefix = _method_prefixes.get(method)
+    if prefix is None:
+        prefix = generate_password_hash('', method).split('$', 1)[0]
+        _method_prefixes[method] = prefix
+    return prefix
+
+def needs_rehash(pwhash, method=None):
+    return pwhash.split('$', 1)[0] != method_prefix(method or hash_method())
@@ -0,0 +1,5 @@
+from .startup import *
+from .db_writes import *
+from .group_commit import *
+from .bench import *
+from .load import *
\ No newline at end of file
@@ -0,0 +1,98 @@
+import json, os, platform, subprocess, sys, tempfile
+
+__all__ = ['BENCHMARKS', 'run_benchmarks', 'compare_to_baseline']
+
+BENCHMARKS = ['leaderboard', 'accolades', 'request_listing', 'request_approval', 'login', 'api_users']
+
+# Runs in a fresh interpreter per data size: seeds a scratch database, then times each path
+_PROBE = """
+import json, statistics, time
+from sqlalchemy import select
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Staff, Student, Request
+from App.controllers import (seed_data, reset_leaderboard, get_top_students, recompute_accolades,
+                             iter_requests, confirm_requests, SEED_PASSWORD)
+
+size, repeat = {size}, {repeat}
+app = create_app({{'SQLALCHEMY_DATABASE_URI': {uri!r}}}, lean=True)
+create_db()
+seed_data(students=size, staff=max(1, size // 50), logs=size * 10, requests=size + 50 * repeat, seed=1)
+staff_id = db.session.scalar(select(Staff.id))
+username = db.session.scalar(select(Student.username))
+pending = db.session.scalars(select(Request.id).order_by(Request.id.desc())).all()
+client = app.test_client()
+
+def leaderboard():
+    reset_leaderboard()
+    get_top_students(10)
+
+def accolades():
+    recompute_accolades(rebuild=True)
+
+def request_listing():
+    for _ in iter_requests():
+        pass
+
+def request_approval():
+    confirm_requests(staff_id, 'approve', request_ids=[pending.pop() for _ in range(50)])
+
+def login():
+    response = client.post('/api/login', json={{'username': username, 'password': SEED_PASSWORD}})
+    assert response.status_code == 200, response.status_code
+
+def api_users():
+    response = client.get('/api/users')
+    response.get_data()
+    assert response.status_code == 200, response.status_code
+
+api_users()  # first request runs the deferred web setup; keep it out of the timings
+results = {{}}
+for name in {benchmarks!r}:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        globals()[name]()
+        samples.append((time.perf_counter() - start) * 1000)
+        db.session.rollback()
+    results[name] = round(statistics.median(samples), 3)
+print(json.dumps(results))
+"""
+
+def _probe(size, repeat, benchmarks):
+    directory = tempfile.mkdtemp(prefix='bench-')
+    uri = 'sqlite:///' + os.path.join(directory, 'bench.db')
+    result = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(size=size, repeat=repeat, uri=uri, benchmarks=benchmarks)],
+        capture_output=True, text=True, cwd=os.getcwd()
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'Benchmark run for size {size} failed:\n{result.stderr}')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def run_benchmarks(sizes=(100, 1000), repeat=3, benchmarks=BENCHMARKS):
+    """
+    Median ms per benchmark at each data size. Each size gets a fresh interpreter and
+    a scratch database seeded with size students, 10 logs per student and size requests.
+    """
+    return {
+        'python': platform.python_version(),
+        'repeat': repeat,
+        'results': {str(size): _probe(size, repeat, list(benchmarks)) for size in sizes}
+    }
+
+def compare_to_baseline(current, baseline, threshold=0.25, min_ms=1.0):
+    """
+    Regressions of current against baseline: benchmarks more than `threshold` (a fraction)
+    slower at the same size. Differences under min_ms are treated as noise.
+    """
+    regressions = []
+    for size, results in current['results'].items():
+        for name, ms in results.items():
+            before = baseline.get('results', {}).get(size, {}).get(name)
+            if before is None:
+                continue
+            if ms > before * (1 + threshold) and ms - before >= min_ms:
+                regressions.append({'size': size, 'benchmark': name, 'baseline_ms': before,
+                                    'current_ms': ms, 'change': round(ms / before - 1, 3) if before else None})
+    return regressions
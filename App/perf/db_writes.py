@@ -0,0 +1,81 @@
+import multiprocessing, os, statistics, tempfile, time
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer, insert
+from sqlalchemy.exc import OperationalError
+
+from App.database import apply_sqlite_pragmas
+
+__all__ = ['measure_db_writes', 'compare_db_writes', 'scratch_sqlite_uri']
+
+_probe = Table('perf_write_probe', MetaData(),
+               Column('id', Integer, primary_key=True),
+               Column('worker', Integer, nullable=False),
+               Column('n', Integer, nullable=False))
+
+
+def _writer(uri, options, pragmas, worker, writes, barrier, results):
+    engine = create_engine(uri, **options)
+    apply_sqlite_pragmas(engine, pragmas)
+    latencies, errors = [], 0
+    barrier.wait()
+    start = time.perf_counter()
+    for n in range(writes):
+        began = time.perf_counter()
+        try:
+            # one transaction per write, like logging hours one request at a time
+            with engine.begin() as conn:
+                conn.execute(insert(_probe), {'worker': worker, 'n': n})
+        except OperationalError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - began)
+    results.put((time.perf_counter() - start, latencies, errors))
+    engine.dispose()
+
+def measure_db_writes(uri, options=None, pragmas=None, workers=4, writes=200):
+    """
+    Concurrent single-row write transactions from `workers` processes, the way gunicorn
+    workers share a database. Returns throughput, error count and latency percentiles.
+    """
+    options, pragmas = options or {}, pragmas or {}
+    engine = create_engine(uri)
+    _probe.drop(engine, checkfirst=True)
+    _probe.create(engine)
+    engine.dispose()
+
+    context = multiprocessing.get_context('fork')
+    barrier, results = context.Barrier(workers), context.Queue()
+    processes = [context.Process(target=_writer, args=(uri, options, pragmas, i, writes, barrier, results))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    engine = create_engine(uri)
+    _probe.drop(engine)
+    engine.dispose()
+
+    seconds = max(outcome[0] for outcome in outcomes)
+    latencies = sorted(latency for outcome in outcomes for latency in outcome[1])
+    errors = sum(outcome[2] for outcome in outcomes)
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        'writes': len(latencies),
+        'errors': errors,
+        'seconds': round(seconds, 3),
+        'writes_per_sec': round(len(latencies) / seconds, 1) if seconds else None,
+        'p50_ms': round(percentiles[49] * 1000, 2),
+        'p95_ms': round(percentiles[94] * 1000, 2)
+    }
+
+def compare_db_writes(uri, options, pragmas, workers=4, writes=200):
+    """measure_db_writes with stock engine settings, then with the tuned profile."""
+    return {
+        'default': measure_db_writes(uri, workers=workers, writes=writes),
+        'tuned': measure_db_writes(uri, options, pragmas, workers=workers, writes=writes)
+    }
+
+def scratch_sqlite_uri():
+    directory = tempfile.mkdtemp(prefix='db-writes-')
+    return 'sqlite:///' + os.path.join(directory, 'bench.db')
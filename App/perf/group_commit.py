@@ -0,0 +1,57 @@
+import json, os, subprocess, sys, tempfile
+
+__all__ = ['measure_group_commit']
+
+# Runs in a fresh interpreter against a scratch database so the app under test starts clean
+_PROBE = """
+import json, threading, time
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Student, Staff, Activity
+from App.controllers import create_log
+
+app = create_app({{'SQLALCHEMY_DATABASE_URI': {uri!r}, 'WRITE_BEHIND': {write_behind}}}, lean=True)
+create_db()
+staff = Staff(username='bench-staff', password='x')
+students = [Student(username=f'bench-{{i}}', password='x') for i in range({writers})]
+activity = Activity(name='bench')
+db.session.add_all([staff, activity, *students])
+db.session.commit()
+staff_id, activity_id, student_ids = staff.id, activity.id, [s.id for s in students]
+
+barrier = threading.Barrier({writers})
+def writer(student_id):
+    with app.app_context():
+        barrier.wait()
+        for _ in range({writes}):
+            create_log(staff_id, student_id, activity_id, 1)
+
+threads = [threading.Thread(target=writer, args=(sid,)) for sid in student_ids]
+start = time.perf_counter()
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+seconds = time.perf_counter() - start
+total = db.session.execute(db.select(db.func.sum(Student.hours))).scalar()
+print(json.dumps({{'seconds': seconds, 'logged': total}}))
+"""
+
+def _probe(write_behind, writers, writes):
+    directory = tempfile.mkdtemp(prefix='group-commit-')
+    uri = 'sqlite:///' + os.path.join(directory, 'bench.db')
+    result = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(uri=uri, write_behind=write_behind, writers=writers, writes=writes)],
+        capture_output=True, text=True, cwd=os.getcwd(), check=True
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['logs_per_sec'] = round(timings['logged'] / timings['seconds'], 1)
+    timings['seconds'] = round(timings['seconds'], 3)
+    return timings
+
+def measure_group_commit(writers=8, writes=100):
+    """Logs/s for `writers` concurrent threads calling create_log, committing inline vs through the write queue."""
+    return {
+        'sync': _probe(False, writers, writes),
+        'write-behind': _probe(True, writers, writes)
+    }
@@ -0,0 +1,188 @@
+import http.client, json, logging, os, random, socket, subprocess, sys, threading, time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+__all__ = ['ENDPOINTS', 'parse_mix', 'serve_in_process', 'serve_gunicorn', 'run_load']
+
+# name -> (method, path); request bodies are built by _Client.request
+ENDPOINTS = {
+    'login': ('POST', '/api/login'),
+    'identify': ('GET', '/api/identify'),
+    'users': ('GET', '/api/users?limit=50'),
+    'leaderboard': ('GET', '/api/leaderboard'),
+    'logs': ('GET', '/api/logs?limit=50'),
+    'requests': ('GET', '/api/requests?limit=50'),
+    'log_hours': ('POST', '/api/logs/bulk'),
+}
+
+
+def parse_mix(text):
+    """"identify=5,users=1" -> {'identify': 5.0, 'users': 1.0}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r}; choose from {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _wait_for_port(port, timeout=30, process=None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f'Server exited with code {process.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Server did not start listening on port {port}')
+
+@contextmanager
+def serve_in_process(app):
+    """Serve app with werkzeug's threaded server on a free local port; yields the base url."""
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', _free_port(), app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_port}'
+    finally:
+        server.shutdown()
+
+@contextmanager
+def serve_gunicorn(workers=None, env=None):
+    """Run gunicorn with gunicorn_config.py on a free local port; yields the base url."""
+    port = _free_port()
+    command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', '-b', f'127.0.0.1:{port}',
+               '--access-logfile', '/dev/null']
+    if workers:
+        command += ['-w', str(workers)]
+    process = subprocess.Popen(command + ['wsgi:app'], env={**os.environ, **(env or {})},
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        _wait_for_port(port, process=process)
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+class _Client:
+    """One keep-alive connection with the JWT cookie of a real login."""
+
+    def __init__(self, base_url, username, password, student):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.username, self.password, self.student = username, password, student
+        self.connection = None
+        self.cookie = None
+
+    def send(self, method, path, body=None, content_type='application/json'):
+        headers = {'Content-Type': content_type} if body is not None else {}
+        if self.cookie:
+            headers['Cookie'] = self.cookie
+        for attempt in (1, 2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, OSError):
+                # the server may close an idle keep-alive connection; reconnect once
+                self.connection.close()
+                self.connection = None
+                if attempt == 2:
+                    raise
+
+    def login(self):
+        status, body = self.send('POST', '/api/login', json.dumps({'username': self.username, 'password': self.password}))
+        if status == 200:
+            self.cookie = f"access_token={json.loads(body)['access_token']}"
+        return status
+
+    def request(self, name):
+        if name == 'login':
+            return self.login()
+        method, path = ENDPOINTS[name]
+        if name == 'log_hours':
+            entry = {'username': self.student, 'activity': 'volunteering', 'hours': 1}
+            return self.send(method, path, json.dumps([entry]))[0]
+        return self.send(method, path)[0]
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else None
+
+def run_load(base_url, mix, users, student, concurrency=8, duration=10.0, rate=None, seed=None):
+    """
+    Drive base_url with `concurrency` clients, each logged in as one of `users`
+    ((username, password) pairs), picking endpoints by the weights in mix.
+    With rate set, requests are paced to about that many per second overall;
+    otherwise every client sends as fast as responses come back.
+    Returns per-endpoint throughput, latency percentiles (ms) and error counts.
+    """
+    names, weights = list(mix), list(mix.values())
+    samples = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    lock = threading.Lock()
+    clients = [_Client(base_url, *users[i % len(users)], student) for i in range(concurrency)]
+    for client in clients:
+        if client.login() != 200:
+            raise RuntimeError(f'Login failed for {client.username}')
+    interval = concurrency / rate if rate else 0.0
+    start = time.perf_counter()
+    stop_at = start + duration
+
+    def drive(index, client):
+        rng = random.Random(None if seed is None else seed + index)
+        # stagger paced clients so the overall rate stays smooth
+        next_at = start + interval * index / concurrency
+        while True:
+            if interval:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_at += interval
+            began = time.perf_counter()
+            if began >= stop_at:
+                return
+            name = rng.choices(names, weights)[0]
+            try:
+                failed = client.request(name) >= 400
+            except (http.client.HTTPException, OSError):
+                failed = True
+            elapsed = time.perf_counter() - began
+            with lock:
+                samples[name].append(elapsed)
+                errors[name] += failed
+
+    threads = [threading.Thread(target=drive, args=(i, client)) for i, client in enumerate(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    endpoints = {}
+    for name in names:
+        ordered = sorted(samples[name])
+        endpoints[name] = {
+            'requests': len(ordered),
+            'rps': round(len(ordered) / seconds, 1),
+            'p50_ms': round(_percentile(ordered, 0.50) * 1000, 2) if ordered else None,
+            'p95_ms': round(_percentile(ordered, 0.95) * 1000, 2) if ordered else None,
+            'p99_ms': round(_percentile(ordered, 0.99) * 1000, 2) if ordered else None,
+            'error_rate': round(errors[name] / len(ordered), 4) if ordered else None,
+        }
+    total = sum(len(values) for values in samples.values())
+    return {'seconds': round(seconds, 2), 'requests': total, 'rps': round(total / seconds, 1),
+            'errors': sum(errors.values()), 'endpoints': endpoints}
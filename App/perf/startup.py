@@ -0,0 +1,47 @@
+import json, os, statistics, subprocess, sys
+
+# Runs in a fresh interpreter so nothing is already imported. Imports wsgi.py the way
+# `flask` does, so its own imports, create_app and command registration are all timed.
+_PROBE = """
+import json, time
+start = time.perf_counter()
+from App.main import create_app
+imported = time.perf_counter()
+import wsgi
+built = time.perf_counter()
+print(json.dumps({'import_ms': (imported - start) * 1000, 'wsgi_ms': (built - imported) * 1000}))
+"""
+
+def _probe(lean):
+    # wsgi.py builds the lean app only when run from the flask CLI
+    env = {key: value for key, value in os.environ.items() if key != 'FLASK_RUN_FROM_CLI'}
+    if lean:
+        env['FLASK_RUN_FROM_CLI'] = 'true'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE],
+        capture_output=True, text=True, cwd=os.getcwd(), env=env, check=True
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    imports = []
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if line.startswith('import time:') and '|' in line and 'cumulative' not in line:
+            _, cumulative, name = line.split('|')
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            if depth <= 2:
+                imports.append((name.strip(), int(cumulative) / 1000))
+    timings['top_imports'] = sorted(imports, key=lambda item: item[1], reverse=True)
+    return timings
+
+def measure_startup(lean=True, runs=3):
+    """Median App/wsgi.py import timings (ms) over fresh interpreters, plus the slowest top-level imports."""
+    samples = [_probe(lean) for _ in range(runs)]
+    import_ms = statistics.median(sample['import_ms'] for sample in samples)
+    wsgi_ms = statistics.median(sample['wsgi_ms'] for sample in samples)
+    return {
+        'lean': lean,
+        'import_ms': round(import_ms, 1),
+        'wsgi_ms': round(wsgi_ms, 1),
+        'total_ms': round(import_ms + wsgi_ms, 1),
+        'top_imports': samples[-1]['top_imports']
+    }
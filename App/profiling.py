@@ -0,0 +1,143 @@
+import functools, re, time
+from contextvars import ContextVar
+import click
+from flask import request
+from sqlalchemy import event
+
+from App.database import db
+
+_current = ContextVar('sql_profile', default=None)
+
+_WHITESPACE = re.compile(r'\s+')
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAM_LISTS = re.compile(r'\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)')
+_VALUES_LISTS = re.compile(r'(VALUES \(\.\.\.\))(?:, \(\.\.\.\))+')
+
+
+def normalize_statement(statement):
+    """Collapse literals, whitespace and parameter lists so repeats of one query group together."""
+    statement = _WHITESPACE.sub(' ', statement).strip()
+    statement = _LITERALS.sub('?', statement)
+    statement = _PARAM_LISTS.sub('(...)', statement)
+    return _VALUES_LISTS.sub(r'\1', statement)
+
+
+class QueryProfile:
+    """Query counts and timings for one unit of work (an HTTP request or a CLI command)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = {}
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        entry = self.statements.setdefault(normalize_statement(statement), [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def repeated(self, threshold):
+        """Statements run at least threshold times: probable N+1 queries."""
+        return [(statement, count, seconds) for statement, (count, seconds) in self.statements.items()
+                if count >= threshold]
+
+    def summary(self):
+        return f'{self.count} queries in {self.seconds * 1000:.1f}ms'
+
+    def table(self, threshold, top=10):
+        rows = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        lines = [f'SQL profile for {self.name}: {self.summary()}',
+                 f"{'COUNT':>6} {'TOTAL ms':>9}  STATEMENT"]
+        for statement, (count, seconds) in rows:
+            flag = ' [N+1?]' if count >= threshold else ''
+            lines.append(f'{count:>6} {seconds * 1000:>9.1f}  {statement[:100]}{flag}')
+        return '\n'.join(lines)
+
+
+class profile:
+    """Collect the queries run inside the block into a new QueryProfile."""
+
+    def __init__(self, name):
+        self.profile = QueryProfile(name)
+
+    def __enter__(self):
+        self._token = _current.set(self.profile)
+        return self.profile
+
+    def __exit__(self, *exc):
+        _current.reset(self._token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # statements on one connection never overlap, so one start time is enough; a failed
+    # statement's is simply overwritten by the next one instead of piling up in conn.info
+    conn.info['query_start'] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop('query_start', None)
+    current = _current.get()
+    if current is not None and started is not None:
+        current.record(statement, time.perf_counter() - started)
+
+def setup_profiler(app):
+    """Count and time SQL per request when SQL_PROFILER is enabled."""
+    if not app.config.get('SQL_PROFILER'):
+        return
+    threshold = app.config['SQL_PROFILER_N1_THRESHOLD']
+    with app.app_context():
+        for engine in db.engines.values():
+            if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+                event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_request_profile():
+        request.environ['app.sql_profile'] = scope = profile(f'{request.method} {request.path}')
+        scope.__enter__()
+
+    @app.after_request
+    def add_profile_headers(response):
+        scope = request.environ.get('app.sql_profile')
+        if scope is not None:
+            current = scope.profile
+            response.headers['X-SQL-Queries'] = str(current.count)
+            response.headers['Server-Timing'] = f'db;dur={current.seconds * 1000:.1f};desc="{current.count} queries"'
+        return response
+
+    @app.teardown_request
+    def log_request_profile(exc):
+        # streamed responses keep querying after after_request, so log once the request is torn down
+        scope = request.environ.pop('app.sql_profile', None)
+        if scope is None:
+            return
+        scope.__exit__(None, None, None)
+        current = scope.profile
+        app.logger.debug('SQL %s: %s', current.name, current.summary())
+        for statement, count, seconds in current.repeated(threshold):
+            app.logger.warning('Probable N+1 in %s: %d x %s (%.1fms)', current.name, count, statement, seconds * 1000)
+
+def profile_cli(app, group):
+    """Wrap every command under group so it prints a SQL profile table when it finishes."""
+    if not app.config.get('SQL_PROFILER'):
+        return
+    threshold = app.config['SQL_PROFILER_N1_THRESHOLD']
+    for name, command in group.commands.items():
+        if isinstance(command, click.Group):
+            profile_cli(app, command)
+        elif command.callback is not None:
+            command.callback = _profiled(command.callback, command.name, threshold)
+
+def _profiled(callback, name, threshold):
+    @functools.wraps(callback)
+    def wrapper(*args, **kwargs):
+        # commands run by `user batch`/`user shell` count towards the outer command's profile
+        if _current.get() is not None:
+            return callback(*args, **kwargs)
+        with profile(name) as current:
+            try:
+                return callback(*args, **kwargs)
+            finally:
+                click.echo(current.table(threshold), err=True)
+    return wrapper
@@ -1 +1,19 @@
-from .test_app import *
\ No newline at end of file
+from .test_app import *
+from .test_leaderboard import *
+from .test_log import *
+from .test_request import *
+from .test_activity import *
+from .test_auth import *
+from .test_main import *
+from .test_database import *
+from .test_user import *
+from .test_profiling import *
+from .test_metrics import *
+from .test_write_queue import *
+from .test_seed import *
+from .test_load import *
+from .test_caching import *
+from .test_live import *
+from .test_admin import *
+from .test_report import *
+from .test_replica import *
\ No newline at end of file
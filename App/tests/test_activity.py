@@ -0,0 +1,124 @@
+import pytest, unittest
+from flask import current_app
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Activity, ActivityMilestone, ActivityHours, Award
+from App.controllers import (
+    create_student,
+    create_staff,
+    create_activity,
+    create_log,
+    get_user,
+    resolve_milestone,
+    build_accolade,
+    get_student_activity_hours,
+    recompute_accolades,
+    crossed_milestones,
+    iter_awards,
+    get_activity_catalog,
+    get_activity_id,
+    set_activity_milestones,
+    milestones_for,
+    bump_table_versions
+)
+
+'''
+   Unit Tests
+'''
+class MilestoneUnitTests(unittest.TestCase):
+
+    def test_resolve_milestone(self):
+        assert resolve_milestone(9, (10, 25, 50)) == "No milestone yet"
+        assert resolve_milestone(25, (10, 25, 50)) == "25 Hour Milestone"
+        assert resolve_milestone(80, [50, 10, 25]) == "50 Hour Milestone"
+
+    def test_build_accolade(self):
+        accolade = build_accolade([(1, "volunteering"), (2, "help_desk")], {1: 12})
+        assert accolade == "volunteering: 10 Hour Milestone\nhelp_desk: No milestone yet\n"
+
+    def test_crossed_milestones(self):
+        assert crossed_milestones((10, 25, 50), 9, 10) == (10,)
+        assert crossed_milestones((10, 25, 50), 10, 24) == ()
+        assert crossed_milestones((10, 25, 50), 5, 60) == (10, 25, 50)
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class ActivityHoursIntegrationTests(unittest.TestCase):
+
+    def test_logs_update_activity_hours(self):
+        staff = create_staff("sam", "sampass")
+        ann = create_student("ann", "annpass")
+        create_activity("volunteering")
+        create_activity("help_desk")
+        create_log(staff.id, ann.id, 1, 8)
+        create_log(staff.id, ann.id, 1, 4)
+        create_log(staff.id, ann.id, 2, 3)
+        assert get_student_activity_hours(ann.id) == {1: 12, 2: 3}
+
+    def test_recompute_accolades(self):
+        db.session.query(ActivityHours).delete()
+        db.session.commit()
+        assert recompute_accolades(rebuild=True) == 1
+        assert get_student_activity_hours(2) == {1: 12, 2: 3}
+        assert get_user(2).accolade == "volunteering: 10 Hour Milestone\nhelp_desk: No milestone yet\n"
+        assert recompute_accolades() == 0
+
+
+class AwardIntegrationTests(unittest.TestCase):
+
+    def test_award_on_crossing(self):
+        # ann has 12 volunteering hours from the tests above
+        create_log(1, 2, 1, 14)
+        create_log(1, 2, 1, 1)
+        assert [(row.activity, row.milestone) for row in iter_awards(student="ann")] == [
+            ("volunteering", 10), ("volunteering", 25)
+        ]
+
+    def test_awards_feed(self):
+        client = current_app.test_client()
+        awards = client.get('/api/awards?student=ann&activity=volunteering').get_json()
+        assert [award['milestone'] for award in awards] == [10, 25]
+        assert awards[0]['student'] == "ann" and awards[0]['awarded_at']
+        after = client.get(f"/api/awards?after_id={awards[0]['id']}&limit=1").get_json()
+        assert [award['milestone'] for award in after] == [25]
+        assert client.get('/api/awards?student=nobody').get_json() == []
+
+    def test_recompute_backfills_awards(self):
+        db.session.query(Award).delete()
+        db.session.commit()
+        recompute_accolades()
+        assert [row.milestone for row in iter_awards(student="ann")] == [10, 25]
+
+
+class ActivityCatalogIntegrationTests(unittest.TestCase):
+
+    def test_catalog_is_reused_until_version_changes(self):
+        catalog = get_activity_catalog(refresh=True)
+        assert get_activity_catalog(refresh=True) is catalog
+        assert set_activity_milestones("help_desk", [2, 4])
+        assert milestones_for("help_desk") == (2, 4)
+        assert get_activity_catalog() is not catalog
+        assert not set_activity_milestones("nope", [1])
+
+    def test_changes_from_other_processes(self):
+        catalog = get_activity_catalog()
+        # another worker adds an activity and edits thresholds without touching this worker's cache
+        db.session.add(Activity("tutoring"))
+        db.session.add(ActivityMilestone(activity_id=1, hours=7))
+        bump_table_versions('activity')
+        db.session.commit()
+        # a name miss re-checks the version at once
+        assert get_activity_id("tutoring") is not None
+        assert milestones_for("volunteering") == (7,)
+        assert get_activity_catalog() is not catalog
@@ -0,0 +1,46 @@
+import unittest
+from flask.globals import app_ctx
+from flask_jwt_extended import create_access_token
+
+from App.main import create_app
+from App.database import create_db
+from App.controllers import seed_data, get_user_by_username
+
+'''
+    Integration Tests
+'''
+class AdminIntegrationTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+                              'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000', 'SQL_PROFILER': True})
+        app_ctx._get_current_object().pop()
+        with cls.app.app_context():
+            create_db()
+            seed_data(students=20, staff=2, logs=120, requests=30, seed=1)
+            cls.staff = {'Authorization': f"Bearer {create_access_token(identity=get_user_by_username('stf21'))}"}
+            cls.student = {'Authorization': f"Bearer {create_access_token(identity=get_user_by_username('stu1'))}"}
+        cls.client = cls.app.test_client()
+
+    def queries(self, url):
+        response = self.client.get(url, headers=self.staff)
+        assert response.status_code == 200, url
+        return int(response.headers['X-SQL-Queries'])
+
+    def test_list_pages_load_relationships_eagerly(self):
+        # one count and one page query, however many rows reference students, staff and activities
+        for url in ('/admin/user/', '/admin/student/', '/admin/log/', '/admin/request/', '/admin/activity/'):
+            assert self.queries(url) <= 3, url
+        page = self.client.get('/admin/log/', headers=self.staff).get_data(as_text=True)
+        assert 'stu' in page and 'stf' in page
+
+    def test_counts_are_cached_per_filter(self):
+        self.queries('/admin/request/?flt0_0=stu2')
+        cached = self.queries('/admin/request/?flt0_0=stu2')
+        assert cached == self.queries('/admin/request/?flt0_0=stu2&sort=0') == 1
+        assert self.queries('/admin/request/?flt0_0=stu3') == 2
+
+    def test_admin_is_staff_only(self):
+        assert self.client.get('/admin/log/', headers=self.student).status_code == 302
+        assert self.client.get('/admin/log/').status_code == 302
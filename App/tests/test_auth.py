@@ -0,0 +1,98 @@
+import pytest, unittest
+from werkzeug.security import generate_password_hash
+
+from App.main import create_app
+from App.database import db, create_db
+from App.passwords import hash_password, verify_password, needs_rehash
+from flask import current_app
+from flask.globals import app_ctx
+from flask_jwt_extended import create_access_token
+
+from App.controllers import (
+    create_student,
+    get_user,
+    get_user_by_username,
+    update_user,
+    authenticate,
+    get_identity
+)
+
+'''
+   Unit Tests
+'''
+class PasswordUnitTests(unittest.TestCase):
+
+    def test_hash_and_verify(self):
+        pwhash = hash_password("mypass", method="pbkdf2:sha256:1000")
+        assert verify_password(pwhash, "mypass")
+        assert not verify_password(pwhash, "wrong")
+
+    def test_needs_rehash(self):
+        pwhash = generate_password_hash("mypass", method="pbkdf2:sha256:1000")
+        assert not needs_rehash(pwhash, method="pbkdf2:sha256:1000")
+        assert needs_rehash(pwhash, method="pbkdf2:sha256:2000")
+        assert needs_rehash(pwhash, method="scrypt")
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db',
+                      'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class AuthIntegrationTests(unittest.TestCase):
+
+    def test_rehash_on_login(self):
+        user = create_student("ann", "annpass")
+        user.password = generate_password_hash("annpass", method="pbkdf2:sha256:500")
+        db.session.commit()
+        assert authenticate("ann", "wrong") is None
+        assert authenticate("ann", "annpass") is not None
+        assert get_user_by_username("ann").password.startswith("pbkdf2:sha256:1000$")
+
+
+def test_api_login(empty_db):
+    response = empty_db.post('/api/login', json={'username': 'ann', 'password': 'annpass'})
+    assert 'access_token' in response.get_json()
+    response = empty_db.post('/api/login', json={'username': 'ann', 'password': 'nope'})
+    assert response.status_code == 401
+
+
+def test_identity_cache(empty_db):
+    user = get_user_by_username("ann")
+    headers = {'Authorization': f'Bearer {create_access_token(identity=user)}'}
+    response = empty_db.get('/api/identify', headers=headers)
+    assert response.get_json()['message'] == f"username: ann, id : {user.id}"
+    cache = current_app.extensions['identity_cache']
+    assert cache.get(user.id) == (user.id, "ann", "student")
+
+    update_user(user.id, "anna")
+    assert cache.get(user.id) is None
+    response = empty_db.get('/api/identify', headers=headers)
+    assert response.get_json()['message'] == f"username: anna, id : {user.id}"
+
+    get_user(user.id).set_password("newpass")
+    db.session.commit()
+    assert cache.get(user.id) is None
+    assert get_identity(user.id).username == "anna"
+    empty_db.get('/api/logout')
+    assert empty_db.get('/api/identify').status_code == 401
+
+
+def test_identity_cache_sees_other_workers(empty_db):
+    current_app.config['IDENTITY_CACHE_CHECK_INTERVAL'] = 0
+    user = get_user_by_username("anna")
+    assert get_identity(user.id).username == "anna"
+    # a second app on the same database stands in for another worker
+    other = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    try:
+        update_user(user.id, "annie")
+    finally:
+        app_ctx._get_current_object().pop()
+    assert get_identity(user.id).username == "annie"
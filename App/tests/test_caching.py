@@ -0,0 +1,86 @@
+import unittest
+from datetime import timedelta
+from werkzeug.http import http_date, parse_date
+from flask.globals import app_ctx
+
+from App.main import create_app
+from App.database import create_db
+from App.controllers import create_student, add_student_hours, update_user, bump_table_versions, get_table_versions
+
+'''
+    Integration Tests
+'''
+class ResponseCacheIntegrationTests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+                               'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000'})
+        app_ctx._get_current_object().pop()
+        with self.app.app_context():
+            create_db()
+            self.student_id = create_student('cara', 'cara-pass').id
+        self.client = self.app.test_client()
+
+    def test_writers_bump_versions(self):
+        with self.app.app_context():
+            before = get_table_versions(['user', 'student'])
+            add_student_hours(self.student_id, 2)
+            update_user(self.student_id, 'cara2')
+            after = get_table_versions(['user', 'student'])
+        assert after['student'][0] == before['student'][0] + 1
+        assert after['user'][0] == before['user'][0] + 1
+
+    def test_unchanged_listing_is_not_modified(self):
+        first = self.client.get('/api/users')
+        assert first.status_code == 200
+        # the streamed body is cached once it has been sent in full
+        assert first.get_json()[0]['username'] == 'cara'
+        assert first.headers['X-Cache'] == 'MISS'
+        assert first.headers['Last-Modified']
+        assert 'no-cache' in first.headers['Cache-Control']
+        second = self.client.get('/api/users')
+        assert second.headers['X-Cache'] == 'HIT'
+        assert second.get_json() == first.get_json()
+        assert self.client.get('/api/users', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+        # the date a write shares its second with proves nothing; a later one does
+        assert self.client.get('/api/users', headers={'If-Modified-Since': first.headers['Last-Modified']}).status_code == 200
+        later = http_date(parse_date(first.headers['Last-Modified']) + timedelta(seconds=1))
+        assert self.client.get('/api/users', headers={'If-Modified-Since': later}).status_code == 304
+        # query parameters get their own cache entry
+        limited = self.client.get('/api/users?limit=1')
+        assert limited.headers['X-Cache'] == 'MISS'
+        limited.get_data()
+
+    def test_write_invalidates_leaderboard(self):
+        first = self.client.get('/api/leaderboard')
+        with self.app.app_context():
+            add_student_hours(self.student_id, 3)
+        second = self.client.get('/api/leaderboard', headers={'If-None-Match': first.headers['ETag']})
+        assert second.status_code == 200
+        assert second.headers['ETag'] != first.headers['ETag']
+        assert second.get_json()['students'][0]['hours'] == 3
+        # the user listing only depends on the user table, so it is still current
+        users = self.client.get('/api/users')
+        users.get_data()
+        with self.app.app_context():
+            bump_table_versions('student')
+        assert self.client.get('/api/users', headers={'If-None-Match': users.headers['ETag']}).status_code == 304
+
+    def test_same_second_write_is_not_hidden_by_last_modified(self):
+        first = self.client.get('/api/users')
+        first.get_data()
+        with self.app.app_context():
+            update_user(self.student_id, 'cara3')
+        headers = {'If-Modified-Since': first.headers['Last-Modified']}
+        second = self.client.get('/api/users', headers=headers)
+        assert second.status_code == 200
+        assert second.get_json()[0]['username'] == 'cara3'
+        # an ETag that no longer matches wins over a date that still would
+        headers = {'If-None-Match': first.headers['ETag'], 'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'}
+        assert self.client.get('/api/users', headers=headers).status_code == 200
+
+    def test_errors_are_not_cached(self):
+        assert self.client.get('/api/leaderboard/nobody').status_code == 404
+        missing = self.client.get('/api/leaderboard/nobody')
+        assert missing.status_code == 404
+        assert 'ETag' not in missing.headers
@@ -0,0 +1,65 @@
+import pytest, unittest
+
+from App.main import create_app
+from App.database import db, create_db, deferred_commits, engine_options
+from App.models import User
+from App.controllers import create_student
+
+'''
+   Unit Tests
+'''
+class EngineOptionsUnitTests(unittest.TestCase):
+
+    config = {'DB_POOL_SIZE': 3, 'DB_MAX_OVERFLOW': 2, 'DB_POOL_TIMEOUT': 10,
+              'DB_POOL_RECYCLE': 1800, 'DB_POOL_PRE_PING': True}
+
+    def test_server_database_gets_pool_settings(self):
+        options = engine_options({**self.config, 'SQLALCHEMY_DATABASE_URI': 'postgresql://u:p@db/app',
+                                  'SQLALCHEMY_ENGINE_OPTIONS': {'pool_size': 8}})
+        assert options['pool_size'] == 8
+        assert options['max_overflow'] == 2
+        assert options['pool_pre_ping'] is True
+
+    def test_sqlite_gets_no_pool_settings(self):
+        assert engine_options({**self.config, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///app.db'}) == {}
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class DeferredCommitIntegrationTests(unittest.TestCase):
+
+    def test_block_commits_once(self):
+        with deferred_commits():
+            create_student("ann", "annpass")
+            create_student("ben", "benpass")
+        assert User.query.count() == 2
+
+    def test_error_rolls_back_whole_block(self):
+        with pytest.raises(RuntimeError):
+            with deferred_commits():
+                create_student("cat", "catpass")
+                raise RuntimeError("stop")
+        assert User.query.filter_by(username="cat").first() is None
+
+    def test_commit_now_keeps_earlier_work(self):
+        with pytest.raises(RuntimeError):
+            with deferred_commits() as commit:
+                create_student("dan", "danpass")
+                commit()
+                create_student("eve", "evepass")
+                raise RuntimeError("stop")
+        assert User.query.filter_by(username="dan").first() is not None
+        assert User.query.filter_by(username="eve").first() is None
+
+    def test_sqlite_pragmas_applied(self):
+        assert db.session.execute(db.text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert db.session.execute(db.text('PRAGMA busy_timeout')).scalar() == 5000
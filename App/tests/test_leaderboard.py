@@ -0,0 +1,94 @@
+import pytest, unittest
+from flask.globals import app_ctx
+
+from App.main import create_app
+from App.database import db, create_db
+from App.controllers import (
+    Leaderboard,
+    create_student,
+    add_student_hours,
+    get_top_students,
+    get_student_rank,
+    get_leaderboard_page,
+    get_user_by_username
+)
+
+'''
+   Unit Tests
+'''
+class LeaderboardUnitTests(unittest.TestCase):
+
+    def test_top_orders_by_hours_then_username(self):
+        board = Leaderboard()
+        board.load([(1, "bob", 5), (2, "amy", 5), (3, "cal", 9)])
+        self.assertListEqual(board.top(), [(1, "cal", 9), (2, "amy", 5), (3, "bob", 5)])
+        self.assertListEqual(board.top(1), [(1, "cal", 9)])
+
+    def test_update_moves_student(self):
+        board = Leaderboard()
+        board.load([(1, "bob", 5), (2, "amy", 3)])
+        board.update(2, "amy", 10)
+        assert board.rank("amy") == (1, 10)
+        assert board.rank("bob") == (2, 5)
+        assert len(board) == 2
+
+    def test_rename_drops_old_username(self):
+        board = Leaderboard()
+        board.load([(1, "bob", 5)])
+        board.update(1, "rob", 5)
+        assert board.rank("bob") is None
+        assert board.rank("rob") == (1, 5)
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class LeaderboardIntegrationTests(unittest.TestCase):
+
+    def test_leaderboard(self):
+        students = [create_student(name, "pass") for name in ("ann", "ben", "cat", "dan")]
+        for student, hours in zip(students, (4, 12, 4, 7)):
+            add_student_hours(student.id, hours)
+        self.assertListEqual([name for _, name, _ in get_top_students(2)], ["ben", "dan"])
+        assert get_student_rank("cat") == (4, 4)
+
+        page, cursor = get_leaderboard_page(limit=2)
+        assert [row['username'] for row in page] == ["ben", "dan"]
+        page, cursor = get_leaderboard_page(limit=2, after=cursor)
+        assert [(row['rank'], row['username']) for row in page] == [(3, "ann"), (4, "cat")]
+
+
+def test_leaderboard_api(empty_db):
+    response = empty_db.get('/api/leaderboard?limit=3')
+    data = response.get_json()
+    assert [row['username'] for row in data['students']] == ["ben", "dan", "ann"]
+    response = empty_db.get(f"/api/leaderboard?limit=3&after={data['next']}")
+    data = response.get_json()
+    assert [row['username'] for row in data['students']] == ["cat"]
+    assert data['next'] is None
+    assert empty_db.get('/api/leaderboard/dan').get_json() == {'rank': 2, 'username': 'dan', 'hours': 7}
+    assert empty_db.get('/api/leaderboard/nobody').status_code == 404
+    assert len(empty_db.get('/api/leaderboard?limit=0').get_json()['students']) == 1
+    assert len(empty_db.get('/api/leaderboard?limit=-1').get_json()['students']) == 1
+
+def test_other_process_writes_reach_the_index(empty_db):
+    assert empty_db.get('/api/leaderboard/cat').get_json()['rank'] == 4
+    # a second app on the same database stands in for another worker
+    other = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    try:
+        add_student_hours(get_user_by_username('cat').id, 30)
+        create_student('eve', 'pass')
+    finally:
+        app_ctx._get_current_object().pop()
+    assert empty_db.get('/api/leaderboard/cat').get_json() == {'rank': 1, 'username': 'cat', 'hours': 34}
+    assert empty_db.get('/api/leaderboard/eve').get_json() == {'rank': 5, 'username': 'eve', 'hours': 0}
+    data = empty_db.get('/api/leaderboard?limit=2').get_json()
+    assert [(row['rank'], row['username']) for row in data['students']] == [(1, 'cat'), (2, 'ben')]
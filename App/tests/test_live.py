@@ -0,0 +1,111 @@
+import json, os, tempfile, unittest
+from flask.globals import app_ctx
+
+from App.main import create_app
+from sqlalchemy import select, func
+
+from App.database import db, create_db
+from App.models import LeaderboardChange
+from App.controllers import create_student, add_student_hours, prune_leaderboard_changes
+from App.live import LeaderboardFeed, RESYNC
+
+def make_app():
+    # a file database: the feed's poller thread must not share an in-memory connection
+    uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'live.db')
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': uri, 'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+                      'LEADERBOARD_STREAM_POLL_INTERVAL': 3600})
+    app_ctx._get_current_object().pop()
+    return app
+
+'''
+   Unit Tests
+'''
+class LeaderboardFeedUnitTests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = make_app()
+        with self.app.app_context():
+            create_db()
+            self.ann = create_student('ann', 'pw').id
+            self.ben = create_student('ben', 'pw').id
+            add_student_hours(self.ann, 5)
+
+    def test_committed_hours_are_published_with_ranks(self):
+        feed = LeaderboardFeed(self.app, poll_interval=3600)
+        with self.app.app_context():
+            subscriber = feed.subscribe()
+            # changes committed before subscribing are part of the snapshot, not the deltas
+            assert feed.poll() == 0
+            add_student_hours(self.ben, 9)
+            add_student_hours(self.ben, 1)
+            assert feed.poll() == 1
+        # ann was displaced by ben, so her new rank is sent as well
+        assert subscriber.get_nowait() == {
+            'students': [{'rank': 1, 'username': 'ben', 'hours': 10}],
+            'ranks': [{'rank': 1, 'username': 'ben', 'hours': 10}, {'rank': 2, 'username': 'ann', 'hours': 5}]
+        }
+        assert feed.snapshot(1) == {'students': [{'rank': 1, 'username': 'ben', 'hours': 10}]}
+
+    def test_ranks_are_limited_to_the_stream_window(self):
+        feed = LeaderboardFeed(self.app, poll_interval=3600)
+        with self.app.app_context():
+            events = feed.events(feed.subscribe(), limit=1, heartbeat=0)
+            assert next(events) == ('snapshot', {'students': [{'rank': 1, 'username': 'ann', 'hours': 5}]})
+            add_student_hours(self.ben, 1)
+            feed.poll()
+            # ben moved from rank 2 to 2 with more hours: outside a one-student window
+            assert next(events) == ('hours', [{'rank': 2, 'username': 'ben', 'hours': 1}])
+            assert next(events) is None
+            add_student_hours(self.ben, 9)
+            feed.poll()
+            assert next(events) == ('hours', [{'rank': 1, 'username': 'ben', 'hours': 10}])
+            assert next(events) == ('ranks', [{'rank': 1, 'username': 'ben', 'hours': 10}])
+            events.close()
+
+    def test_changes_are_pruned_without_subscribers(self):
+        self.app.config['LEADERBOARD_STREAM_KEEP'] = 2
+        with self.app.app_context():
+            for hours in range(5):
+                add_student_hours(self.ben, 1)
+            prune_leaderboard_changes(force=True)
+            db.session.commit()
+            assert db.session.scalar(select(func.count(LeaderboardChange.id))) == 2
+
+    def test_slow_subscriber_is_resynced(self):
+        feed = LeaderboardFeed(self.app, poll_interval=3600, queue_size=1)
+        with self.app.app_context():
+            subscriber = feed.subscribe()
+            for hours in (1, 2):
+                add_student_hours(self.ben, hours)
+                feed.poll()
+        assert subscriber.get_nowait() is RESYNC
+        assert subscriber.empty()
+
+    def test_idle_feed_stops_polling(self):
+        feed = LeaderboardFeed(self.app, poll_interval=3600)
+        with self.app.app_context():
+            feed.unsubscribe(feed.subscribe())
+            add_student_hours(self.ben, 1)
+            assert feed.poll() == 0
+        assert feed.last_id is None
+
+'''
+    Integration Tests
+'''
+class LeaderboardStreamIntegrationTests(unittest.TestCase):
+
+    def test_stream_starts_with_snapshot(self):
+        app = make_app()
+        with app.app_context():
+            create_db()
+            add_student_hours(create_student('cal', 'pw').id, 3)
+        response = app.test_client().get('/api/stream/leaderboard?limit=5', buffered=False)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        chunks = iter(response.response)
+        assert next(chunks) == b'retry: 3000\n\n'
+        event, data = next(chunks).decode().strip().split('\n')
+        assert event == 'event: snapshot'
+        assert json.loads(data[len('data: '):]) == {'students': [{'rank': 1, 'username': 'cal', 'hours': 3}]}
+        response.close()
+        assert not app.extensions['leaderboard_feed']._subscribers
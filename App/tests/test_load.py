@@ -0,0 +1,40 @@
+import pytest, unittest
+from flask import current_app
+
+from App.main import create_app
+from App.database import db, create_db
+from App.controllers import seed_data, SEED_PASSWORD
+from App.perf import parse_mix, serve_in_process, run_load
+
+'''
+   Unit Tests
+'''
+class LoadUnitTests(unittest.TestCase):
+
+    def test_parse_mix(self):
+        assert parse_mix("identify=3,users") == {'identify': 3.0, 'users': 1.0}
+        with pytest.raises(ValueError):
+            parse_mix("identify=3,nope=1")
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class LoadIntegrationTests(unittest.TestCase):
+
+    def test_run_load_in_process(self):
+        seed_data(students=3, staff=1, logs=10, seed=1)
+        with serve_in_process(current_app._get_current_object()) as base_url:
+            result = run_load(base_url, parse_mix("identify=2,leaderboard=1,log_hours=1"),
+                              [('stf4', SEED_PASSWORD)], 'stu1', concurrency=2, duration=0.5, seed=1)
+        assert result['requests'] > 0
+        assert result['errors'] == 0
+        assert result['endpoints']['identify']['p50_ms'] is not None
@@ -0,0 +1,107 @@
+import io, pytest, unittest
+from datetime import datetime
+from flask_jwt_extended import create_access_token
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Log
+from App.controllers import (
+    create_student,
+    create_staff,
+    create_activity,
+    get_user,
+    get_user_by_username,
+    read_entries,
+    bulk_log_hours,
+    iter_logs
+)
+
+'''
+   Unit Tests
+'''
+class LogUnitTests(unittest.TestCase):
+
+    def test_read_csv_entries(self):
+        stream = io.StringIO("username,hours,activity\nbob,3,volunteering\n")
+        entries = list(read_entries(stream, 'csv'))
+        self.assertListEqual(entries, [{"username": "bob", "hours": "3", "activity": "volunteering"}])
+
+    def test_read_jsonl_entries(self):
+        stream = io.StringIO('{"username": "bob", "hours": 3, "activity": "volunteering"}\n\n')
+        entries = list(read_entries(stream, 'jsonl'))
+        self.assertListEqual(entries, [{"username": "bob", "hours": 3, "activity": "volunteering"}])
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class LogIntegrationTests(unittest.TestCase):
+
+    def test_bulk_log_hours(self):
+        staff = create_staff("sam", "sampass")
+        ann = create_student("ann", "annpass")
+        ben = create_student("ben", "benpass")
+        create_activity("volunteering")
+        entries = [
+            {"username": "ann", "hours": 2, "activity": "volunteering"},
+            {"username": "ben", "hours": "5", "activity": "volunteering"},
+            {"username": "ann", "hours": 3, "activity": "volunteering"},
+            {"username": "zed", "hours": 1, "activity": "volunteering"},
+            {"username": "ben", "hours": 1, "activity": "gardening"},
+        ]
+        result = bulk_log_hours(staff.id, entries, batch_size=2)
+        assert result['inserted'] == 3
+        assert result['students'] == 2
+        assert [error['row'] for error in result['errors']] == [4, 5]
+        assert get_user(ann.id).hours == 5
+        assert get_user(ben.id).hours == 5
+        assert Log.query.count() == 3
+
+
+def test_bulk_log_api(empty_db):
+    staff = create_staff("tia", "tiapass")
+    token = create_access_token(identity=staff)
+    response = empty_db.post('/api/logs/bulk', data="username,hours,activity\nann,4,volunteering\n",
+                             content_type='text/csv', headers={'Authorization': f'Bearer {token}'})
+    assert response.get_json()['inserted'] == 1
+
+    student_token = create_access_token(identity=get_user_by_username("ann"))
+    response = empty_db.post('/api/logs/bulk', json=[], headers={'Authorization': f'Bearer {student_token}'})
+    assert response.status_code == 403
+
+
+def test_iter_logs(empty_db):
+    rows = list(iter_logs(student="ann", chunk_size=1))
+    assert [(row.student, row.staff, row.hours) for row in rows] == [("ann", "sam", 2), ("ann", "sam", 3), ("ann", "tia", 4)]
+    assert all(row.created_at is not None for row in rows)
+    assert [row.hours for row in iter_logs(staff="sam", activity="volunteering", after_id=rows[0].id, limit=1)] == [5]
+    assert list(iter_logs(since=datetime(2100, 1, 1))) == []
+    assert list(iter_logs(student="nobody")) == []
+
+    headers = {'Authorization': f'Bearer {create_access_token(identity=get_user_by_username("tia"))}'}
+    response = empty_db.get('/api/logs?staff=tia', headers=headers)
+    assert [(log['student'], log['hours']) for log in response.get_json()] == [("ann", 4)]
+    assert empty_db.get('/api/logs?since=yesterday', headers=headers).status_code == 400
+
+
+def test_bulk_log_rejects_bad_entries(empty_db):
+    headers = {'Authorization': f'Bearer {create_access_token(identity=get_user_by_username("tia"))}'}
+    entries = ["ann", {"username": 7, "hours": 1, "activity": "volunteering"},
+               {"username": "ann", "hours": 2.5, "activity": "volunteering"},
+               {"username": "ann", "hours": True, "activity": "volunteering"},
+               {"username": "ann", "hours": 2.0, "activity": ["volunteering"]},
+               {"username": "ann", "hours": 2.0, "activity": "volunteering"}]
+    response = empty_db.post('/api/logs/bulk', json=entries, headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['inserted'] == 1
+    assert [error['row'] for error in data['errors']] == [1, 2, 3, 4, 5]
+    assert "Invalid username 7" in data['errors'][1]['error']
@@ -0,0 +1,17 @@
+import unittest
+from flask.globals import app_ctx
+
+from App.main import create_app
+
+'''
+   Unit Tests
+'''
+class LeanAppUnitTests(unittest.TestCase):
+
+    def test_lean_app_defers_views(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'}, lean=True)
+        app_ctx._get_current_object().pop()
+        assert 'user_views' not in app.blueprints
+        response = app.test_client().get('/health')
+        assert response.get_json() == {'status': 'healthy'}
+        assert 'user_views' in app.blueprints
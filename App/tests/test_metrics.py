@@ -0,0 +1,55 @@
+import os, tempfile, unittest
+from flask.globals import app_ctx
+
+from App.main import create_app
+from App.metrics import Metrics
+
+'''
+   Unit Tests
+'''
+class MetricsUnitTests(unittest.TestCase):
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics = Metrics()
+        for seconds in (0.001, 0.02, 20):
+            metrics.start()
+            metrics.observe('GET', '/health', 200, seconds)
+        text = metrics.render()
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/health",le="0.005"} 1' in text
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/health",le="0.025"} 2' in text
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/health",le="+Inf"} 3' in text
+        assert 'http_requests_total{method="GET",route="/health",status="200"} 3' in text
+        assert 'http_requests_in_flight 0' in text
+
+    def test_worker_snapshots_are_merged(self):
+        directory = tempfile.mkdtemp()
+        worker = Metrics(directory)
+        worker.start()
+        worker.observe('GET', '/health', 200, 0.001)
+        worker.flush()
+        # pretend another worker wrote the same route
+        os.rename(os.path.join(directory, f'worker-{os.getpid()}.json'), os.path.join(directory, 'worker-1.json'))
+        scraper = Metrics(directory)
+        scraper.start()
+        scraper.observe('GET', '/health', 500, 0.001)
+        text = scraper.render()
+        assert 'http_request_duration_seconds_count{method="GET",route="/health"} 2' in text
+        assert 'http_requests_total{method="GET",route="/health",status="500"} 1' in text
+
+'''
+    Integration Tests
+'''
+class MetricsIntegrationTests(unittest.TestCase):
+
+    def test_metrics_endpoint(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+        app_ctx._get_current_object().pop()
+        client = app.test_client()
+        client.get('/health')
+        client.get('/missing')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        text = response.get_data(as_text=True)
+        assert 'http_requests_total{method="GET",route="/health",status="200"} 1' in text
+        assert 'http_requests_total{method="GET",route="<unmatched>",status="404"} 1' in text
+        assert 'http_requests_in_flight 1' in text
@@ -0,0 +1,52 @@
+import unittest
+from flask.globals import app_ctx
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from App.main import create_app
+from App.database import db, create_db
+from App.profiling import normalize_statement, QueryProfile
+
+'''
+   Unit Tests
+'''
+class ProfilingUnitTests(unittest.TestCase):
+
+    def test_normalize_statement(self):
+        assert normalize_statement("SELECT *\n  FROM user WHERE id IN (?, ?, ?) AND username = 'bob'") \
+            == "SELECT * FROM user WHERE id IN (...) AND username = ?"
+        assert normalize_statement("SELECT * FROM log LIMIT 25") == "SELECT * FROM log LIMIT ?"
+
+    def test_repeated_statements_flagged(self):
+        profile = QueryProfile('test')
+        for user_id in range(5):
+            profile.record(f"SELECT * FROM user WHERE id = {user_id}", 0.001)
+        profile.record("SELECT * FROM log", 0.001)
+        assert profile.count == 6
+        assert [(statement, count) for statement, count, _ in profile.repeated(5)] \
+            == [("SELECT * FROM user WHERE id = ?", 5)]
+
+'''
+    Integration Tests
+'''
+class ProfilingIntegrationTests(unittest.TestCase):
+
+    def test_request_query_headers(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SQL_PROFILER': True})
+        create_db()
+        app_ctx._get_current_object().pop()
+        response = app.test_client().get('/api/leaderboard')
+        assert response.status_code == 200
+        assert int(response.headers['X-SQL-Queries']) >= 1
+        assert response.headers['Server-Timing'].startswith('db;dur=')
+
+    def test_failed_statements_leave_nothing_behind(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SQL_PROFILER': True})
+        app_ctx._get_current_object().pop()
+        with app.app_context(), db.engine.connect() as connection:
+            for _ in range(3):
+                with self.assertRaises(OperationalError):
+                    connection.execute(text('SELECT * FROM missing_table'))
+                connection.rollback()
+            connection.execute(text('SELECT 1'))
+            assert 'query_start' not in connection.info
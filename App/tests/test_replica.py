@@ -0,0 +1,103 @@
+import os, shutil, tempfile, unittest
+from flask.globals import app_ctx
+from flask_jwt_extended import create_access_token
+from sqlalchemy import select, update, func
+
+from App.main import create_app
+from App.database import db, create_db, use_replica, sync_sqlite_replica
+from App.models import User, Activity, TableVersion
+from App.controllers import seed_data, create_student, create_request, get_user_by_username
+
+'''
+    Integration Tests
+'''
+class ReplicaIntegrationTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.mkdtemp()
+        cls.app = create_app({'TESTING': True, 'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+                              'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(cls.dir, 'primary.db')}",
+                              'DB_REPLICA_URI': f"sqlite:///{os.path.join(cls.dir, 'replica.db')}",
+                              'DB_REPLICA_MAX_LAG': 3600, 'DB_REPLICA_CHECK_INTERVAL': 0})
+        app_ctx._get_current_object().pop()
+        with cls.app.app_context():
+            create_db()
+            seed_data(students=10, staff=1, logs=20, requests=0, seed=4)
+            cls.staff = {'Authorization': f"Bearer {create_access_token(identity=get_user_by_username('stf11'))}"}
+
+    @classmethod
+    def tearDownClass(cls):
+        with cls.app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+        shutil.rmtree(cls.dir)
+
+    def setUp(self):
+        # every test starts with a replica that has caught up
+        with self.app.app_context():
+            sync_sqlite_replica()
+
+    def add_student(self, username):
+        # written to the primary only; the replica sees it after the next sync
+        with self.app.app_context():
+            create_student(username, 'pass')
+
+    def usernames(self, client):
+        response = client.get('/api/users?limit=500')
+        assert response.status_code == 200
+        return {user['username'] for user in response.get_json()}
+
+    def test_listing_reads_replica(self):
+        self.add_student('late1')
+        assert 'late1' not in self.usernames(self.app.test_client())
+        with self.app.app_context():
+            sync_sqlite_replica()
+        assert 'late1' in self.usernames(self.app.test_client())
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        self.add_student('late2')
+        self.app.config['DB_REPLICA_MAX_LAG'] = 0
+        try:
+            assert 'late2' in self.usernames(self.app.test_client())
+        finally:
+            self.app.config['DB_REPLICA_MAX_LAG'] = 3600
+
+    def test_stopped_replica_falls_back_without_versioned_writes(self):
+        with self.app.app_context():
+            self.app.extensions['db_replica'].measure()
+            sync_sqlite_replica()
+            # replication stopped two hours ago; requests bump no table version, only the heartbeat shows it
+            with db.engines['replica'].begin() as connection:
+                connection.execute(update(TableVersion.__table__).where(TableVersion.name == 'heartbeat')
+                                   .values(updated_at=func.datetime('now', '-2 hours')))
+            student = create_student('late5', 'pass')
+            request_id = create_request(student.id, db.session.scalar(select(Activity.id)), 3).id
+        response = self.app.test_client().get('/api/requests', headers=self.staff)
+        assert request_id in {row['id'] for row in response.get_json()}
+
+    def test_writer_reads_own_writes(self):
+        writer = self.app.test_client()
+        response = writer.post('/api/users/import', json=[{'username': 'late3', 'password': 'pass', 'type': 'student'}],
+                               headers=self.staff)
+        assert response.status_code == 200
+        assert 'read_primary' in response.headers['Set-Cookie']
+        assert 'late3' in self.usernames(writer)
+        assert 'late3' not in self.usernames(self.app.test_client())
+
+    def test_session_reads_primary_after_writing(self):
+        with self.app.app_context():
+            with use_replica():
+                before = db.session.scalar(select(func.count(User.id)))
+                create_student('late4', 'pass')
+                assert db.session.scalar(select(func.count(User.id))) == before + 1
+
+    def test_unreadable_replica_uses_primary(self):
+        empty = os.path.join(self.dir, 'empty.db')
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': self.app.config['SQLALCHEMY_DATABASE_URI'],
+                          'DB_REPLICA_URI': f'sqlite:///{empty}', 'DB_REPLICA_CHECK_INTERVAL': 0})
+        app_ctx._get_current_object().pop()
+        assert len(self.usernames(app.test_client())) > 10
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
@@ -0,0 +1,77 @@
+import csv, io, json, unittest
+from flask.globals import app_ctx
+from flask_jwt_extended import create_access_token
+from sqlalchemy import select, func
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Log, ActivityHours
+from App.controllers import seed_data, get_user_by_username, export_report
+
+'''
+    Unit Tests
+'''
+class ReportUnitTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+                              'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000'})
+        app_ctx._get_current_object().pop()
+        with cls.app.app_context():
+            create_db()
+            seed_data(students=15, staff=2, logs=90, requests=0, seed=2)
+
+    def test_csv_chunks_follow_chunk_size(self):
+        with self.app.app_context():
+            progress = []
+            chunks = list(export_report('log', 'csv', chunk_size=25, on_progress=lambda rows, _: progress.append(rows)))
+            rows = list(csv.reader(io.StringIO(''.join(chunks))))
+            assert rows[0] == ['id', 'student', 'staff', 'activity', 'hours', 'created_at']
+            assert len(rows) - 1 == db.session.scalar(select(func.count(Log.id)))
+            assert progress == [25, 50, 75, 90]
+
+    def test_jsonl_totals_match(self):
+        with self.app.app_context():
+            for by in ('student', 'activity'):
+                rows = [json.loads(line) for line in ''.join(export_report(by, 'jsonl')).splitlines()]
+                assert set(rows[0]) == {'student', 'activity', 'hours'}
+                assert sum(row['hours'] for row in rows) == db.session.scalar(select(func.sum(ActivityHours.hours)))
+            rows = [json.loads(line) for line in ''.join(export_report('staff', 'jsonl')).splitlines()]
+            assert sum(row['logs'] for row in rows) == db.session.scalar(select(func.count(Log.id)))
+
+    def test_unknown_report_raises(self):
+        with self.app.app_context():
+            with self.assertRaises(ValueError):
+                next(export_report('nope', 'csv'))
+            with self.assertRaises(ValueError):
+                next(export_report('student', 'xml'))
+
+'''
+    Integration Tests
+'''
+class ReportIntegrationTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+                              'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000'})
+        app_ctx._get_current_object().pop()
+        with cls.app.app_context():
+            create_db()
+            seed_data(students=10, staff=1, logs=40, requests=0, seed=3)
+            cls.staff = {'Authorization': f"Bearer {create_access_token(identity=get_user_by_username('stf11'))}"}
+            cls.student = {'Authorization': f"Bearer {create_access_token(identity=get_user_by_username('stu1'))}"}
+        cls.client = cls.app.test_client()
+
+    def test_export_endpoint(self):
+        response = self.client.get('/api/reports/log?format=jsonl&chunk_size=7', headers=self.staff)
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.headers['Content-Disposition'] == 'attachment; filename=hours-by-log.jsonl'
+        assert len(response.get_data(as_text=True).splitlines()) == 40
+
+    def test_export_is_staff_only(self):
+        assert self.client.get('/api/reports/student', headers=self.student).status_code in (401, 403)
+        assert self.client.get('/api/reports/student?format=xml', headers=self.staff).status_code == 400
+        assert self.client.get('/api/reports/nope', headers=self.staff).status_code == 400
@@ -0,0 +1,79 @@
+import pytest, unittest
+from flask_jwt_extended import create_access_token
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Log, Request
+from App.controllers import (
+    create_student,
+    create_staff,
+    create_activity,
+    get_user,
+    confirm_requests,
+    iter_requests
+)
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+def add_requests(student, activity_id, *hours):
+    requests = [Request(student_id=student.id, activity_id=activity_id, hours=h) for h in hours]
+    db.session.add_all(requests)
+    db.session.commit()
+    return [request.id for request in requests]
+
+
+class RequestIntegrationTests(unittest.TestCase):
+
+    def test_confirm_requests(self):
+        staff = create_staff("sam", "sampass")
+        ann = create_student("ann", "annpass")
+        create_activity("volunteering")
+        create_activity("help_desk")
+        approve_ids = add_requests(ann, 1, 2, 3)
+        reject_ids = add_requests(ann, 2, 7)
+
+        results = confirm_requests(staff.id, "approve", request_ids=approve_ids + [999])
+        self.assertListEqual([r['outcome'] for r in results], ["approved", "approved", "not_found"])
+        assert get_user(ann.id).hours == 5
+        assert Log.query.filter_by(student_id=ann.id).count() == 2
+
+        results = confirm_requests(staff.id, "reject", activity_name="help_desk")
+        self.assertListEqual([(r['id'], r['outcome']) for r in results], [(reject_ids[0], "rejected")])
+        assert get_user(ann.id).hours == 5
+        assert Request.query.count() == 0
+
+
+def test_confirm_requests_api(empty_db):
+    staff = create_staff("tia", "tiapass")
+    ann = get_user(2)
+    ids = add_requests(ann, 1, 4)
+    headers = {'Authorization': f'Bearer {create_access_token(identity=staff)}'}
+    response = empty_db.post('/api/requests/confirm', json={'action': 'approve', 'ids': ids}, headers=headers)
+    assert response.get_json()['results'][0]['outcome'] == 'approved'
+    assert get_user(ann.id).hours == 9
+    response = empty_db.post('/api/requests/confirm', json={'action': 'approve'}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_iter_requests(empty_db):
+    ann, ben = get_user(2), create_student("ben", "benpass")
+    ids = add_requests(ann, 1, 1, 6) + add_requests(ben, 2, 8, 2)
+    rows = list(iter_requests(chunk_size=1))
+    assert [row.id for row in rows] == ids
+    assert [row.student for row in iter_requests(activity="help_desk")] == ["ben", "ben"]
+    assert [row.hours for row in iter_requests(student="ann", min_hours=5)] == [6]
+    assert [row.id for row in iter_requests(after_id=ids[0], limit=2, chunk_size=1)] == ids[1:3]
+
+    headers = {'Authorization': f'Bearer {create_access_token(identity=get_user(1))}'}
+    response = empty_db.get(f'/api/requests?student=ben&after_id={ids[2]}', headers=headers)
+    assert response.get_json() == [{'id': ids[3], 'student': 'ben', 'activity': 'help_desk', 'hours': 2}]
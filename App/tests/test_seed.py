@@ -0,0 +1,52 @@
+import pytest, unittest
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import User, Student, Staff, Log, Request
+from App.controllers import seed_data, get_top_students, authenticate, create_student, get_user_by_username, SEED_PASSWORD
+from App.perf import compare_to_baseline
+
+'''
+   Unit Tests
+'''
+class BenchUnitTests(unittest.TestCase):
+
+    def test_compare_to_baseline(self):
+        baseline = {'results': {'100': {'leaderboard': 10.0, 'login': 100.0, 'accolades': 0.2}}}
+        current = {'results': {'100': {'leaderboard': 10.5, 'login': 140.0, 'accolades': 0.6},
+                               '1000': {'leaderboard': 50.0}}}
+        regressions = compare_to_baseline(current, baseline, threshold=0.25)
+        assert [(r['size'], r['benchmark']) for r in regressions] == [('100', 'login')]
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class SeedIntegrationTests(unittest.TestCase):
+
+    def test_seed_data(self):
+        seed_data(students=30, staff=2, logs=200, requests=25, seed=1)
+        assert db.session.query(Student).count() == 30
+        assert db.session.query(Staff).count() == 2
+        assert db.session.query(Request).count() == 25
+        logged = db.session.execute(db.select(db.func.sum(Log.hours))).scalar()
+        assert sum(hours for _, _, hours in get_top_students()) == logged
+        username = get_top_students(1)[0][1]
+        assert authenticate(username, SEED_PASSWORD) is not None
+
+    def test_seed_skips_taken_names(self):
+        next_id = db.session.execute(db.select(db.func.max(User.id))).scalar() + 1
+        # the name seeding would give the second new user
+        create_student(f"stu{next_id + 2}", "pass")
+        result = seed_data(students=3, seed=2)
+        assert result['students'] == 2
+        assert get_user_by_username(f"stu{next_id + 2}").id == next_id
+        assert create_student("after-seed", "pass").id > next_id + 3
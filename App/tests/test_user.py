@@ -0,0 +1,97 @@
+import pytest, unittest
+from flask_jwt_extended import create_access_token
+from werkzeug.security import check_password_hash
+
+from App.main import create_app
+from App.database import db, create_db
+from App.controllers import (
+    create_student,
+    create_staff,
+    iter_users,
+    get_users_page,
+    get_user,
+    get_user_by_username,
+    import_users
+)
+from App.passwords import hash_passwords
+
+'''
+   Unit Tests
+'''
+class PasswordHashingUnitTests(unittest.TestCase):
+
+    def test_hash_passwords_on_process_pool(self):
+        progress = []
+        hashes = hash_passwords(['a', 'b', 'c'], method='pbkdf2:sha256:1000', processes=2,
+                                on_progress=lambda done, total: progress.append((done, total)))
+        assert [check_password_hash(h, p) for h, p in zip(hashes, ['a', 'b', 'c'])] == [True] * 3
+        assert progress[-1] == (3, 3)
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class UserListingIntegrationTests(unittest.TestCase):
+
+    def test_iter_users(self):
+        create_student("ann", "annpass")
+        create_staff("sam", "sampass")
+        create_student("ben", "benpass")
+        self.assertListEqual(list(iter_users(chunk_size=2)),
+                             [(1, "ann", "student"), (2, "sam", "staff"), (3, "ben", "student")])
+        assert [u.username for u in iter_users(user_type="student", after_id=1)] == ["ben"]
+
+        users, next_after_id = get_users_page(limit=2)
+        assert [u.id for u in users] == [1, 2] and next_after_id == 2
+        users, next_after_id = get_users_page(limit=2, after_id=2)
+        assert [u.id for u in users] == [3] and next_after_id is None
+
+
+def test_users_api(empty_db):
+    assert empty_db.get('/api/users?type=staff').get_json() == [{'id': 2, 'username': 'sam', 'type': 'staff'}]
+    assert [u['id'] for u in empty_db.get('/api/users?after_id=1&limit=1').get_json()] == [2]
+    assert len(empty_db.get('/api/users').get_json()) == 3
+    page = empty_db.get('/users?limit=2').get_data(as_text=True)
+    assert 'after_id=2' in page and 'ben' not in page
+    assert empty_db.get('/users?limit=0').status_code == 200
+
+
+def test_import_users(empty_db):
+    result = import_users([
+        {'username': 'cat', 'password': 'catpass'},
+        {'username': 'dan', 'password': 'danpass', 'type': 'staff'},
+        {'username': 'ann', 'password': 'x'},
+        {'username': 'cat', 'password': 'x'},
+        {'username': 'eve', 'password': 'x', 'type': 'admin'},
+    ])
+    assert result['created'] == 2
+    assert [error['row'] for error in result['errors']] == [3, 4, 5]
+    assert get_user_by_username('dan').type == 'staff'
+    assert get_user_by_username('cat').check_password('catpass')
+
+    result = import_users([{'username': 'fay', 'password': 'x'}, {'username': 'ann', 'password': 'x'}],
+                          skip_duplicates=False)
+    assert result['created'] == 0 and get_user_by_username('fay') is None
+
+
+def test_import_users_api(empty_db):
+    headers = {'Authorization': f'Bearer {create_access_token(identity=get_user(2))}'}
+    response = empty_db.post('/api/users/import', data='username,password\ngus,guspass\nann,x\n',
+                             content_type='text/csv', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['created'] == 1
+    assert get_user_by_username('gus') is not None
+    response = empty_db.post('/api/users/import', json=[1, {'username': 'a', 'password': 'b', 'type': ['x']},
+                                                        {'username': 7, 'password': 'b'}, {'username': 'hal', 'password': 8}],
+                             headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['created'] == 0
+    assert [error['row'] for error in response.get_json()['errors']] == [1, 2, 3, 4]
@@ -0,0 +1,60 @@
+import pytest, threading, unittest
+from flask import current_app
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Log, Request
+from App.controllers import (
+    create_student,
+    create_staff,
+    create_activity,
+    create_log,
+    create_request,
+    get_user
+)
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def empty_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db',
+                      'WRITE_BEHIND': True, 'WRITE_BEHIND_MAX_DELAY_MS': 50})
+    create_db()
+    yield app.test_client()
+    db.drop_all()
+
+
+class WriteQueueIntegrationTests(unittest.TestCase):
+
+    def test_concurrent_writes_are_grouped(self):
+        app = current_app._get_current_object()
+        staff = create_staff("sam", "sampass")
+        students = [create_student(f"student{i}", "pass") for i in range(4)]
+        create_activity("volunteering")
+        staff_id, student_ids = staff.id, [student.id for student in students]
+        log_ids = []
+
+        def log_hours(student_id):
+            with app.app_context():
+                log_ids.append(create_log(staff_id, student_id, 1, 3).id)
+                create_request(student_id, 1, 2)
+
+        threads = [threading.Thread(target=log_hours, args=(sid,)) for sid in student_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        db.session.expire_all()
+        assert sorted(log_ids) == sorted(db.session.scalars(db.select(Log.id)))
+        assert db.session.query(Request).count() == 4
+        assert [get_user(sid).hours for sid in student_ids] == [3, 3, 3, 3]
+
+    def test_failed_entry_does_not_fail_the_group(self):
+        write_queue = current_app.extensions['write_queue']
+        bad = write_queue.submit((Request, {'student_id': 1, 'activity_id': 1, 'hours': None}))
+        good = write_queue.submit((Request, {'student_id': 1, 'activity_id': 1, 'hours': 5}))
+        assert good.result(5) is not None
+        with pytest.raises(Exception):
+            bad.result(5)
@@ -3,8 +3,14 @@
 from .user import user_views
 from .index import index_views
 from .auth import auth_views
+from .leaderboard import leaderboard_views
+from .log import log_views
+from .request import request_views
+from .metrics import metrics_views
+from .award import award_views
+from .report import report_views
 from .admin import setup_admin
 
 
-views = [user_views, index_views, auth_views] 
+views = [user_views, index_views, auth_views, leaderboard_views, log_views, request_views, metrics_views, award_views, report_views] 
 # blueprints must be added to this list
\ No newline at end of file
@@ -1,21 +1,166 @@
 from flask_admin.contrib.sqla import ModelView
+from flask_admin.contrib.sqla.filters import BaseSQLAFilter, FilterEqual, DateTimeBetweenFilter
 from flask_jwt_extended import jwt_required, current_user, unset_jwt_cookies, set_access_cookies
 from flask_admin import Admin
 from flask import flash, redirect, url_for, request
+from sqlalchemy import select, func
+from sqlalchemy.orm import Query, load_only, joinedload
+from App.cache import LRUCache
 from App.database import db
-from App.models import User
+from App.models import User, Student, Staff, Log, Request, Activity
+from App.controllers import (current_identity, bump_table_versions, invalidate_identity, refresh_leaderboard,
+                             reset_activity_catalog)
+
+
+class CachedCountQuery(Query):
+    """A list view's COUNT(*) query whose result is reused per distinct statement while it is in the cache."""
+
+    def scalar(self):
+        compiled = self.statement.compile()
+        key = (str(compiled), repr(sorted(compiled.params.items())))
+        count = self._count_cache.get(key)
+        if count is None:
+            count = super().scalar()
+            self._count_cache.set(key, count)
+        return count
+
+class FilterByName(BaseSQLAFilter):
+    """Equality on a foreign key, given the referenced row's name; resolved by a subquery so the FK index is used."""
+
+    def __init__(self, column, name, field):
+        super().__init__(column, name)
+        self.field = field
+
+    def apply(self, query, value, alias=None):
+        model = self.field.class_
+        return query.filter(self.column == select(model.id).where(self.field == value).scalar_subquery())
+
+    def operation(self):
+        return 'equals'
+
 
 class AdminView(ModelView):
+    page_size = 50
+    column_display_pk = True
+    # relationships are loaded through query_options, only for the columns on the page
+    column_auto_select_related = False
+    query_options = ()
+    count_cache = None
 
-    @jwt_required()
     def is_accessible(self):
-        return current_user is not None
+        # called for every view in the menu; current_identity decodes the JWT once per request
+        identity = current_identity()
+        return identity is not None and identity.type == 'staff'
 
     def inaccessible_callback(self, name, **kwargs):
         # redirect to login page if user doesn't have access
-        flash("Login to access admin")
-        return redirect(url_for('index_page', next=request.url))
+        flash("Login as staff to access admin")
+        return redirect(url_for('index_views.index_page', next=request.url))
+
+    def get_query(self):
+        return super().get_query().options(*self.query_options)
+
+    def get_count_query(self):
+        if self.count_cache is None:
+            return super().get_count_query()
+        query = CachedCountQuery([func.count('*')], session=self.session()).select_from(self.model)
+        query._count_cache = self.count_cache
+        return query
+
+    # admin edits skip the controllers, so keep their caches and derived data in step here
+    def on_model_change(self, form, model, is_created):
+        if isinstance(model, User):
+            bump_table_versions('user', 'student')
+        elif isinstance(model, Activity):
+            bump_table_versions('activity')
+
+    def after_model_change(self, form, model, is_created):
+        if isinstance(model, User):
+            invalidate_identity(model.id)
+            if isinstance(model, Student):
+                refresh_leaderboard([model.id])
+        elif isinstance(model, Activity):
+            reset_activity_catalog()
+
+    def on_model_delete(self, model):
+        if isinstance(model, User):
+            bump_table_versions('user', 'student')
+
+    def after_model_delete(self, model):
+        if isinstance(model, User):
+            invalidate_identity(model.id)
+
+
+class UserAdmin(AdminView):
+    # only the user table's columns: no per-row loads of the student/staff subclass rows
+    column_list = ('id', 'username', 'type')
+    column_sortable_list = ('id', 'username')
+    column_filters = [FilterEqual(User.username, 'Username')]
+    query_options = (load_only(User.id, User.username, User.type),)
+
+class StudentAdmin(AdminView):
+    column_list = ('id', 'username', 'hours')
+    # hours sorts on ix_student_hours
+    column_sortable_list = ('id', 'username', 'hours')
+    column_default_sort = ('hours', True)
+    column_filters = [FilterEqual(Student.username, 'Username')]
+    query_options = (load_only(Student.id, Student.username, Student.hours),)
+    # hours and accolades are maintained from the logs; students are created through the controllers
+    form_columns = ('username',)
+    can_create = False
+
+class LogAdmin(AdminView):
+    column_list = ('id', 'student.username', 'staff.username', 'activity.name', 'hours', 'created_at')
+    column_labels = {'student.username': 'Student', 'staff.username': 'Staff', 'activity.name': 'Activity'}
+    column_sortable_list = ('id', 'created_at')
+    column_default_sort = ('id', True)
+    column_filters = [
+        FilterByName(Log.student_id, 'Student', User.username),
+        FilterByName(Log.staff_id, 'Staff', User.username),
+        FilterByName(Log.activity_id, 'Activity', Activity.name),
+        DateTimeBetweenFilter(Log.created_at, 'Created'),
+    ]
+    query_options = (
+        joinedload(Log.student).load_only(Student.username),
+        joinedload(Log.staff).load_only(Staff.username),
+        joinedload(Log.activity).load_only(Activity.name),
+    )
+    # logs drive hour totals, awards and the leaderboard; change them through the controllers
+    can_create = can_edit = can_delete = False
+
+class RequestAdmin(AdminView):
+    column_list = ('id', 'student.username', 'activity.name', 'hours')
+    column_labels = {'student.username': 'Student', 'activity.name': 'Activity'}
+    column_sortable_list = ('id',)
+    column_default_sort = ('id', True)
+    column_filters = [
+        FilterByName(Request.student_id, 'Student', User.username),
+        FilterByName(Request.activity_id, 'Activity', Activity.name),
+    ]
+    query_options = (
+        joinedload(Request.student).load_only(Student.username),
+        joinedload(Request.activity).load_only(Activity.name),
+    )
+    # approving creates logs and hours; use `flask user confirm-batch` or /api/requests/confirm
+    can_create = can_edit = can_delete = False
+
+class ActivityAdmin(AdminView):
+    column_list = ('id', 'name')
+    column_sortable_list = ('id', 'name')
+    form_columns = ('name',)
+    can_delete = False
+
 
 def setup_admin(app):
     admin = Admin(app, name='FlaskMVC', template_mode='bootstrap3')
-    admin.add_view(AdminView(User, db.session))
\ No newline at end of file
+    views = [
+        UserAdmin(User, db.session),
+        StudentAdmin(Student, db.session),
+        LogAdmin(Log, db.session),
+        RequestAdmin(Request, db.session),
+        ActivityAdmin(Activity, db.session),
+    ]
+    for view in views:
+        if view.model in (User, Student, Log, Request):
+            view.count_cache = LRUCache(maxsize=256, ttl=app.config['ADMIN_COUNT_CACHE_TTL'])
+        admin.add_view(view)
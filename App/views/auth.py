@@ -5,8 +5,7 @@ from flask_jwt_extended import jwt_required, current_user, unset_jwt_cookies, se
 from.index import index_views
 
 from App.controllers import (
-    login,
-
+    jwt_authenticate,
 )
 
 auth_views = Blueprint('auth_views', __name__, template_folder='../templates')
@@ -27,7 +26,7 @@ def identify_page():
 @auth_views.route('/login', methods=['POST'])
 def login_action():
     data = request.form
-    token = login(data['username'], data['password'])
+    token = jwt_authenticate(data['username'], data['password'])
     response = redirect(request.referrer)
     if not token:
         flash('Bad username or password given'), 401
@@ -50,7 +49,7 @@ API Routes
 @auth_views.route('/api/login', methods=['POST'])
 def user_login_api():
   data = request.json
-  token = login(data['username'], data['password'])
+  token = jwt_authenticate(data['username'], data['password'])
   if not token:
     return jsonify(message='bad username or password given'), 401
   response = jsonify(access_token=token) 
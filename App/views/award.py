@@ -0,0 +1,22 @@
+from flask import Blueprint, request
+
+from App.database import replica_reads
+from App.controllers import iter_awards, award_row_json
+from .streaming import stream_json_array
+
+award_views = Blueprint('award_views', __name__, template_folder='../templates')
+
+'''
+API Routes
+'''
+
+@award_views.route('/api/awards', methods=['GET'])
+@replica_reads
+def list_awards_action():
+    rows = iter_awards(
+        student=request.args.get('student'),
+        activity=request.args.get('activity'),
+        after_id=request.args.get('after_id', type=int),
+        limit=min(request.args.get('limit', 50, type=int), 500)
+    )
+    return stream_json_array(award_row_json(row) for row in rows)
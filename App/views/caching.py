@@ -0,0 +1,93 @@
+from functools import wraps
+from datetime import timezone
+from flask import Response, current_app, request
+
+from App.cache import LRUCache
+from App.controllers import get_table_versions
+
+
+def _response_cache():
+    cache = current_app.extensions.get('response_cache')
+    if cache is None:
+        cache = LRUCache(maxsize=current_app.config['RESPONSE_CACHE_SIZE'])
+        current_app.extensions['response_cache'] = cache
+    return cache
+
+def _capture(response, store, max_bytes):
+    # pass a streamed body through unchanged, keeping a copy if it completes within max_bytes
+    source = response.response
+    def generate():
+        chunks, size = [], 0
+        try:
+            for chunk in source:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                if chunks is not None:
+                    size += len(chunk)
+                    chunks = chunks + [chunk] if size <= max_bytes else None
+                yield chunk
+        finally:
+            if hasattr(source, 'close'):
+                source.close()
+        if chunks is not None:
+            store(b''.join(chunks))
+    response.response = generate()
+
+def versioned_response(*tables):
+    """
+    Conditional GET and a per-worker response cache for views that only read `tables`.
+    The tables' change counters give an ETag and Last-Modified, so a client that already
+    has the current version gets a 304; If-Modified-Since only counts without an ETag
+    and when it is later than the last change's second. Successful bodies are kept in an LRU cache keyed
+    by endpoint, view arguments, query string and versions; a write to any of the tables
+    bumps its counter, so stale entries are never served and simply age out.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = get_table_versions(tables)
+            etag = '-'.join(f'{name}.{versions[name][0]}' for name in tables if name in versions)
+            modified = max((updated_at for _, updated_at in versions.values()), default=None)
+            if modified is not None:
+                modified = modified.replace(tzinfo=timezone.utc, microsecond=0)
+
+            def conditional(response):
+                response.set_etag(etag)
+                response.last_modified = modified
+                # clients may keep the body but must revalidate before reusing it
+                response.cache_control.no_cache = True
+                return response
+
+            # the ETag names exact versions, so it decides whenever the client sends one. Last-Modified
+            # only has whole seconds and a later write can share the second of the copy the client
+            # holds, so a date alone proves nothing changed only once it is past that second
+            if request.if_none_match:
+                unchanged = request.if_none_match.contains(etag)
+            else:
+                unchanged = bool(modified and request.if_modified_since and request.if_modified_since > modified)
+            if unchanged:
+                return conditional(Response(status=304))
+
+            cache = _response_cache()
+            key = (request.endpoint, tuple(sorted(kwargs.items())),
+                   tuple(sorted(request.args.items(multi=True))), etag)
+            cached = cache.get(key)
+            if cached is not None:
+                body, mimetype = cached
+                response = conditional(Response(body, mimetype=mimetype))
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            store = lambda body: cache.set(key, (body, response.mimetype))
+            max_bytes = current_app.config['RESPONSE_CACHE_MAX_BYTES']
+            if response.is_streamed:
+                _capture(response, store, max_bytes)
+            elif response.content_length is not None and response.content_length <= max_bytes:
+                store(response.get_data())
+            response.headers['X-Cache'] = 'MISS'
+            return conditional(response)
+        return wrapper
+    return decorator
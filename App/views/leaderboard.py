@@ -0,0 +1,55 @@
+from flask import Blueprint, current_app, jsonify, request
+
+from App.controllers import (
+    get_leaderboard_page,
+    get_student_rank
+)
+from App.live import get_leaderboard_feed
+from App.database import replica_reads
+from .caching import versioned_response
+from .streaming import stream_events
+
+leaderboard_views = Blueprint('leaderboard_views', __name__, template_folder='../templates')
+
+def parse_cursor(value):
+    # cursors look like "<hours>:<username>"; usernames may contain ':' so split once
+    hours, _, username = value.partition(':')
+    return int(hours), username
+
+'''
+API Routes
+'''
+
+@leaderboard_views.route('/api/leaderboard', methods=['GET'])
+@replica_reads
+@versioned_response('user', 'student')
+def get_leaderboard_action():
+    limit = max(1, min(request.args.get('limit', 25, type=int), 100))
+    after = request.args.get('after')
+    try:
+        cursor = parse_cursor(after) if after else None
+    except ValueError:
+        return jsonify(message='invalid cursor'), 400
+    students, next_cursor = get_leaderboard_page(limit=limit, after=cursor)
+    return jsonify({
+        'students': students,
+        'next': f'{next_cursor[0]}:{next_cursor[1]}' if next_cursor else None
+    })
+
+@leaderboard_views.route('/api/leaderboard/<username>', methods=['GET'])
+@replica_reads
+@versioned_response('user', 'student')
+def get_student_rank_action(username):
+    ranked = get_student_rank(username)
+    if ranked is None:
+        return jsonify(message='student not found'), 404
+    rank, hours = ranked
+    return jsonify({'rank': rank, 'username': username, 'hours': hours})
+
+@leaderboard_views.route('/api/stream/leaderboard', methods=['GET'])
+def stream_leaderboard_action():
+    limit = max(1, min(request.args.get('limit', 25, type=int), 100))
+    feed = get_leaderboard_feed()
+    # the generator outlives the request, so it reads nothing from the request context
+    events = feed.events(feed.subscribe(), limit, heartbeat=current_app.config['LEADERBOARD_STREAM_HEARTBEAT'])
+    return stream_events(events)
@@ -0,0 +1,55 @@
+import io
+from datetime import datetime
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import current_user
+
+from App.database import replica_reads
+from App.controllers import (
+    role_required,
+    read_entries,
+    bulk_log_hours,
+    iter_logs,
+    log_row_json
+)
+from .streaming import stream_json_array
+
+log_views = Blueprint('log_views', __name__, template_folder='../templates')
+
+'''
+API Routes
+'''
+
+@log_views.route('/api/logs', methods=['GET'])
+@role_required('staff')
+@replica_reads
+def list_logs_action():
+    try:
+        since, until = (datetime.fromisoformat(request.args[key]) if request.args.get(key) else None
+                        for key in ('since', 'until'))
+    except ValueError:
+        return jsonify(message='since/until must be ISO 8601 datetimes'), 400
+    rows = iter_logs(
+        student=request.args.get('student'),
+        activity=request.args.get('activity'),
+        staff=request.args.get('staff'),
+        since=since,
+        until=until,
+        after_id=request.args.get('after_id', type=int),
+        limit=request.args.get('limit', type=int)
+    )
+    return stream_json_array(log_row_json(row) for row in rows)
+
+@log_views.route('/api/logs/bulk', methods=['POST'])
+@role_required('staff')
+def bulk_log_action():
+    if request.is_json:
+        entries = request.get_json()
+        if not isinstance(entries, list):
+            return jsonify(message='expected a JSON array of log entries'), 400
+    else:
+        format = 'csv' if request.mimetype == 'text/csv' else 'jsonl'
+        try:
+            entries = list(read_entries(io.StringIO(request.get_data(as_text=True)), format))
+        except ValueError as e:
+            return jsonify(message=f'could not parse body: {e}'), 400
+    return jsonify(bulk_log_hours(current_user.id, entries))
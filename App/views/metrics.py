@@ -0,0 +1,10 @@
+from flask import Blueprint, Response, current_app, abort
+
+metrics_views = Blueprint('metrics_views', __name__)
+
+@metrics_views.route('/metrics', methods=['GET'])
+def metrics_page():
+    metrics = current_app.extensions.get('metrics')
+    if metrics is None:
+        abort(404)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
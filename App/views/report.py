@@ -0,0 +1,32 @@
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+
+from App.database import replica_reads
+from App.controllers import role_required, export_report, REPORTS, REPORT_FORMATS
+
+report_views = Blueprint('report_views', __name__, template_folder='../templates')
+
+MIMETYPES = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+'''
+API Routes
+'''
+
+@report_views.route('/api/reports/<by>', methods=['GET'])
+@role_required('staff')
+@replica_reads
+def export_report_action(by):
+    format = request.args.get('format', 'csv')
+    if by not in REPORTS or format not in REPORT_FORMATS:
+        return jsonify(message=f"report must be one of {', '.join(REPORTS)} and format one of {', '.join(REPORT_FORMATS)}"), 400
+    progress = {'rows': 0, 'seconds': 0.0}
+    def on_progress(rows, seconds):
+        progress.update(rows=rows, seconds=seconds)
+    def generate():
+        # stream_with_context keeps the session, and with it the server-side cursor, open while the body is sent
+        yield from export_report(by, format, chunk_size=max(1, request.args.get('chunk_size', 1000, type=int)),
+                                 on_progress=on_progress)
+        current_app.logger.info('Exported %s report: %d rows in %.1fs [%.0f rows/s]', by, progress['rows'],
+                                progress['seconds'], progress['rows'] / progress['seconds'] if progress['seconds'] else 0)
+    response = Response(stream_with_context(generate()), mimetype=MIMETYPES[format])
+    response.headers['Content-Disposition'] = f'attachment; filename=hours-by-{by}.{format}'
+    return response
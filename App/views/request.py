@@ -0,0 +1,45 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import current_user
+
+from App.database import replica_reads
+from App.controllers import (
+    role_required,
+    iter_requests,
+    confirm_requests
+)
+from .streaming import stream_json_array
+
+request_views = Blueprint('request_views', __name__, template_folder='../templates')
+
+'''
+API Routes
+'''
+
+@request_views.route('/api/requests', methods=['GET'])
+@role_required('staff')
+@replica_reads
+def list_requests_action():
+    rows = iter_requests(
+        activity=request.args.get('activity'),
+        student=request.args.get('student'),
+        min_hours=request.args.get('min_hours', type=int),
+        after_id=request.args.get('after_id', type=int),
+        limit=request.args.get('limit', type=int)
+    )
+    return stream_json_array(row._asdict() for row in rows)
+
+@request_views.route('/api/requests/confirm', methods=['POST'])
+@role_required('staff')
+def confirm_requests_action():
+    data = request.get_json(silent=True) or {}
+    action = data.get('action')
+    ids = data.get('ids')
+    activity = data.get('activity')
+    if action not in ('approve', 'reject'):
+        return jsonify(message="action must be 'approve' or 'reject'"), 400
+    if (ids is None) == (activity is None):
+        return jsonify(message="provide either 'ids' or 'activity'"), 400
+    if ids is not None and not (isinstance(ids, list) and all(isinstance(i, int) for i in ids)):
+        return jsonify(message="'ids' must be a list of request ids"), 400
+    results = confirm_requests(current_user.id, action, request_ids=ids, activity_name=activity)
+    return jsonify(results=results)
@@ -0,0 +1,37 @@
+import json
+from flask import Response, stream_with_context
+
+
+def stream_json_array(items):
+    """Serialize an iterable of dicts as a JSON array, one element at a time."""
+    def generate():
+        yield '['
+        for i, item in enumerate(items):
+            yield (',' if i else '') + json.dumps(item)
+        yield ']'
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+def stream_events(events, retry_ms=3000):
+    """
+    Serve (event, data) pairs as Server-Sent Events, data serialized as JSON.
+    None yields a comment line, which keeps idle connections and proxies open.
+    """
+    def generate():
+        try:
+            yield f'retry: {retry_ms}\n\n'
+            for item in events:
+                if item is None:
+                    yield ': keepalive\n\n'
+                else:
+                    event, data = item
+                    yield f'event: {event}\ndata: {json.dumps(data)}\n\n'
+        finally:
+            # a disconnect closes this generator; pass it on so events can clean up
+            if hasattr(events, 'close'):
+                events.close()
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # nginx would otherwise buffer the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,3 +1,4 @@
+import io
 from flask import Blueprint, render_template, jsonify, request, send_from_directory, flash, redirect, url_for
 from flask_jwt_extended import jwt_required, current_user as jwt_current_user
 
@@ -7,15 +8,25 @@ from App.controllers import (
     create_user,
     get_all_users,
     get_all_users_json,
+    iter_users,
+    get_users_page,
+    import_users,
+    read_entries,
+    role_required,
     jwt_required
 )
+from .streaming import stream_json_array
+from .caching import versioned_response
+from App.database import replica_reads
 
 user_views = Blueprint('user_views', __name__, template_folder='../templates')
 
 @user_views.route('/users', methods=['GET'])
 def get_user_page():
-    users = get_all_users()
-    return render_template('users.html', users=users)
+    limit = max(1, min(request.args.get('limit', 50, type=int), 500))
+    user_type = request.args.get('type')
+    users, next_after_id = get_users_page(limit=limit, after_id=request.args.get('after_id', type=int), user_type=user_type)
+    return render_template('users.html', users=users, next_after_id=next_after_id, limit=limit, user_type=user_type)
 
 @user_views.route('/users', methods=['POST'])
 def create_user_action():
@@ -25,9 +36,15 @@ def create_user_action():
     return redirect(url_for('user_views.get_user_page'))
 
 @user_views.route('/api/users', methods=['GET'])
+@replica_reads
+@versioned_response('user')
 def get_users_action():
-    users = get_all_users_json()
-    return jsonify(users)
+    users = iter_users(
+        user_type=request.args.get('type'),
+        after_id=request.args.get('after_id', type=int),
+        limit=request.args.get('limit', type=int)
+    )
+    return stream_json_array({'id': id, 'username': username, 'type': type} for id, username, type in users)
 
 @user_views.route('/api/users', methods=['POST'])
 def create_user_endpoint():
@@ -35,6 +52,22 @@ def create_user_endpoint():
     user = create_user(data['username'], data['password'])
     return jsonify({'message': f"user {user.username} created with id {user.id}"})
 
+@user_views.route('/api/users/import', methods=['POST'])
+@role_required('staff')
+def import_users_action():
+    if request.is_json:
+        entries = request.get_json()
+        if not isinstance(entries, list):
+            return jsonify(message='expected a JSON array of users'), 400
+    else:
+        format = 'csv' if request.mimetype == 'text/csv' else 'jsonl'
+        try:
+            entries = list(read_entries(io.StringIO(request.get_data(as_text=True)), format))
+        except ValueError as e:
+            return jsonify(message=f'could not parse body: {e}'), 400
+    skip_duplicates = request.args.get('on_duplicate', 'skip') != 'fail'
+    return jsonify(import_users(entries, skip_duplicates=skip_duplicates))
+
 @user_views.route('/static/users', methods=['GET'])
 def static_user_page():
   return send_from_directory('static', 'static-user.html')
\ No newline at end of file
@@ -0,0 +1,115 @@
+import atexit, os, queue, threading, time
+from concurrent.futures import Future
+from flask import current_app
+
+from App.database import db
+
+_STOP = object()
+
+
+class WriteQueue:
+    """
+    Write-behind queue: callers submit inserts and block until they are committed,
+    while one background writer groups everything queued into a single transaction,
+    flushing after batch_size entries or max_delay seconds, whichever comes first.
+    """
+
+    def __init__(self, app, write, batch_size=200, max_delay=0.01, ack_timeout=30):
+        self.app = app
+        self.write = write
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.ack_timeout = ack_timeout
+        self._lock = threading.Lock()
+        self._pid = None
+        self._closed = False
+        atexit.register(self.close)
+
+    def _start(self):
+        # started on first use, so each forked worker gets its own queue and writer
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._writer = threading.Thread(target=self._run, name='write-behind', daemon=True)
+                self._writer.start()
+                # set last: submit() skips _start() once the pid matches
+                self._pid = os.getpid()
+
+    def submit(self, entry):
+        """Queue an entry for the writer; the returned future resolves once it is committed."""
+        if self._closed:
+            raise RuntimeError('write queue is closed')
+        if self._pid != os.getpid():
+            self._start()
+        future = Future()
+        self._queue.put((entry, future))
+        return future
+
+    def put(self, model, values):
+        """Insert one row of model and wait until it is durable; returns the new id."""
+        return self.submit((model, values)).result(self.ack_timeout)
+
+    def close(self):
+        """Stop accepting entries and wait for everything already queued to be written."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._pid == os.getpid():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    # write what is left, then exit
+                    stopping = True
+                    break
+                batch.append(item)
+            with self.app.app_context():
+                self._flush(batch)
+
+    def _flush(self, batch):
+        try:
+            results = self.write([entry for entry, _ in batch])
+        except Exception:
+            db.session.rollback()
+            # one bad entry must not fail the whole group: retry them one transaction each
+            for entry, future in batch:
+                try:
+                    future.set_result(self.write([entry])[0])
+                except Exception as e:
+                    db.session.rollback()
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+def setup_write_queue(app, write):
+    """Route Log and Request inserts through a WriteQueue when WRITE_BEHIND is enabled."""
+    if app.config.get('WRITE_BEHIND'):
+        app.extensions['write_queue'] = WriteQueue(
+            app, write,
+            batch_size=app.config['WRITE_BEHIND_BATCH_SIZE'],
+            max_delay=app.config['WRITE_BEHIND_MAX_DELAY_MS'] / 1000,
+            ack_timeout=app.config['WRITE_BEHIND_ACK_TIMEOUT']
+        )
+
+def get_write_queue():
+    """The app's write queue, or None when writes should commit inline."""
+    write_queue = current_app.extensions.get('write_queue')
+    # a deferred_commits() block owns its transaction, so its writes stay inline
+    if write_queue is None or db.session.info.get('deferred_commits'):
+        return None
+    return write_queue
@@ -1,5 +1,5 @@
 # gunicorn_config.py
-import multiprocessing
+import glob, multiprocessing, os
 
 # The socket to bind.
 # "0.0.0.0" to bind to all interfaces. 8000 is the port number.
@@ -16,4 +16,13 @@ loglevel = 'info'
 
 # Where to log to
 accesslog = '-'  # '-' means log to stdout
-errorlog = '-'  # '-' means log to stderr
\ No newline at end of file
+errorlog = '-'  # '-' means log to stderr
+
+# Workers share request metrics through snapshot files in this directory; /metrics merges them.
+metrics_dir = os.environ.setdefault('FLASK_METRICS_DIR', '/tmp/app-metrics')
+
+def on_starting(server):
+    # counters restart with the server, so drop the previous run's worker snapshots.
+    # App is not imported here: the master must stay free of ssl before gevent patches the workers.
+    for path in glob.glob(os.path.join(metrics_dir, 'worker-*')):
+        os.remove(path)
@@ -0,0 +1,36 @@
+"""table_version change counters
+
+Revision ID: 3f8a2b6c4d21
+Revises: 7c1e4d2a9b10
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8a2b6c4d21'
+down_revision = '7c1e4d2a9b10'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ('user', 'student')
+
+
+def upgrade():
+    # Databases built with `flask init` may already have the table
+    if 'table_version' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    table = op.create_table(
+        'table_version',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.current_timestamp()),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(table, [{'name': name, 'version': 0} for name in VERSIONED_TABLES])
+
+
+def downgrade():
+    op.drop_table('table_version')
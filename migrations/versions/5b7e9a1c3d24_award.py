@@ -0,0 +1,41 @@
+"""award table for milestone crossings
+
+Revision ID: 5b7e9a1c3d24
+Revises: 9d2c5e7f1a3b
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e9a1c3d24'
+down_revision = '9d2c5e7f1a3b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases built with `flask init` may already have the table.
+    # Milestones reached before this revision are filled in by `flask accolades recompute`.
+    if 'award' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        'award',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('activity_id', sa.Integer(), nullable=False),
+        sa.Column('milestone', sa.Integer(), nullable=False),
+        sa.Column('awarded_at', sa.DateTime(), nullable=False, server_default=sa.func.current_timestamp()),
+        sa.ForeignKeyConstraint(['student_id'], ['student.id']),
+        sa.ForeignKeyConstraint(['activity_id'], ['activity.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('student_id', 'activity_id', 'milestone', name='uq_award_student_activity_milestone')
+    )
+    op.create_index('ix_award_activity', 'award', ['activity_id', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_award_activity', table_name='award')
+    op.drop_table('award')
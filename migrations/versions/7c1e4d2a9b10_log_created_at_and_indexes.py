@@ -0,0 +1,48 @@
+"""log created_at and indexes
+
+Revision ID: 7c1e4d2a9b10
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e4d2a9b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'ix_log_student_activity': ['student_id', 'activity_id', 'hours'],
+    'ix_log_student_created': ['student_id', 'created_at'],
+    'ix_log_activity_created': ['activity_id', 'created_at'],
+    'ix_log_staff_created': ['staff_id', 'created_at'],
+    'ix_log_created': ['created_at'],
+}
+
+
+def upgrade():
+    # Databases built with `flask init` may already have the new schema
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('log')}
+    indexes = {index['name'] for index in inspector.get_indexes('log')}
+
+    # SQLite cannot ADD COLUMN with a CURRENT_TIMESTAMP default, so rebuild the table there
+    recreate = 'always' if op.get_bind().dialect.name == 'sqlite' else 'auto'
+    with op.batch_alter_table('log', recreate=recreate) as batch_op:
+        if 'created_at' not in columns:
+            batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=False,
+                                          server_default=sa.func.current_timestamp()))
+        for name, index_columns in INDEXES.items():
+            if name not in indexes:
+                batch_op.create_index(name, index_columns)
+
+
+def downgrade():
+    with op.batch_alter_table('log') as batch_op:
+        for name in INDEXES:
+            batch_op.drop_index(name)
+        batch_op.drop_column('created_at')
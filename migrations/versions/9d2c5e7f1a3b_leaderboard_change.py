@@ -0,0 +1,32 @@
+"""leaderboard_change feed for live leaderboard streams
+
+Revision ID: 9d2c5e7f1a3b
+Revises: 3f8a2b6c4d21
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2c5e7f1a3b'
+down_revision = '3f8a2b6c4d21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases built with `flask init` may already have the table
+    if 'leaderboard_change' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        'leaderboard_change',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('leaderboard_change')
@@ -0,0 +1,41 @@
+"""unique activity names, activity_milestone thresholds and the activity version
+
+Revision ID: b4e1f6a8c2d7
+Revises: 5b7e9a1c3d24
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e1f6a8c2d7'
+down_revision = '5b7e9a1c3d24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases built with `flask init` may already have the new schema
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'ix_activity_name' not in {index['name'] for index in inspector.get_indexes('activity')}:
+        # fails if two activities share a name; rename or merge them first
+        op.create_index('ix_activity_name', 'activity', ['name'], unique=True)
+    if 'activity_milestone' not in inspector.get_table_names():
+        op.create_table(
+            'activity_milestone',
+            sa.Column('activity_id', sa.Integer(), nullable=False),
+            sa.Column('hours', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['activity_id'], ['activity.id']),
+            sa.PrimaryKeyConstraint('activity_id', 'hours')
+        )
+    if not bind.execute(sa.text("SELECT 1 FROM table_version WHERE name = 'activity'")).first():
+        bind.execute(sa.text("INSERT INTO table_version (name, version, updated_at) VALUES ('activity', 0, CURRENT_TIMESTAMP)"))
+
+
+def downgrade():
+    op.execute("DELETE FROM table_version WHERE name = 'activity'")
+    op.drop_table('activity_milestone')
+    op.drop_index('ix_activity_name', table_name='activity')
@@ -0,0 +1,57 @@
+"""activity_hours totals, the leaderboard index and request indexes
+
+Revision ID: c8d3a5f0b6e9
+Revises: b4e1f6a8c2d7
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8d3a5f0b6e9'
+down_revision = 'b4e1f6a8c2d7'
+branch_labels = None
+depends_on = None
+
+REQUEST_INDEXES = {
+    'ix_request_student_id': ['student_id'],
+    'ix_request_activity_id': ['activity_id'],
+}
+
+
+def upgrade():
+    # Databases built with `flask init` may already have the new schema
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'activity_hours' not in inspector.get_table_names():
+        op.create_table(
+            'activity_hours',
+            sa.Column('student_id', sa.Integer(), nullable=False),
+            sa.Column('activity_id', sa.Integer(), nullable=False),
+            sa.Column('hours', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['student_id'], ['student.id']),
+            sa.ForeignKeyConstraint(['activity_id'], ['activity.id']),
+            sa.PrimaryKeyConstraint('student_id', 'activity_id')
+        )
+        # log writes add to these totals, so start them from the logs already recorded
+        op.execute(
+            "INSERT INTO activity_hours (student_id, activity_id, hours) "
+            "SELECT student_id, activity_id, SUM(hours) FROM log "
+            "WHERE student_id IS NOT NULL AND activity_id IS NOT NULL "
+            "GROUP BY student_id, activity_id"
+        )
+    if 'ix_student_hours' not in {index['name'] for index in inspector.get_indexes('student')}:
+        op.create_index('ix_student_hours', 'student', [sa.text('hours DESC'), 'id'])
+    indexes = {index['name'] for index in inspector.get_indexes('request')}
+    for name, columns in REQUEST_INDEXES.items():
+        if name not in indexes:
+            op.create_index(name, 'request', columns)
+
+
+def downgrade():
+    for name in REQUEST_INDEXES:
+        op.drop_index(name, table_name='request')
+    op.drop_index('ix_student_hours', table_name='student')
+    op.drop_table('activity_hours')
@@ -0,0 +1,32 @@
+"""widen student.accolade to text
+
+Revision ID: e2f7b9c1d4a6
+Revises: c8d3a5f0b6e9
+Create Date: 2026-10-18 16:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2f7b9c1d4a6'
+down_revision = 'c8d3a5f0b6e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite does not enforce VARCHAR lengths, and rebuilding student there would touch every table referencing it
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    with op.batch_alter_table('student') as batch_op:
+        batch_op.alter_column('accolade', type_=sa.Text(), existing_type=sa.String(length=120), existing_nullable=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    # fails if any accolade is longer than 120 characters
+    with op.batch_alter_table('student') as batch_op:
+        batch_op.alter_column('accolade', type_=sa.String(length=120), existing_type=sa.Text(), existing_nullable=False)
@@ -1,19 +1,45 @@
-import click, pytest, sys
+import click, contextlib, itertools, json, os, shlex, sys, time
 from flask import Flask
 from flask.cli import with_appcontext, AppGroup
 from sqlalchemy import select, func
 
-from App.database import db, get_migrate
+from App.database import db, get_migrate, deferred_commits, use_replica, sync_sqlite_replica
 from App.models import User, Student, Staff, Log, Request, Activity
 from App.main import create_app
+from App.profiling import profile_cli
+from App.write_queue import get_write_queue
 from App.controllers import ( create_student, create_staff ,get_all_users_json, get_all_users, initialize, login, logout, 
                              get_current_user, get_all_logs, get_all_logs_json, add_student_hours,
-                              resolve_milestone, milestones_for )
+                              get_top_students, get_student_rank,
+                              create_log, create_request, seed_data, import_users, SEED_PASSWORD, SEED_STAFF_PREFIX, SEED_STUDENT_PREFIX, read_entries, bulk_log_hours, confirm_requests, iter_requests,
+                              build_accolade, get_student_activity_hours, recompute_accolades, reset_leaderboard,
+                              iter_logs, log_row_json, create_activity, set_activity_milestones, get_activity_catalog,
+                              get_activity_id, get_activity_name, export_report, REPORTS, REPORT_FORMATS )
 
 
 # This commands file allow you to create convenient CLI commands for testing controllers
 
-app = create_app()
+# Commands that need every blueprint registered up front; the rest run on a lean app
+FULL_APP_COMMANDS = {'routes', 'shell'}
+
+def cli_command():
+    """
+    The top-level command click parsed for this `flask` run, or None. The app loads while
+    `flask` resolves a command (then it is the group's first protected arg) or inside a
+    built-in command like `routes` (then it is that command's name), never from raw argv,
+    where option values such as `--app wsgi` look like commands.
+    """
+    ctx = click.get_current_context(silent=True)
+    if ctx is None:
+        return None
+    if ctx.parent is None:
+        return ctx.protected_args[0] if ctx.protected_args else None
+    while ctx.parent.parent is not None:
+        ctx = ctx.parent
+    return ctx.info_name
+
+lean = os.environ.get('FLASK_RUN_FROM_CLI') == 'true' and cli_command() not in FULL_APP_COMMANDS
+app = create_app(lean=lean)
 migrate = get_migrate(app)
 
 def require_role(role):
@@ -25,7 +51,7 @@ def require_role(role):
                 raise click.ClickException("Not logged in.")
             if user.type != role:
                 raise click.ClickException(f'Not logged in as {role}. Cannot perform this function.')
-            return ctx.invoke(func, *args, **kwargs, current_user=get_current_user())
+            return ctx.invoke(func, *args, **kwargs, current_user=user)
         return wrapper
     return decorator
 
@@ -35,18 +61,37 @@ def init():
     initialize()
     print('database intialized')
 
+@app.cli.command("seed", help="Bulk-inserts synthetic students, staff, logs and requests")
+@click.option("--students", default=1000, show_default=True)
+@click.option("--staff", default=20, show_default=True)
+@click.option("--logs", default=10000, show_default=True)
+@click.option("--requests", default=1000, show_default=True)
+@click.option("--seed", "random_seed", type=int, default=None, help="Random seed for reproducible data")
+def seed_command(students, staff, logs, requests, random_seed):
+    start = time.perf_counter()
+    counts = seed_data(students=students, staff=staff, logs=logs, requests=requests, seed=random_seed)
+    print(f"Seeded {counts['students']} students, {counts['staff']} staff, {counts['logs']} logs and "
+          f"{counts['requests']} requests in {time.perf_counter() - start:.2f}s (password: {SEED_PASSWORD!r})")
+
 @app.cli.command("leaderboard", help="Shows the Leaderboard")
-def view_leaderboard():
-    students = (Student.query
-                .order_by(Student.hours.desc(), Student.username.asc())
-                .all())
-    
+@click.option("--top", "top", type=int, default=None, help="Only show the top N students")
+@click.option("--rank", "username", default=None, help="Show the rank of a single student")
+def view_leaderboard(top, username):
+    if username:
+        ranked = get_student_rank(username)
+        if ranked is None:
+            print(f'{username} is not a student.')
+            return
+        rank, hours = ranked
+        print(f'{rank}. {username}: {hours} Hours')
+        return
+    students = get_top_students(top)
     if not students:
         print('No students added.')
         return
     print('=====LEADERBOARD=====')
-    for i, student in enumerate(students):
-        print(f'{i+1}. {student.username}: {student.hours} Hours')
+    for rank, name, hours in students:
+        print(f'{rank}. {name}: {hours} Hours')
     
 
 '''
@@ -80,31 +125,53 @@ def create_user_command(user_type, username, password):
 @user_cli.command("list", help="Lists users in the database")
 @click.argument("format", default="string")
 def list_user_command(format):
-    if format == 'string':
-        print(get_all_users())
-    else:
-        print(get_all_users_json())
+    with use_replica():
+        if format == 'string':
+            print(get_all_users())
+        else:
+            print(get_all_users_json())
 
 @user_cli.command("logs", help="Lists logs in the database")
 @click.argument("format", default="string")
-def list_user_command(format):
-    if format == 'string':
-        print(get_all_logs())
-    else:
-        print(get_all_logs_json())
+@click.option("--student", default=None, help="Only logs for this student")
+@click.option("--activity", default=None, help="Only logs for this activity")
+@click.option("--staff", default=None, help="Only logs recorded by this staff member")
+@click.option("--since", type=click.DateTime(), default=None, help="Only logs created at or after this time")
+@click.option("--until", type=click.DateTime(), default=None, help="Only logs created before this time")
+@click.option("--after-id", type=int, default=None, help="Start after this log id")
+@click.option("--limit", type=int, default=None, help="Show at most this many logs")
+def list_logs_command(format, student, activity, staff, since, until, after_id, limit):
+    with use_replica():
+        rows = iter_logs(student=student, activity=activity, staff=staff, since=since, until=until,
+                         after_id=after_id, limit=limit)
+        if format == 'string':
+            print("LOG ID   STUDENT         STAFF           ACTIVITY            HOURS   CREATED")
+            for row in rows:
+                print(f"{row.id:<8} {row.student or '-':<15} {row.staff or '-':<15} {row.activity or '-':<19} {row.hours:<7} {row.created_at}")
+        else:
+            # streamed as one JSON array without holding every row in memory
+            print('[', end='')
+            for i, row in enumerate(rows):
+                print((',' if i else '') + json.dumps(log_row_json(row)), end='')
+            print(']')
 
 @user_cli.command("requests", help="Lists requests in the database")
+@click.option("--activity", default=None, help="Only requests for this activity")
+@click.option("--student", default=None, help="Only requests from this student")
+@click.option("--min-hours", type=int, default=None, help="Only requests of at least this many hours")
+@click.option("--after-id", type=int, default=None, help="Start after this request id")
+@click.option("--limit", type=int, default=None, help="Show at most this many requests")
 @require_role("staff")
-def view_all_requests(current_user):
-    requests = Request.query.all()
-    if not requests:
-        print('No requests found.')
-        return
-    print("REQUEST ID   STUDENT NAME    ACTIVITY            REQUESTED HOURS")
-    for request in requests:
-        student = Student.query.get(request.student_id)
-        activity = Activity.query.get(request.activity_id)
-        print(f"{request.id}            {student.username}             {activity.name}                {request.hours}")
+def view_all_requests(activity, student, min_hours, after_id, limit, current_user):
+    with use_replica():
+        rows = iter_requests(activity=activity, student=student, min_hours=min_hours, after_id=after_id, limit=limit)
+        first = next(rows, None)
+        if first is None:
+            print('No requests found.')
+            return
+        print("REQUEST ID   STUDENT NAME    ACTIVITY            REQUESTED HOURS")
+        for row in itertools.chain([first], rows):
+            print(f"{row.id}            {row.student}             {row.activity}                {row.hours}")
 
 
 @user_cli.command("login", help="Logs in the user")
@@ -124,50 +191,71 @@ def logout_user():
 @require_role("staff")
 def log_hours(username, hours, activity_name, current_user):
     student = Student.query.filter_by(username=username).first()
-    activity = Activity.query.filter_by(name=activity_name).first()
-    if not activity:
+    activity_id = get_activity_id(activity_name)
+    if activity_id is None:
         print("Activity does not exist. Enter existing activity")
         return
     if student:
-        log = Log(staff_id=current_user.id, student_id=student.id, hours=hours, activity_id=activity.id)
-        db.session.add(log)
-        add_student_hours(student_id=student.id, hours=hours)
-        print(f"Logged {hours} hours ({activity.name}) for {username} successfully.")
-        print(f"{student.username}'s Total Hours: {student.hours} Hours")
+        create_log(staff_id=current_user.id, student_id=student.id, activity_id=activity_id, hours=hours)
+        print(f"Logged {hours} hours ({activity_name}) for {username} successfully.")
+        # a queued log is committed by the background writer, so this session's total would be stale
+        if get_write_queue() is None:
+            print(f"{student.username}'s Total Hours: {student.hours} Hours")
         return
     print("Student does not exist.")
 
+@user_cli.command("log-bulk", help="Logs hours for many students from a csv or jsonl file")
+@click.argument("file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "format", type=click.Choice(["csv", "jsonl"]), default=None,
+              help="File format (defaults to the file extension)")
+@click.option("--batch-size", default=1000, show_default=True, help="Log rows per INSERT batch")
+@require_role("staff")
+def log_hours_bulk(file, format, batch_size, current_user):
+    format = format or ('csv' if file.lower().endswith('.csv') else 'jsonl')
+    with open(file, newline='') as f:
+        result = bulk_log_hours(current_user.id, read_entries(f, format), batch_size=batch_size)
+    for error in result['errors']:
+        print(f"Row {error['row']}: {error['error']}")
+    print(f"Logged {result['inserted']} entries for {result['students']} students "
+          f"({len(result['errors'])} skipped) in {result['seconds']}s "
+          f"[{result['rows_per_sec']} rows/s]")
+
+@user_cli.command("import", help="Creates many users from a CSV or JSON lines file")
+@click.argument("file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", type=click.Choice(["csv", "jsonl"]), default=None, help="File format (defaults to the file extension)")
+@click.option("--batch-size", default=1000, show_default=True, help="Users per INSERT transaction")
+@click.option("--fail-on-duplicates", is_flag=True, help="Import nothing if any row is rejected")
+@require_role("staff")
+def import_users_command(file, format, batch_size, fail_on_duplicates, current_user):
+    format = format or ('csv' if file.lower().endswith('.csv') else 'jsonl')
+    def progress(stage, done, total):
+        if done == total or done % max(1, total // 100) == 0:
+            click.echo(f"\r{'Hashing' if stage == 'hash' else 'Inserting'} {done}/{total}", nl=done == total, err=True)
+    with open(file, newline='') as f:
+        result = import_users(read_entries(f, format), batch_size=batch_size,
+                              skip_duplicates=not fail_on_duplicates, on_progress=progress)
+    for error in result['errors']:
+        print(f"Row {error['row']}: {error['error']}")
+    print(f"Created {result['created']} users ({len(result['errors'])} rejected) in {result['seconds']}s "
+          f"[{result['users_per_sec']} users/s]")
+
 @user_cli.command("accolades", help="View per-activity milestones")
 @require_role("student")
 def view_accolades(current_user):
-    activities = db.session.execute(
-        select(Activity.id, Activity.name)
-    ).all()
-
-    hours_rows = db.session.execute(
-        select(Log.activity_id, func.coalesce(func.sum(Log.hours), 0))
-        .where(Log.student_id == current_user.id)
-        .group_by(Log.activity_id)
-    ).all()
-    hours_by_activity = {aid: int(total) for (aid, total) in hours_rows}
+    activities = get_activity_catalog().activities
 
     if not activities:
         print("No activities defined.")
         return
-    
-    student = Student.query.get(current_user.id)
-    accolade = ''
+
+    hours_by_activity = get_student_activity_hours(current_user.id)
+    accolade = build_accolade(activities, hours_by_activity)
 
     print("===== ACCOLADES (by activity) =====")
-    for activity_id, activity_name in activities:
-        total = hours_by_activity.get(activity_id, 0)
-        result = resolve_milestone(total, milestones_for(activity_name))
-        print(f"{activity_name}: {result}")
-        accolade += f"{activity_name}: {result}\n"
-    
-    if not student.accolade:
-        student.accolade = accolade
-        db.session.add(student)
+    print(accolade, end='')
+
+    if current_user.accolade != accolade:
+        current_user.accolade = accolade
         db.session.commit()
 
 
@@ -178,16 +266,14 @@ app.cli.add_command(user_cli) # add the group to the cli
 @click.argument("activity_name", type=str)
 @require_role("student")
 def request_hours(hours, activity_name, current_user):
-    activity = Activity.query.filter_by(name=activity_name).first()
-    if not activity:
+    activity_id = get_activity_id(activity_name)
+    if activity_id is None:
         print("Activity does not exist. Enter existing activity")
         return
     student = Student.query.get(current_user.id)
     if student:
-        request = Request(student_id=current_user.id, activity_id=activity.id, hours=hours)
-        db.session.add(request)
-        db.session.commit()
-        print(f"{student.username} requested {hours} hours for {activity.name}.")
+        create_request(current_user.id, activity_id, hours)
+        print(f"{student.username} requested {hours} hours for {activity_name}.")
     else:
         print('Student not found.')
 
@@ -196,25 +282,234 @@ def request_hours(hours, activity_name, current_user):
 @click.argument("request_id", type=int)
 @require_role("staff")
 def confirm_hours(action, request_id, current_user):
-    request = Request.query.get(request_id)
-    if request:
-        student = Student.query.get(request.student_id)
-        if action == "approve":
-            log = Log(staff_id=current_user.id, student_id=request.student_id, hours=request.hours, activity_id=request.activity_id)
-            add_student_hours(student_id=student.id, hours=request.hours)
-            db.session.add(log)
-            db.session.delete(request)
-            db.session.commit()
-            activity = Activity.query.get(request.activity_id)
-            print(f"{request.hours} hours of {activity.name} approved for {student.username}")
-        elif action == "reject":
-            db.session.delete(request)
-            db.session.commit()
-            print(f"{request.hours} hours rejected for {student.username}")
-        else:
-            print("Wrong action entered. Please enter 'approve' or 'reject' followed by the request_id")
-    else:
+    if action not in ("approve", "reject"):
+        print("Wrong action entered. Please enter 'approve' or 'reject' followed by the request_id")
+        return
+    # the log and the request's deletion commit together, also with WRITE_BEHIND on
+    result, = confirm_requests(current_user.id, action, request_ids=[request_id])
+    if result['outcome'] == 'not_found':
         print('Request not found.')
+    elif action == "approve":
+        print(f"{result['hours']} hours of {get_activity_name(result['activity_id'])} approved for {result['student']}")
+    else:
+        print(f"{result['hours']} hours rejected for {result['student']}")
+
+@user_cli.command("confirm-batch", help="Approve/Reject many requested hours at once")
+@click.argument("action", type=click.Choice(["approve", "reject"]))
+@click.argument("request_ids", type=int, nargs=-1)
+@click.option("--all-for-activity", "activity_name", default=None, help="Select every pending request for this activity")
+@require_role("staff")
+def confirm_hours_batch(action, request_ids, activity_name, current_user):
+    if bool(request_ids) == bool(activity_name):
+        raise click.UsageError("Give either request ids or --all-for-activity, not both.")
+    results = confirm_requests(current_user.id, action, request_ids=request_ids, activity_name=activity_name)
+    if not results:
+        print('No requests found.')
+        return
+    for result in results:
+        if result['outcome'] == 'not_found':
+            print(f"{result['id']}: not found")
+        else:
+            print(f"{result['id']}: {result['outcome']} {result['hours']} hours for {result['student']}")
+    done = sum(1 for result in results if result['outcome'] != 'not_found')
+    outcome = 'approved' if action == 'approve' else 'rejected'
+    print(f"{done} of {len(results)} requests {outcome}.")
+
+# Commands that drive other commands and cannot be nested in a batch
+NON_BATCH_COMMANDS = {'batch', 'shell'}
+
+def run_user_command(ctx, line):
+    """Run one `user_cli` command line, e.g. "log bob 5 volunteering", inside the current process."""
+    args = shlex.split(line)
+    if args and args[0] == 'user':
+        args = args[1:]
+    if not args:
+        return False
+    name, *command_args = args
+    command = user_cli.get_command(ctx, name)
+    if command is None or name in NON_BATCH_COMMANDS:
+        raise click.UsageError(f"Unknown command '{name}'.")
+    with command.make_context(name, command_args, parent=ctx) as sub_ctx:
+        command.invoke(sub_ctx)
+    return True
+
+def script_lines(script):
+    for number, line in enumerate(script, start=1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield number, line
+
+@user_cli.command("batch", help="Runs a script of user commands in one process")
+@click.argument("script", type=click.File())
+@click.option("--commit-every", type=int, default=None, help="Commit after every N commands (default: once at the end)")
+@click.pass_context
+def batch_command(ctx, script, commit_every):
+    start = time.perf_counter()
+    ran = commits = 0
+    number, line = None, None
+    try:
+        with deferred_commits() as commit:
+            for number, line in script_lines(script):
+                print(f'>>> {line}')
+                ran += run_user_command(ctx, line)
+                if commit_every and ran % commit_every == 0:
+                    commit()
+                    commits += 1
+            commits += 1
+    except (Exception, click.exceptions.Exit) as e:
+        reset_leaderboard()
+        message = e.format_message() if isinstance(e, click.ClickException) else f'{type(e).__name__}: {e}'
+        uncommitted = ran - (commits * commit_every if commit_every else 0)
+        raise click.ClickException(
+            f'Line {number} failed: {line}\n  {message}\n'
+            f'Stopped after {ran} commands; {uncommitted} uncommitted commands were rolled back.'
+        )
+    print(f'Ran {ran} commands in {time.perf_counter() - start:.2f}s ({commits} commits).')
+
+@user_cli.command("shell", help="Interactive prompt for user commands in one warm process")
+@click.option("--commit-every", type=int, default=1, show_default=True, help="Commit after every N commands")
+@click.pass_context
+def shell_command(ctx, commit_every):
+    print("Enter user commands (e.g. 'log bob 5 volunteering'); 'exit' to quit.")
+    pending = 0
+    with deferred_commits() as commit:
+        while True:
+            try:
+                line = input('user> ').strip()
+            except EOFError:
+                break
+            if line in ('exit', 'quit'):
+                break
+            try:
+                pending += run_user_command(ctx, line)
+            except (Exception, click.exceptions.Exit) as e:
+                db.session.rollback()
+                reset_leaderboard()
+                message = e.format_message() if isinstance(e, click.ClickException) else f'{type(e).__name__}: {e}'
+                print(f'{message}\n  {pending} uncommitted commands were rolled back.')
+                pending = 0
+                continue
+            if pending >= commit_every:
+                commit()
+                pending = 0
+
+
+'''
+Activity Commands
+'''
+
+activity_cli = AppGroup('activity', help='Activity and milestone commands')
+
+def parse_milestones(text):
+    try:
+        milestones = [int(hours) for hours in text.split(',') if hours.strip()]
+    except ValueError:
+        milestones = None
+    if milestones is None or any(hours <= 0 for hours in milestones):
+        raise click.BadParameter('milestones are comma-separated positive whole hours, e.g. 10,25,50')
+    return milestones
+
+@activity_cli.command("list", help="Lists activities and their milestones")
+def list_activities():
+    catalog = get_activity_catalog(refresh=True)
+    for activity_id, name in catalog.activities:
+        print(f"{name}: {', '.join(str(hours) for hours in catalog.milestones[activity_id])}")
+
+@activity_cli.command("create", help="Creates an activity")
+@click.argument("name", type=str)
+@click.option("--milestones", default=None, help="Comma-separated thresholds (defaults to the shared milestones)")
+def create_activity_command(name, milestones):
+    if get_activity_id(name) is not None:
+        print(f"Activity {name} already exists.")
+        return
+    create_activity(name, parse_milestones(milestones) if milestones else None)
+    print(f"Created activity {name}.")
+
+@activity_cli.command("milestones", help="Sets an activity's milestone thresholds")
+@click.argument("name", type=str)
+@click.argument("milestones", type=str)
+def set_milestones_command(name, milestones):
+    if not set_activity_milestones(name, parse_milestones(milestones)):
+        print("Activity does not exist.")
+        return
+    print(f"Milestones for {name}: {', '.join(str(hours) for hours in get_activity_catalog().milestones[get_activity_id(name)])}")
+
+app.cli.add_command(activity_cli)
+
+'''
+Report Commands
+'''
+
+report_cli = AppGroup('report', help='Reporting commands')
+
+@report_cli.command("export", help="Streams a hours report as CSV or JSON lines")
+@click.option("--format", "format", type=click.Choice(REPORT_FORMATS), default="csv", show_default=True)
+@click.option("--by", type=click.Choice(list(REPORTS)), default="student", show_default=True,
+              help="student/activity: hours per student and activity; staff: hours logged per staff and activity; log: every log")
+@click.option("--output", type=click.Path(dir_okay=False, writable=True), default=None, help="File to write (defaults to stdout)")
+@click.option("--chunk-size", default=1000, show_default=True, help="Rows fetched from the cursor at a time")
+def export_report_command(format, by, output, chunk_size):
+    summary = {'rows': 0, 'seconds': 0.0, 'shown': 0.0}
+    def progress(rows, seconds):
+        # once a second, on stderr, so stdout stays a clean export
+        if seconds - summary['shown'] >= 1:
+            summary['shown'] = seconds
+            click.echo(f"\r{rows} rows [{rows / seconds:.0f} rows/s]", nl=False, err=True)
+        summary.update(rows=rows, seconds=seconds)
+    with use_replica(), (open(output, 'w', newline='') if output else contextlib.nullcontext(sys.stdout)) as f:
+        for chunk in export_report(by, format, chunk_size=chunk_size, on_progress=progress):
+            f.write(chunk)
+    rate = summary['rows'] / summary['seconds'] if summary['seconds'] else 0
+    click.echo(f"\rExported {summary['rows']} rows in {summary['seconds']:.2f}s [{rate:.0f} rows/s]", err=True)
+
+app.cli.add_command(report_cli)
+
+'''
+Replica Commands
+'''
+
+replica_cli = AppGroup('replica', help='Read replica commands')
+
+@replica_cli.command("status", help="Shows how far the read replica trails the primary")
+def replica_status_command():
+    monitor = app.extensions.get('db_replica')
+    if monitor is None:
+        raise click.ClickException('No replica configured (set DB_REPLICA_URI).')
+    try:
+        behind, lag = monitor.measure()
+    except Exception as e:
+        raise click.ClickException(f'Replica unreadable: {e}')
+    max_lag = app.config['DB_REPLICA_MAX_LAG']
+    state = f'{lag:.0f}s behind' if behind else 'current'
+    routing = 'replica' if monitor.acceptable(behind, lag) else 'primary'
+    print(f'Replica {db.engines["replica"].url.render_as_string(hide_password=True)}: {state} '
+          f'(max lag {max_lag}s); reads go to the {routing}')
+
+@replica_cli.command("sync", help="Copies a SQLite primary over its SQLite replica")
+def replica_sync_command():
+    if app.extensions.get('db_replica') is None:
+        raise click.ClickException('No replica configured (set DB_REPLICA_URI).')
+    try:
+        sync_sqlite_replica()
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    print('Replica synced.')
+
+app.cli.add_command(replica_cli)
+
+'''
+Accolade Commands
+'''
+
+accolades_cli = AppGroup('accolades', help='Accolade commands')
+
+@accolades_cli.command("recompute", help="Recomputes every student's accolades in one pass")
+@click.option("--rebuild", is_flag=True, help="Rebuild the per-activity hour totals from the logs first")
+def recompute_accolades_command(rebuild):
+    changed = recompute_accolades(rebuild=rebuild)
+    print(f'Updated accolades for {changed} students.')
+
+app.cli.add_command(accolades_cli)
 
 '''
 Test Commands
@@ -225,6 +520,7 @@ test = AppGroup('test', help='Testing commands')
 @test.command("user", help="Run User tests")
 @click.argument("type", default="all")
 def user_tests_command(type):
+    import pytest
     if type == "unit":
         sys.exit(pytest.main(["-k", "UserUnitTests"]))
     elif type == "int":
@@ -233,4 +529,134 @@ def user_tests_command(type):
         sys.exit(pytest.main(["-k", "App"]))
     
 
-app.cli.add_command(test)
\ No newline at end of file
+app.cli.add_command(test)
+
+'''
+Performance Commands
+'''
+
+perf_cli = AppGroup('perf', help='Performance measurement commands')
+
+@perf_cli.command("startup", help="Measures CLI startup time against a budget")
+@click.option("--runs", default=3, show_default=True, help="Fresh interpreters to time")
+@click.option("--budget", "budget_ms", type=float, default=None, help="Budget in ms for the lean app (defaults to CLI_STARTUP_BUDGET_MS)")
+@click.option("--imports", "top", default=10, show_default=True, help="Slowest imports to list")
+def startup_command(runs, budget_ms, top):
+    from App.perf import measure_startup
+    budget_ms = budget_ms if budget_ms is not None else app.config['CLI_STARTUP_BUDGET_MS']
+    lean_app = measure_startup(lean=True, runs=runs)
+    full_app = measure_startup(lean=False, runs=runs)
+    print(f"{'MODE':<6} {'IMPORT ms':>10} {'WSGI ms':>10} {'TOTAL ms':>10}")
+    for result in (lean_app, full_app):
+        mode = 'lean' if result['lean'] else 'full'
+        print(f"{mode:<6} {result['import_ms']:>10} {result['wsgi_ms']:>10} {result['total_ms']:>10}")
+    print("\nSlowest imports (lean):")
+    for name, ms in lean_app['top_imports'][:top]:
+        print(f"  {ms:>8.1f} ms  {name}")
+    if lean_app['total_ms'] > budget_ms:
+        raise click.ClickException(f"Lean startup {lean_app['total_ms']} ms is over the {budget_ms} ms budget.")
+    print(f"\nLean startup is within the {budget_ms} ms budget.")
+
+@perf_cli.command("db-writes", help="Compares write throughput with stock and tuned engine settings")
+@click.option("--workers", default=4, show_default=True, help="Concurrent writer processes, like gunicorn workers")
+@click.option("--writes", default=200, show_default=True, help="Single-row transactions per worker")
+@click.option("--configured", is_flag=True, help="Benchmark the configured database instead of a scratch SQLite file")
+def db_writes_command(workers, writes, configured):
+    from App.database import engine_options
+    from App.perf import compare_db_writes, scratch_sqlite_uri
+    uri = app.config['SQLALCHEMY_DATABASE_URI'] if configured else scratch_sqlite_uri()
+    options = engine_options({**app.config, 'SQLALCHEMY_DATABASE_URI': uri})
+    results = compare_db_writes(uri, options, app.config['SQLITE_PRAGMAS'], workers=workers, writes=writes)
+    print(f"{'PROFILE':<8} {'WRITES':>7} {'ERRORS':>7} {'WRITES/S':>9} {'P50 ms':>8} {'P95 ms':>8}")
+    for profile, result in results.items():
+        print(f"{profile:<8} {result['writes']:>7} {result['errors']:>7} {result['writes_per_sec']:>9} "
+              f"{result['p50_ms']:>8} {result['p95_ms']:>8}")
+
+@perf_cli.command("group-commit", help="Compares create_log throughput with and without the write-behind queue")
+@click.option("--writers", default=8, show_default=True, help="Concurrent threads logging hours")
+@click.option("--writes", default=100, show_default=True, help="Logs per thread")
+def group_commit_command(writers, writes):
+    from App.perf import measure_group_commit
+    results = measure_group_commit(writers=writers, writes=writes)
+    print(f"{'MODE':<13} {'LOGS':>6} {'SECONDS':>8} {'LOGS/S':>9}")
+    for mode, result in results.items():
+        print(f"{mode:<13} {result['logged']:>6} {result['seconds']:>8} {result['logs_per_sec']:>9}")
+
+@perf_cli.command("bench", help="Times controller paths at several data sizes and checks them against a baseline")
+@click.option("--sizes", default="100,1000", show_default=True, help="Comma-separated student counts to seed")
+@click.option("--repeat", default=3, show_default=True, help="Runs per benchmark; the median is reported")
+@click.option("--only", default=None, help="Comma-separated subset of benchmarks to run")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Write results as JSON to this file")
+@click.option("--baseline", type=click.File(), default=None, help="JSON results of an earlier run to compare against")
+@click.option("--threshold", default=0.25, show_default=True, help="Allowed slowdown against the baseline (0.25 = 25%)")
+def bench_command(sizes, repeat, only, output, baseline, threshold):
+    from App.perf import BENCHMARKS, run_benchmarks, compare_to_baseline
+    benchmarks = only.split(',') if only else BENCHMARKS
+    unknown = set(benchmarks) - set(BENCHMARKS)
+    if unknown:
+        raise click.UsageError(f"Unknown benchmarks: {', '.join(sorted(unknown))}. Choose from {', '.join(BENCHMARKS)}.")
+    current = run_benchmarks([int(size) for size in sizes.split(',')], repeat=repeat, benchmarks=benchmarks)
+    print(f"{'BENCHMARK':<18}" + ''.join(f"{size + ' ms':>12}" for size in current['results']))
+    for name in benchmarks:
+        print(f"{name:<18}" + ''.join(f"{results[name]:>12}" for results in current['results'].values()))
+    if output:
+        with open(output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"\nResults written to {output}")
+    if baseline:
+        regressions = compare_to_baseline(current, json.load(baseline), threshold=threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['benchmark']} @ {regression['size']}: "
+                  f"{regression['baseline_ms']} -> {regression['current_ms']} ms")
+        if regressions:
+            raise click.ClickException(f"{len(regressions)} benchmark(s) slower than the baseline by more than {threshold:.0%}.")
+        print(f"\nNo regressions over {threshold:.0%} against the baseline.")
+
+@perf_cli.command("load", help="Drives a mix of HTTP endpoints with logged-in clients and reports latency percentiles")
+@click.option("--server", type=click.Choice(["inprocess", "gunicorn"]), default="inprocess", show_default=True)
+@click.option("--url", default=None, help="Target an already running server instead of starting one")
+@click.option("--workers", type=int, default=None, help="gunicorn workers (defaults to gunicorn_config.py)")
+@click.option("--concurrency", default=8, show_default=True, help="Concurrent clients, each with its own login")
+@click.option("--duration", default=10.0, show_default=True, help="Seconds to run")
+@click.option("--rate", type=float, default=None, help="Target requests/s overall (default: as fast as possible)")
+@click.option("--mix", default="identify=4,users=2,leaderboard=2,logs=1,requests=1,log_hours=1,login=0.5",
+              show_default=True, help="Endpoint weights")
+@click.option("--password", default=None, help="Password of the staff users (defaults to the flask seed password)")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Write results as JSON to this file")
+def load_command(server, url, workers, concurrency, duration, rate, mix, password, output):
+    from App.perf import parse_mix, serve_in_process, serve_gunicorn, run_load
+    try:
+        mix = parse_mix(mix)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    staff_query, student_query = select(Staff.username).order_by(Staff.id), select(Student.username).order_by(Student.id)
+    if password is None:
+        # only seeded users are known to have the seed password
+        staff_query = staff_query.where(Staff.username.startswith(SEED_STAFF_PREFIX))
+        student_query = student_query.where(Student.username.startswith(SEED_STUDENT_PREFIX))
+    staff = db.session.scalars(staff_query.limit(concurrency)).all()
+    student = db.session.scalar(student_query)
+    if not staff or student is None:
+        raise click.ClickException("Load needs staff and student users; run `flask seed` first.")
+    users = [(username, password or SEED_PASSWORD) for username in staff]
+    if url:
+        serving = contextlib.nullcontext(url)
+    elif server == "gunicorn":
+        serving = serve_gunicorn(workers, env={'FLASK_SQLALCHEMY_DATABASE_URI': app.config['SQLALCHEMY_DATABASE_URI']})
+    else:
+        serving = serve_in_process(app)
+    with serving as base_url:
+        result = run_load(base_url, mix, users, student, concurrency=concurrency, duration=duration, rate=rate)
+    print(f"{'ENDPOINT':<12} {'REQS':>7} {'REQ/S':>8} {'P50 ms':>8} {'P95 ms':>8} {'P99 ms':>8} {'ERRORS':>7}")
+    for name, stats in result['endpoints'].items():
+        print(f"{name:<12} {stats['requests']:>7} {stats['rps']:>8} {stats['p50_ms']!s:>8} {stats['p95_ms']!s:>8} "
+              f"{stats['p99_ms']!s:>8} {stats['error_rate']!s:>7}")
+    print(f"\n{result['requests']} requests in {result['seconds']}s: {result['rps']} req/s, {result['errors']} errors")
+    if output:
+        with open(output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+app.cli.add_command(perf_cli)
+
+# prints a SQL summary after each command when SQL_PROFILER is on
+profile_cli(app, app.cli)